@@ -0,0 +1,96 @@
+import json
+import pytest
+from core.ioutil import get_block_store
+from core.index_util import base
+from core.index_util.txindex import TxIndex
+from core.index_util.addresses import AddressIndex
+from core.index_util.balances import BalanceIndex
+from core.index_util.validation import ValidationIndex
+from core.index_util.rollups import RollupIndex
+from core.index_util.summary import SummaryIndex
+from core.index_util.leaderboard import LeaderboardIndex
+from core.index_util.tokens import TokenIndex
+from core.index_util.orderbook import OrderBookIndex
+
+INDEXES = [TxIndex, AddressIndex, BalanceIndex, ValidationIndex, RollupIndex,
+           SummaryIndex, LeaderboardIndex, TokenIndex, OrderBookIndex]
+
+
+def snapshot(index):
+    # As it would be checkpointed (JSON turns integer keys into strings).
+    return index.height, index.tip_hash, json.loads(json.dumps(index.to_dict()))
+
+
+def full_rescan(cls, chain_file):
+    index = cls(chain_file)
+    index.reset()
+    for block in get_block_store(chain_file).iter_range():
+        index.apply_block(block)
+        index.height += 1
+        index.tip_hash = block["hash"]
+    return snapshot(index)
+
+
+@pytest.fixture(autouse=True)
+def frequent_checkpoints(monkeypatch):
+    monkeypatch.setattr(base, "CHECKPOINT_BLOCKS", 7)
+
+
+@pytest.mark.parametrize("cls", INDEXES, ids=lambda cls: cls.name)
+def test_incremental_sync_matches_full_rescan(cls, chain_file, make_chain):
+    blocks = make_chain(60, seed=3)
+    store = get_block_store(chain_file)
+    index = cls(chain_file)
+    for lo, hi in ((0, 1), (1, 9), (9, 10), (10, 41), (41, 60)):
+        store.append_many(blocks[lo:hi])
+        index.sync()
+    assert snapshot(index) == full_rescan(cls, chain_file)
+
+
+@pytest.mark.parametrize("cls", INDEXES, ids=lambda cls: cls.name)
+def test_checkpoint_reload_then_sync_matches_full_rescan(cls, chain_file, make_chain):
+    blocks = make_chain(40, seed=4)
+    store = get_block_store(chain_file)
+    store.append_many(blocks[:25])
+    cls(chain_file).sync()
+    store.append_many(blocks[25:])
+    reloaded = cls(chain_file)
+    assert 0 < reloaded.height <= 25
+    reloaded.sync()
+    assert snapshot(reloaded) == full_rescan(cls, chain_file)
+
+
+@pytest.mark.parametrize("cls", INDEXES, ids=lambda cls: cls.name)
+def test_rewritten_chain_triggers_rebuild(cls, chain_file, make_chain):
+    blocks = make_chain(30, seed=5)
+    store = get_block_store(chain_file)
+    store.append_many(blocks)
+    index = cls(chain_file).sync()
+    fork = blocks[:12] + make_chain(25, seed=6, start=12, previous_hash=blocks[11]["hash"])
+    store.replace(fork)
+    index.sync()
+    assert snapshot(index) == full_rescan(cls, chain_file)
+
+
+def test_checkpoint_from_another_version_is_discarded(chain_file, make_chain):
+    get_block_store(chain_file).append_many(make_chain(10, seed=7))
+    TokenIndex(chain_file).sync().save()
+
+    class Bumped(TokenIndex):
+        version = TokenIndex.version + 1
+
+    assert Bumped(chain_file).height == 0
+    assert TokenIndex(chain_file).height == 10
+
+
+def test_token_transfers_and_orders_are_counted_apart(chain_file, make_chain):
+    blocks = make_chain(60, seed=9)
+    get_block_store(chain_file).append_many(blocks)
+    index = TokenIndex(chain_file).sync()
+    kinds = [next(iter(tx["note"]["type"])) for block in blocks for tx in block["transactions"]
+             if isinstance(tx["note"], dict)]
+    transfers = kinds.count("token_transfer")
+    orders = kinds.count("buy_token") + kinds.count("sell_token")
+    assert index.transfers() == index.transfers("FUEL") == transfers
+    assert index.transfers(orders=True) == transfers + orders
+    assert index.transfers_since(0, orders=True) == transfers + orders
@@ -0,0 +1,103 @@
+import pytest
+from blockchain.mempoolutil import Mempool
+from core.serialutil import compact
+
+
+def transfer(sender, n, amount=1.0):
+    # Non-wallet senders are not balance-checked against the chain.
+    return [{"sender": sender, "recipient": "bob", "amount": amount, "timestamp": 1_700_000_000 + n, "note": ""}]
+
+
+@pytest.fixture
+def sealed():
+    return []
+
+
+@pytest.fixture
+def mempool(sealed, monkeypatch):
+    monkeypatch.setattr(Mempool, "_ensure_thread", lambda self: None)
+
+    def seal_block(txs, node_id):
+        sealed.append((node_id, txs))
+        return {"index": len(sealed), "transactions": txs}
+
+    return Mempool(seal_block, max_block_txs=3)
+
+
+def test_replacement_needs_a_fee_bump(mempool):
+    first_id, first = mempool.submit(transfer("alice", 0), "n1", fee=1.0)
+    assert mempool.submit(transfer("alice", 1), "n1", fee=1.05, nonce=0) == (None, "Replacement fee too low")
+
+    second_id, second = mempool.submit(transfer("alice", 2), "n1", fee=1.2, nonce=0)
+    assert second_id != first_id
+    with pytest.raises(ValueError, match="Replaced"):
+        first.result(0)
+    assert list(mempool.pending) == [second_id]
+    assert mempool.next_nonce["alice"] == 1
+
+
+def test_nonces_must_not_leave_gaps(mempool):
+    mempool.submit(transfer("alice", 0), "n1")
+    assert mempool.submit(transfer("alice", 1), "n1", nonce=5) == (None, "Nonce gap: expected 1")
+    assert mempool.submit(transfer("alice", 2), "n1", nonce=1)[0]
+
+
+def test_resubmitting_returns_the_queued_group(mempool):
+    tx_id, future = mempool.submit(transfer("alice", 0), "n1")
+    assert mempool.submit(transfer("alice", 0), "n1") == (tx_id, future)
+    assert mempool.size == 1
+
+
+def test_pending_spend_counts_against_the_balance(mempool):
+    assert mempool.submit(transfer("alice", 0, amount=6), "n1", balance=10)[0]
+    assert mempool.submit(transfer("alice", 1, amount=6), "n1", balance=10) == \
+        (None, "Insufficient balance (pending transfers)")
+    # Replacing the pending transfer releases its spend.
+    assert mempool.submit(transfer("alice", 2, amount=9), "n1", fee=1.0, nonce=0, balance=10)[0]
+
+
+def test_eviction_drops_lowest_fee_rate_and_the_senders_later_groups(mempool):
+    size = len(compact(transfer("alice", 0)[0]))
+    mempool.max_bytes = 4 * size
+    # alice's first group is the cheapest; her second must go with it.
+    cheap = [mempool.submit(transfer("alice", n), "n1", fee=0.01 * (n + 1))[1] for n in range(2)]
+    mempool.submit(transfer("carol", 0), "n1", fee=1.0)
+    mempool.submit(transfer("carol", 1), "n1", fee=1.0)
+
+    tx_id, _ = mempool.submit(transfer("dave", 0), "n1", fee=0.5)
+    assert tx_id
+    for future in cheap:
+        with pytest.raises(ValueError, match="Evicted"):
+            future.result(0)
+    assert "alice" not in mempool.queues
+    assert mempool.next_nonce["alice"] == 0
+    assert mempool.bytes <= mempool.max_bytes
+
+
+def test_group_below_the_cheapest_pending_fee_rate_is_refused_when_full(mempool):
+    mempool.max_bytes = 2 * len(compact(transfer("carol", 0)[0]))
+    mempool.submit(transfer("carol", 0), "n1", fee=1.0)
+    mempool.submit(transfer("carol", 1), "n1", fee=1.0)
+    assert mempool.submit(transfer("erin", 0), "n1", fee=0.001) == (None, "Mempool full: fee too low")
+    assert mempool.size == 2
+
+
+def test_flush_seals_by_fee_rate_in_nonce_order(mempool, sealed):
+    mempool.submit(transfer("alice", 0), "n1", fee=0.1)
+    mempool.submit(transfer("alice", 1), "n1", fee=5.0)
+    mempool.submit(transfer("carol", 0), "n1", fee=1.0)
+    futures = [mempool.submit(transfer("dave", n), "n1", fee=0.01)[1] for n in range(2)]
+    mempool.flush()
+
+    assert [[tx["sender"] for tx in txs] for _, txs in sealed] == [["carol", "alice", "alice"], ["dave", "dave"]]
+    assert all(future.result(0)["index"] == 2 for future in futures)
+    assert not mempool.pending and not mempool.spend
+
+
+def test_dead_heap_entries_are_purged(mempool):
+    for n in range(10):
+        mempool.submit(transfer(f"user{n}", n), "n1", fee=1.0)
+    mempool.submit(transfer("user0", 99), "n1", fee=2.0, nonce=0)
+    assert len(mempool.evict_heap) <= 2 * len(mempool.pending)
+    mempool.flush()
+    assert mempool.evict_heap == []
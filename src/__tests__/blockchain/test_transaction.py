@@ -0,0 +1,21 @@
+from config.configutil import TXConfig
+
+TX = {"sender": "alice", "recipient": "bob", "amount": 1, "timestamp": 1_700_000_000.0, "note": {"type": {}}}
+
+
+def test_reassigning_a_field_drops_the_memoized_encodings():
+    tx = TXConfig.Transaction.from_dict(TX)
+    canonical, compact, digest = tx.canonical(), tx.compact(), tx.digest()
+    tx.note = {**tx.note, "signature": "sig"}
+    assert b'"signature"' in tx.canonical() and b'"signature"' in tx.compact()
+    assert tx.digest() != digest
+    tx.note = TX["note"]
+    assert (tx.canonical(), tx.compact(), tx.digest()) == (canonical, compact, digest)
+
+
+def test_extra_fields_are_encoded():
+    tx = TXConfig.Transaction.from_dict(dict(TX, tx_id="t1"))
+    assert b'"tx_id": "t1"' in tx.canonical()
+    tx.compact()
+    tx.extra["fee"] = 0.1
+    assert b'"fee":0.1' in tx.compact()
@@ -0,0 +1,38 @@
+from core.ioutil import get_block_store
+from core.index_util.tokens import TokenIndex
+from core.tx_util import tx_pipeline
+from core.tx_util.tx_pipeline import BalanceOverlay
+
+
+def scanned_balance(blocks, address, symbol):
+    balance = 0
+    for block in blocks:
+        for tx in block["transactions"]:
+            note = tx.get("note")
+            data = note.get("type", {}).get("token_transfer") if isinstance(note, dict) else None
+            if data and data.get("token_symbol") == symbol:
+                balance += data["amount"] * ((data.get("receiver") == address) - (data.get("sender") == address))
+    return balance
+
+
+def test_token_balances_come_from_the_index(chain_file, make_chain, monkeypatch):
+    blocks = make_chain(60, seed=8)
+    get_block_store(chain_file).append_many(blocks)
+    index = TokenIndex(chain_file).sync()
+    monkeypatch.setattr(tx_pipeline, "get_token_index", lambda: index)
+
+    def no_scan(**kwargs):
+        raise AssertionError("token balances rescanned the chain")
+    monkeypatch.setattr(tx_pipeline, "iter_transactions", no_scan)
+
+    overlay = BalanceOverlay()
+    holders = list(index.holders("FUEL"))
+    assert holders
+    for address in holders:
+        assert overlay.token(address, "FUEL") == scanned_balance(blocks, address, "FUEL")
+
+    sender, receiver = holders[:2]
+    overlay.apply({"sender": sender, "recipient": receiver, "amount": 0,
+                   "note": {"type": {"token_transfer": {"token_symbol": "FUEL", "sender": sender,
+                                                        "receiver": receiver, "amount": 2}}}})
+    assert overlay.token(sender, "FUEL") == scanned_balance(blocks, sender, "FUEL") - 2
@@ -0,0 +1,67 @@
+import os
+import sys
+import random
+import tempfile
+import pytest
+
+ORBIT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "blockchain", "orbit")
+sys.path.insert(0, ORBIT)
+
+# The orbit modules resolve data/ against the working directory (and create
+# it on import), so keep them out of the checkout.
+os.chdir(tempfile.mkdtemp(prefix="orbit-tests-"))
+
+
+def build_chain(count, seed=0, start=0, previous_hash="0"):
+    """
+    `count` linked, correctly hashed blocks with a mix of plain transfers,
+    lockups, token creations, token transfers, orders and cancels.
+    """
+    from core.hashutil import block_hash
+    rng = random.Random(seed)
+    users = [f"ORB.{'%024X' % n}" for n in range(6)]
+    blocks = []
+    for index in range(start, start + count):
+        ts = 1_700_000_000 + index * 3_000
+        txs = []
+        for n in range(rng.randint(0 if index else 1, 4)):
+            sender, recipient = rng.sample(users, 2)
+            tx = {"sender": sender, "recipient": recipient, "amount": round(rng.uniform(0.1, 50), 6),
+                  "timestamp": ts + n, "note": ""}
+            kind = rng.choice(["plain", "plain", "lockup", "create", "transfer", "buy", "sell", "cancel"])
+            order_id = f"o{rng.randint(0, 20)}"
+            if kind == "lockup":
+                tx["recipient"] = "lockup_rewards"
+                tx["note"] = {"type": {"lockup": {"amount": int(tx["amount"]), "duration": 30}}}
+            elif kind == "create":
+                tx["note"] = {"type": {"create_token": {"name": "Fuel", "symbol": rng.choice(["FUEL", "FIG"]),
+                                                        "supply": 1000, "creator": sender,
+                                                        "token_id": f"t{index}", "timestamp": ts}}}
+            elif kind == "transfer":
+                tx["note"] = {"type": {"token_transfer": {"token_symbol": "FUEL", "sender": sender,
+                                                          "receiver": recipient, "amount": rng.randint(1, 9)}}}
+            elif kind in ("buy", "sell"):
+                owner = "buyer" if kind == "buy" else "seller"
+                tx["note"] = {"type": {f"{kind}_token": {"order_id": order_id, "symbol": "FUEL",
+                                                          "price": rng.choice([1, 1.0, 1.5, 2]),
+                                                          "amount": rng.randint(1, 5), owner: sender,
+                                                          "status": rng.choice(["open", "filled"])}}}
+            elif kind == "cancel":
+                tx["note"] = {"type": {"cancel_order": {"order_id": order_id, "canceller": sender}}}
+            txs.append(tx)
+        block = {"index": index, "timestamp": ts, "transactions": txs, "previous_hash": previous_hash,
+                 "validator": "Node1", "signatures": {}, "merkle_root": "", "nonce": 0, "metadata": {}}
+        block["hash"] = block_hash(block)
+        previous_hash = block["hash"]
+        blocks.append(block)
+    return blocks
+
+
+@pytest.fixture
+def chain_file(tmp_path):
+    return str(tmp_path / "orbit_chain.json")
+
+
+@pytest.fixture
+def make_chain():
+    return build_chain
@@ -0,0 +1,60 @@
+from core.index_util import orderbook
+from core.index_util.orderbook import _empty, apply_orders, open_orders, levels, depth
+
+
+def order(kind, order_id, price=1.0, amount=2, owner="alice", status="open", symbol="FUEL"):
+    side = "buyer" if kind == "buy_token" else "seller"
+    data = {"order_id": order_id, "symbol": symbol, "price": price, "amount": amount, side: owner, "status": status}
+    return {"sender": owner, "recipient": "exchange", "amount": 0, "timestamp": 1_700_000_000, "note": {"type": {kind: data}}}
+
+
+def cancel(order_id, canceller="alice"):
+    return {"sender": canceller, "recipient": "exchange", "amount": 0, "timestamp": 1_700_000_000,
+            "note": {"type": {"cancel_order": {"order_id": order_id, "canceller": canceller}}}}
+
+
+def replay(*txs):
+    state = _empty()
+    for tx in txs:
+        apply_orders(state, {"timestamp": tx["timestamp"], "transactions": [tx]})
+    return state
+
+
+def test_open_orders_build_price_levels():
+    state = replay(order("buy_token", "b1", price=1), order("buy_token", "b2", price=1.0, amount=3),
+                   order("buy_token", "b3", price=1.5), order("sell_token", "s1", price=2, owner="bob"))
+    assert [o["order_id"] for o in open_orders(state)] == ["b1", "b2", "b3", "s1"]
+    assert [o["order_id"] for o in open_orders(state, "sell")] == ["s1"]
+    # 1 and 1.0 share a level; best bid first.
+    assert levels(state, "FUEL", "buy") == [(1.5, 2), (1.0, 5)]
+    assert depth(state, "FUEL") == {
+        "buy_depth": [{"price": 1.5, "cum_quantity": 2}, {"price": 1.0, "cum_quantity": 7}],
+        "sell_depth": [{"price": 2.0, "cum_quantity": 2}]
+    }
+
+
+def test_fill_closes_the_order_and_counts_once():
+    fill = order("buy_token", "b1", price=1.5, amount=4, status="filled")
+    state = replay(order("buy_token", "b1", price=1.5, amount=4), fill, fill)
+    assert open_orders(state) == []
+    assert levels(state, "FUEL", "buy") == []
+    assert state["fills"] == {"buy": 1, "sell": 0}
+    market = state["markets"]["FUEL"]
+    assert market["stats"]["buy_tokens"] == 4
+    assert market["stats"]["buy_orbit"] == 6.0
+    assert len(market["history"]) == 1
+
+
+def test_only_the_owner_can_cancel():
+    state = replay(order("sell_token", "s1", owner="bob"), cancel("s1", canceller="mallory"))
+    assert [o["order_id"] for o in open_orders(state)] == ["s1"]
+    apply_orders(state, {"transactions": [cancel("s1", canceller="bob")]})
+    assert open_orders(state) == []
+    assert levels(state, "FUEL", "sell") == []
+
+
+def test_filled_map_keeps_only_recent_fills(monkeypatch):
+    monkeypatch.setattr(orderbook, "FILLED_LIMIT", 3)
+    state = replay(*[order("sell_token", f"s{n}", status="filled") for n in range(5)])
+    assert list(state["filled"]) == ["s2", "s3", "s4"]
+    assert state["fills"]["sell"] == 5
@@ -0,0 +1,79 @@
+"""
+Memory per transaction: plain dicts vs. the old __dict__-based Transaction
+vs. the slotted TXConfig.Transaction.
+
+    python bench_tx_memory.py [count]    # default 1,000,000
+"""
+import sys
+import time
+import gc
+import tracemalloc
+from config.configutil import TXConfig
+
+
+class LegacyTransaction:
+    # TXConfig.Transaction as it was before __slots__.
+    def __init__(self, sender, recipient, amount, timestamp=None, note="", **kwargs):
+        self.sender = sender
+        self.recipient = recipient
+        self.amount = amount
+        self.timestamp = timestamp or time.time()
+        self.note = note if note is not None else {}
+        self.extra = kwargs
+
+    @staticmethod
+    def from_dict(data):
+        return LegacyTransaction(
+            sender=data.get("sender", ""),
+            recipient=data.get("recipient", ""),
+            amount=data.get("amount", 0),
+            timestamp=data.get("timestamp", time.time()),
+            note=data.get("note", ""),
+            **{k: v for k, v in data.items() if k not in {"sender", "recipient", "amount", "tx_type", "timestamp", "note"}}
+        )
+
+
+def make_txs(count):
+    txs = []
+    for i in range(count):
+        if i % 4 == 0:
+            note = {"type": {"token_transfer": {"token_symbol": "FUEL", "amount": i % 97}}}
+        else:
+            note = "transfer"
+        txs.append({
+            "sender": f"ORB.{i % 5000:024X}",
+            "recipient": f"ORB.{(i * 7) % 5000:024X}",
+            "amount": float(i % 1000) / 10,
+            "timestamp": 1_700_000_000 + i,
+            "note": note
+        })
+    return txs
+
+
+def measure(label, build, txs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    objs = build(txs)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_tx = (after - before) / len(txs)
+    print(f"{label:<28} {per_tx:8.1f} B/tx  {per_tx * 1_000_000 / 2**20:8.1f} MiB/1M tx  {elapsed:6.2f}s")
+    del objs
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    txs = make_txs(count)
+    print(f"{count:,} transactions (overhead on top of the decoded chain dicts)")
+    measure("LegacyTransaction.from_dict", lambda t: [LegacyTransaction.from_dict(tx) for tx in t], txs)
+    measure("Transaction.from_dict", lambda t: [TXConfig.Transaction.from_dict(tx) for tx in t], txs)
+    measure("Block.from_dict (lazy txs)",
+            lambda t: [TXConfig.Block.from_dict({"index": i, "transactions": t[i:i + 100]})
+                       for i in range(0, len(t), 100)], txs)
+
+
+if __name__ == "__main__":
+    main()
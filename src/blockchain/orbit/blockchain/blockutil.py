@@ -8,9 +8,12 @@ from blockchain.orbitutil import (
 )
 from blockchain.voteutil import record_vote
 from config.configutil import NodeConfig, TXConfig
-from core.ioutil import load_chain, save_chain, fetch_chain, load_users, save_users
+from core.ioutil import load_chain, save_chain, append_block, load_users, save_users, get_block_store
+from core.chainutil import get_chain_view
+from core.index_util.validation import get_validation_index, verify_blocks
+from core.tx_util.tx_pipeline import validate_transactions
 from core.hashutil import generate_merkle_root, calculate_hash
-from core.networkutil import send_block_to_node
+from core.networkutil import broadcast_block_to_urls
 
 
 def create_genesis_block():
@@ -36,8 +39,8 @@ def create_genesis_block():
 
 def get_last_block():
     try:
-        chain = fetch_chain()
-        if isinstance(chain, list) and len(chain) > 0:
+        chain = get_chain_view().blocks
+        if chain:
             return chain[-1]
         else:
             print("Chain is empty or invalid format.")
@@ -101,12 +104,12 @@ def propose_block(node_id, block_data, timeout=5):
         return False
 
 def receive_block(block):
-    chain = fetch_chain()
-    if not chain:
+    view = get_chain_view()
+    if not view.height:
         log_node_activity("unknown", "Receive Block", "Chain not loaded")
         return False
 
-    last_block = chain[-1]
+    last_block = view.blocks[-1]
 
     if block["index"] != last_block["index"] + 1:
         log_node_activity(block.get("validator", "unknown"), "Receive Block", "Rejected: Invalid index.")
@@ -114,8 +117,7 @@ def receive_block(block):
 
     block_obj = TXConfig.Block.from_dict(block)
     if validate_block(block_obj, block.get("validator", "unknown")):
-        chain.append(block)
-        save_chain(chain)
+        append_block(block)
         log_node_activity(block["validator"], "Receive Block", f"Block {block['index']} accepted.")
         return True
     else:
@@ -125,27 +127,43 @@ def receive_block(block):
 
 def broadcast_block(block, sender_id=None):
     nodes = load_nodes()
+    urls = {}
     for node_id, node_data in nodes.items():
         if sender_id != node_id:
             node = NodeConfig.from_dict(node_data)
             if node.address and node.port:
-                try:
-                    url = f"http://127.0.0.1:{node.port}"
-                    send_block_to_node(url, block)
-                    log_node_activity(sender_id, "Broadcast Block", f"Block sent to {url}")
-                except Exception as e:
-                    log_node_activity(sender_id, "Broadcast Block", f"Failed to send to {node_id}: {e}")
+                urls[f"http://127.0.0.1:{node.port}/receive_block"] = node_id
+    for url, sent in broadcast_block_to_urls(urls, block).items():
+        if sent:
+            log_node_activity(sender_id, "Broadcast Block", f"Block sent to {url}")
+        elif sent is None:
+            log_node_activity(sender_id, "Broadcast Block", f"Skipped {urls[url]}: circuit open")
+        else:
+            log_node_activity(sender_id, "Broadcast Block", f"Failed to send to {urls[url]}")
 
 
-def add_block(transactions, node_id):
-    chain = fetch_chain()
-    last_block = chain[-1]
+def add_block(transactions, node_id, validated=False):
+    """
+    Builds, proposes and appends a block. Returns the appended block dict,
+    or False if it was rejected. Transfers normally reach here through the
+    mempool (blockchain.mempoolutil) in batches, already validated.
+    """
+    view = get_chain_view()
+    last_block = view.blocks[-1]
     tx_objs = [TXConfig.Transaction.from_dict(tx) for tx in transactions]
     tx_dicts = [tx.to_dict() for tx in tx_objs]
-    merkle_root = generate_merkle_root(tx_dicts)
+
+    # Token transfers are balance-checked when they are created
+    # (validate_token_transfer); mints and order fills reach here unsigned.
+    if not validated:
+        for valid, msg in validate_transactions(tx_dicts, token_balances=False):
+            if not valid:
+                log_node_activity(node_id, "Add Block", f"Rejected: {msg}")
+                return False
+    merkle_root = generate_merkle_root(tx_objs)
 
     new_block = TXConfig.Block(
-        index=len(chain),
+        index=view.height,
         timestamp=time.time(),
         transactions=tx_objs,
         previous_hash=last_block["hash"],
@@ -185,17 +203,32 @@ def add_block(transactions, node_id):
                 record_vote(new_block.validator, new_block.hash, "nominate")
 
         save_users(users)
-        save_chain(chain + [new_block.to_dict()])
+        block = new_block.to_dict()
+        if not persist_block(view, block, node_id):
+            log_node_activity(node_id, "Add Block", f"Block {new_block.index} could not be stored.")
+            return False
         log_node_activity(node_id, "Add Block", f"Block {new_block.index} added.")
-        return True
+        return block
     else:
         log_node_activity(node_id, "Add Block", "Rejected by consensus.")
         return False
 
 
+def persist_block(view, block, node_id):
+    """
+    Stores `block`, built on top of `view`. It is appended when it extends
+    the local tip; when the view came from the explorer (empty or stale
+    local store) the local store is replaced by the view plus the block.
+    """
+    store = get_block_store()
+    tip = store.last()
+    if tip and store.height() == block["index"] and tip.get("hash") == block["previous_hash"]:
+        return append_block(block, owner_id=node_id)
+    return save_chain(list(view.blocks) + [block], owner_id=node_id)
+
+
 def validate_block(block, node_id):
-    chain = fetch_chain()
-    if not chain:
+    if not get_chain_view().height:
         log_node_activity(node_id, "Validate Block", "Blockchain couldn't be loaded")
         return False
 
@@ -226,16 +259,14 @@ def validate_block(block, node_id):
     return True
 
 
-def is_chain_valid():
-    chain = fetch_chain()
-    for i in range(1, len(chain)):
-        current, previous = chain[i], chain[i - 1]
-        recalculated = calculate_hash(
-            current["index"], current["previous_hash"], current["timestamp"],
-            current["transactions"], current.get("validator", ""),
-            current.get("merkle_root", ""), current.get("nonce", 0),
-            current.get("metadata", {})
-        )
-        if current["hash"] != recalculated or current["previous_hash"] != previous["hash"]:
-            return False
-    return True
+def is_chain_valid(full=False, workers=None):
+    """
+    Only blocks appended since the last validated height are re-hashed;
+    full=True re-verifies the whole chain across a process pool.
+    """
+    if not get_block_store().height():
+        first_invalid, _, _ = verify_blocks(get_chain_view().blocks, workers if full else 1)
+        return first_invalid is None
+    if full:
+        return get_validation_index(sync=False).verify_full(workers).valid
+    return get_validation_index().valid
@@ -1,5 +1,6 @@
 import time
-from core.ioutil import fetch_chain, save_chain, load_nodes
+from core.ioutil import fetch_chain, append_block, load_nodes
+from core.chainutil import has_block
 from core.logutil import log_node_activity
 from blockchain.voteutil import record_vote, get_votes, has_quorum
 from config.configutil import OrbitDB
@@ -56,10 +57,8 @@ def consensus_progression(node_id, block_data):
         return "confirmed"
 
     # Final confirmation and block addition
-    chain = fetch_chain()
-    if not any(b.get("hash") == block_hash for b in chain):
-        chain.append(block_data)
-        save_chain(chain)
+    if not has_block(block_hash):
+        append_block(block_data)
         log_node_activity(node_id, "finalize", f"Block {block_hash} added to chain")
         return "finalized"
 
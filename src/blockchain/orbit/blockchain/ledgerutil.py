@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from config.configutil import TXConfig
 from core.ioutil import fetch_chain
+from core.chainutil import iter_address_txs
 
 
 def format_transaction(tx):
@@ -29,43 +30,37 @@ def view_all_transactions():
             print(format_transaction(tx_obj.to_dict()))
 
 def view_user_transactions(username):
-    blockchain = fetch_chain()
     print(f"\n=== Transactions for {username} ===")
     found = False
-    for block in blockchain:
-        for tx in block.get("transactions", []):
-            tx_obj = TXConfig.Transaction.from_dict(tx)
-            if tx_obj.sender == username or tx_obj.recipient == username:
-                print(format_transaction(tx_obj.to_dict()))
-                found = True
+    for block, tx in iter_address_txs(username):
+        tx_obj = TXConfig.Transaction.from_dict(tx)
+        if tx_obj.sender == username or tx_obj.recipient == username:
+            print(format_transaction(tx_obj.to_dict()))
+            found = True
     if not found:
         print("No transactions found for this user.")
 
 def view_mining_rewards(username):
-    blockchain = fetch_chain()
     print(f"\n=== Mining Rewards for {username} ===")
     found = False
-    for block in blockchain:
-        for tx in block.get("transactions", []):
-            tx_obj = TXConfig.Transaction.from_dict(tx)
-            if tx_obj.sender == "mining" and tx_obj.recipient == username:
-                print(format_transaction(tx_obj.to_dict()))
-                found = True
+    for block, tx in iter_address_txs(username):
+        tx_obj = TXConfig.Transaction.from_dict(tx)
+        if tx_obj.sender == "mining" and tx_obj.recipient == username:
+            print(format_transaction(tx_obj.to_dict()))
+            found = True
     if not found:
         print("No mining rewards found.")
 
 def view_transfers(username):
-    blockchain = fetch_chain()
     print(f"\n=== Transfers by/to {username} ===")
     found = False
-    for block in blockchain:
-        for tx in block.get("transactions", []):
-            tx_obj = TXConfig.Transaction.from_dict(tx)
-            is_transfer = tx_obj.note != "Mining Reward" and (
-                tx_obj.sender == username or tx_obj.recipient == username
-            )
-            if is_transfer:
-                print(format_transaction(tx_obj.to_dict()))
-                found = True
+    for block, tx in iter_address_txs(username):
+        tx_obj = TXConfig.Transaction.from_dict(tx)
+        is_transfer = tx_obj.note != "Mining Reward" and (
+            tx_obj.sender == username or tx_obj.recipient == username
+        )
+        if is_transfer:
+            print(format_transaction(tx_obj.to_dict()))
+            found = True
     if not found:
         print("No transfer records found.")
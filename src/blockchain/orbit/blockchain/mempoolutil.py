@@ -0,0 +1,333 @@
+import time
+import heapq
+import atexit
+import itertools
+import functools
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from core.logutil import log_node_activity
+from core.serialutil import compact
+from core.index_util.txindex import tx_id
+from core.tx_util.tx_pipeline import validate_transactions, BALANCE_EPSILON
+
+# Blocks are sealed when this many transactions are waiting, or every
+# MEMPOOL_INTERVAL seconds, whichever comes first.
+MEMPOOL_MAX_BLOCK_TXS = 500
+MEMPOOL_INTERVAL = 2.0
+# Pending transactions are capped by encoded size; a replacement (same
+# sender and nonce) must raise the fee by at least MEMPOOL_RBF_BUMP.
+MEMPOOL_MAX_BYTES = 32 * 2**20
+MEMPOOL_RBF_BUMP = 0.10
+# How long commit() waits for a submitted group to be sealed.
+MEMPOOL_COMMIT_TIMEOUT = 60.0
+
+
+class PendingGroup:
+    """
+    Transactions that must land in the same block (a transfer and its gas
+    fee), with the future that reports the outcome to the submitter.
+    """
+    __slots__ = ("tx_id", "txs", "node_id", "fee", "timestamp", "future",
+                 "sender", "nonce", "spend", "size", "fee_rate")
+
+    def __init__(self, txs, node_id, fee):
+        self.tx_id = tx_id(txs[0])
+        self.txs = txs
+        self.node_id = node_id
+        self.fee = fee
+        self.timestamp = txs[0].get("timestamp", time.time())
+        self.future = Future()
+        self.sender = txs[0].get("sender")
+        self.nonce = None
+        self.spend = sum(_amount(tx.get("amount", 0)) for tx in txs if tx.get("sender") == self.sender)
+        self.size = sum(len(compact(tx)) for tx in txs)
+        self.fee_rate = fee / self.size
+
+    def fail(self, reason):
+        if not self.future.done():
+            self.future.set_exception(ValueError(reason))
+
+
+def _amount(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Mempool:
+    """
+    Pending transfers, bounded by encoded size.
+
+    Each sender's transfers form a queue numbered by a per-sender nonce and
+    are sealed strictly in that order; across senders the highest fee rate
+    (fee per encoded byte) goes first. Past max_bytes the lowest fee rate
+    group is evicted together with the sender's later groups, so a queue
+    never has gaps. Submitting with the nonce of a queued group replaces
+    it if the fee is at least MEMPOOL_RBF_BUMP higher.
+
+    Nonces and the pending-balance check only cover this process's
+    mempool: transfers queued by another process are not seen until they
+    are in a block.
+
+    seal_block(txs, node_id) receives transactions that have already been
+    validated together, in order.
+    """
+
+    def __init__(self, seal_block, max_block_txs=MEMPOOL_MAX_BLOCK_TXS, interval=MEMPOOL_INTERVAL,
+                 max_bytes=MEMPOOL_MAX_BYTES):
+        self.seal_block = seal_block
+        self.max_block_txs = max_block_txs
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.pending = {}
+        self.queues = defaultdict(list)
+        self.next_nonce = defaultdict(int)
+        # Amount each sender has queued or in a block being sealed.
+        self.spend = defaultdict(float)
+        self.size = 0
+        self.bytes = 0
+        self.evict_heap = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.seal_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def submit(self, txs, node_id, fee=0.0, nonce=None, balance=None):
+        """
+        Queues a group of transaction dicts. Returns (tx id, future); the
+        future resolves to the sealed block, or raises if the group is
+        rejected, replaced or evicted. Re-submitting a queued transaction
+        returns the original. Returns (None, reason) if the group is refused.
+
+        With `balance` (the sender's confirmed balance) the group is refused
+        if it would overspend together with the sender's pending transfers.
+        """
+        group = PendingGroup(txs, node_id, fee)
+        sender = group.sender
+        with self.lock:
+            existing = self.pending.get(group.tx_id)
+            if existing:
+                return existing.tx_id, existing.future
+
+            expected = self.next_nonce[sender]
+            nonce = expected if nonce is None else nonce
+            replaced = None
+            if nonce < expected:
+                replaced = self._queued(sender, nonce)
+                if replaced is None:
+                    return None, f"Nonce {nonce} already used"
+                if fee <= replaced.fee or fee < replaced.fee * (1 + MEMPOOL_RBF_BUMP):
+                    return None, "Replacement fee too low"
+            elif nonce > expected:
+                return None, f"Nonce gap: expected {expected}"
+
+            if balance is not None:
+                committed = self.spend[sender] - (replaced.spend if replaced else 0.0)
+                if committed + group.spend > balance + BALANCE_EPSILON:
+                    return None, "Insufficient balance (pending transfers)"
+
+            group.nonce = nonce
+            queue = self.queues[sender]
+            if replaced:
+                queue[nonce - queue[0].nonce] = group
+                self._drop(replaced)
+                replaced.fail("Replaced by a higher fee")
+                self._purge()
+            else:
+                queue.append(group)
+                self.next_nonce[sender] = nonce + 1
+            self._add(group)
+
+            if group in self._evict():
+                return None, "Mempool full: fee too low"
+            full = self.size >= self.max_block_txs
+        self._ensure_thread()
+        if full:
+            self.wakeup.set()
+        return group.tx_id, group.future
+
+    def _queued(self, sender, nonce):
+        queue = self.queues.get(sender)
+        if queue and queue[0].nonce <= nonce < queue[0].nonce + len(queue):
+            return queue[nonce - queue[0].nonce]
+        return None
+
+    def _add(self, group):
+        self.pending[group.tx_id] = group
+        self.size += len(group.txs)
+        self.bytes += group.size
+        self.spend[group.sender] += group.spend
+        heapq.heappush(self.evict_heap, (group.fee_rate, -group.timestamp, next(self.counter), group))
+
+    def _drop(self, group, keep_spend=False):
+        # Heap entries are left behind for _purge.
+        del self.pending[group.tx_id]
+        self.size -= len(group.txs)
+        self.bytes -= group.size
+        if not keep_spend:
+            self._release(group)
+
+    def _live(self, entry):
+        return self.pending.get(entry[-1].tx_id) is entry[-1]
+
+    def _purge(self):
+        # Sealed, replaced and evicted groups leave their entries in the
+        # eviction heap. Dead entries on top are popped; once they make up
+        # more than half the heap it is rebuilt from the live ones.
+        while self.evict_heap and not self._live(self.evict_heap[0]):
+            heapq.heappop(self.evict_heap)
+        if len(self.evict_heap) > 2 * len(self.pending):
+            self.evict_heap = [entry for entry in self.evict_heap if self._live(entry)]
+            heapq.heapify(self.evict_heap)
+
+    def _release(self, group):
+        self.spend[group.sender] -= group.spend
+        if self.spend[group.sender] <= BALANCE_EPSILON:
+            del self.spend[group.sender]
+
+    def _evict(self):
+        evicted = set()
+        while self.bytes > self.max_bytes and self.evict_heap:
+            entry = heapq.heappop(self.evict_heap)
+            if not self._live(entry):
+                continue
+            victim = entry[-1]
+            queue = self.queues[victim.sender]
+            cut = victim.nonce - queue[0].nonce
+            for group in queue[cut:]:
+                self._drop(group)
+                group.fail("Evicted: mempool full")
+                evicted.add(group)
+            del queue[cut:]
+            if not queue:
+                del self.queues[victim.sender]
+            # Later submissions take over the evicted nonces.
+            self.next_nonce[victim.sender] = victim.nonce
+        return evicted
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, name="mempool", daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Mempool] Seal failed: {e}")
+
+    def _take_batch(self):
+        # Highest fee rate among the senders' next groups, up to one block's
+        # worth. Taken groups keep their spend reserved until sealed.
+        with self.lock:
+            ready = [(-queue[0].fee_rate, queue[0].timestamp, next(self.counter), sender)
+                     for sender, queue in self.queues.items()]
+            heapq.heapify(ready)
+            taken = defaultdict(int)
+            batch, size = [], 0
+            while ready:
+                sender = heapq.heappop(ready)[-1]
+                queue = self.queues[sender]
+                group = queue[taken[sender]]
+                if batch and size + len(group.txs) > self.max_block_txs:
+                    break
+                batch.append(group)
+                size += len(group.txs)
+                taken[sender] += 1
+                if taken[sender] < len(queue):
+                    nxt = queue[taken[sender]]
+                    heapq.heappush(ready, (-nxt.fee_rate, nxt.timestamp, next(self.counter), sender))
+            for sender, count in taken.items():
+                queue = self.queues[sender]
+                for group in queue[:count]:
+                    self._drop(group, keep_spend=True)
+                del queue[:count]
+                if not queue:
+                    del self.queues[sender]
+            self._purge()
+        return batch
+
+    def flush(self):
+        """
+        Seals everything currently pending, one block per validator node
+        and at most max_block_txs transactions per block.
+        """
+        with self.seal_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                by_node = {}
+                for group in batch:
+                    by_node.setdefault(group.node_id, []).append(group)
+                try:
+                    for node_id, groups in by_node.items():
+                        self._seal(node_id, groups)
+                finally:
+                    with self.lock:
+                        for group in batch:
+                            self._release(group)
+                            group.fail("Mempool seal aborted")
+
+    def _seal(self, node_id, groups):
+        # Drop groups that fail validation against the block built so far,
+        # rather than letting one bad transfer reject the whole block.
+        txs = [tx for group in groups for tx in group.txs]
+        results = iter(validate_transactions(txs, token_balances=False))
+        accepted = []
+        for group in groups:
+            verdicts = [next(results) for _ in group.txs]
+            failed = [msg for ok, msg in verdicts if not ok]
+            if failed:
+                group.fail(failed[0])
+            else:
+                accepted.append(group)
+        if not accepted:
+            return
+
+        block = self.seal_block([tx for group in accepted for tx in group.txs], node_id)
+        for group in accepted:
+            if block:
+                group.future.set_result(block)
+            else:
+                group.future.set_exception(RuntimeError("Block was rejected by consensus"))
+        log_node_activity(node_id, "Mempool", f"Sealed {len(accepted)} of {len(groups)} pending transfers")
+
+
+_mempool = None
+_mempool_lock = threading.Lock()
+
+def get_mempool():
+    global _mempool
+    with _mempool_lock:
+        if _mempool is None:
+            from blockchain.blockutil import add_block
+            _mempool = Mempool(functools.partial(add_block, validated=True))
+            # Short-lived processes (CLI scripts) must not exit with transfers
+            # still queued.
+            atexit.register(_mempool.flush)
+    return _mempool
+
+def commit(txs, node_id, fee=0.0, balance=None, timeout=MEMPOOL_COMMIT_TIMEOUT):
+    """
+    Submits a group and waits for it to be sealed. Returns (block, None),
+    or (None, reason) if it was refused, rejected or is still pending after
+    `timeout` seconds.
+    """
+    tx_id, future = get_mempool().submit(txs, node_id, fee=fee, balance=balance)
+    if tx_id is None:
+        return None, future
+    try:
+        return future.result(timeout), None
+    except TimeoutError:
+        return None, f"Transfer {tx_id} is still pending"
+    except Exception as e:
+        return None, str(e)
@@ -1,8 +1,9 @@
 import time, math
 from core.tx_util.tx_types import TXTypes, TXExchange
-from core.ioutil import load_users, save_users, fetch_chain, get_address_from_label
+from core.ioutil import load_users, save_users, get_address_from_label
 from core.tokenmeta import get_token_meta
 from core.walletutil import load_balance
+from core.index_util.summary import get_chain_summary
 from config.configutil import MiningConfig
 from blockchain.tokenutil import send_orbit
 import asyncio
@@ -16,25 +17,6 @@ MODE = "mainnet"
 # Updated total supply to match genesis allocation (100B)
 TOTAL_MINING_SUPPLY = 1_000_000_000
 
-def get_chain_summary():
-    chain = fetch_chain()
-    tx_count = sum(len(b.get("transactions", [])) for b in chain)
-    account_set = set()
-    circulating = 0.0
-
-    for b in chain:
-        for tx in b.get("transactions", []):
-            account_set.add(tx["sender"])
-            account_set.add(tx["recipient"])
-            circulating += tx["amount"]
-
-    return {
-        "blocks": len(chain),
-        "transactions": tx_count,
-        "accounts": len(account_set),
-        "circulating": circulating
-    }
-
 def get_node_score(node_id):
     nodes = []
     for node in nodes:
@@ -5,10 +5,11 @@ import random
 from config.configutil import NodeConfig, OrbitDB
 from core.ioutil import load_nodes, save_nodes, session_util
 from core.logutil import log_node_activity
-from core.networkutil import send_block_to_node
+from core.networkutil import broadcast_block_to_urls
 
 orbit_db = OrbitDB()
 PENDING_PROPOSALS_FILE = orbit_db.pendpropdb
+MAX_PENDING_PROPOSALS = 256
 
 TRUST_BLACKLIST_THRESHOLD = 0.2
 
@@ -122,6 +123,9 @@ def save_pending_proposal(node_id, block_data):
         with open(PENDING_PROPOSALS_FILE, "r") as f:
             proposals = json.load(f)
     proposals[block_data["hash"]] = {"sender": node_id, "block": block_data}
+    # Keep only the newest proposals; older ones are stale by now anyway.
+    for stale in list(proposals)[:-MAX_PENDING_PROPOSALS]:
+        del proposals[stale]
     with open(PENDING_PROPOSALS_FILE, "w") as f:
         json.dump(proposals, f, indent=2)
 
@@ -130,24 +134,31 @@ def relay_pending_proposal(node_id, block_data):
     quorum = nodes.get(node_id, {}).get("quorum_slice", [])
     save_pending_proposal(node_id, block_data)
 
+    peers = {}
     for peer_id in quorum:
         peer_node = nodes.get(peer_id)
-        if not peer_node:
-            continue
-
-        address = peer_node.get("address")
-        success = False
-        attempt = 0
-        max_attempts = 3
-
-        while not success and attempt < max_attempts:
-            success = send_block_to_node(address, block_data)
-            attempt += 1
-            if not success:
-                time.sleep(2 ** attempt)  # exponential backoff
-
+        if peer_node:
+            peers[f"{peer_node.get('address')}/receive_block"] = peer_id
+
+    # Each round sends to every peer still missing the block at once, so the
+    # backoff is paid once per round rather than once per peer.
+    attempts = {url: 0 for url in peers}
+    pending = list(peers)
+    max_attempts = 3
+    for attempt in range(1, max_attempts + 1):
+        results = broadcast_block_to_urls(pending, block_data)
+        for url in pending:
+            attempts[url] = attempt
+        pending = [url for url, sent in results.items() if not sent]
+        if not pending:
+            break
+        if attempt < max_attempts:
+            time.sleep(2 ** attempt)  # exponential backoff
+
+    for url, peer_id in peers.items():
+        success = url not in pending
         log_node_activity(
             node_id,
             "relay",
-            f"Sent block to {peer_id} ({'✓' if success else 'x'}) after {attempt} attempt(s)"
+            f"Sent block to {peer_id} ({'✓' if success else 'x'}) after {attempts[url]} attempt(s)"
         )
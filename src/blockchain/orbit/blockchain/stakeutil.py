@@ -1,8 +1,8 @@
 import time
 from config.configutil import TXConfig, get_node_for_user
-from blockchain.blockutil import add_block
+from blockchain.mempoolutil import commit
 from blockchain.tokenutil import send_orbit
-from core.ioutil import fetch_chain, load_users, save_users, get_address_from_label
+from core.ioutil import fetch_chain, load_users, save_users, get_address_from_label, iter_transactions
 from core.tx_util.tx_types import TXTypes
 from core.walletutil import load_balance
 from core.logutil import log_event
@@ -15,47 +15,36 @@ NODE_FEE_ADDRESS = get_address_from_label("nodefeecollector")
 LOCK_UP_ADDRESS = get_address_from_label("lockup_rewards")
 
 def get_all_lockups():
-    chain = fetch_chain()
     lockups = []
     stakes = 0
-    for block in chain:
-        for tx in block['transactions']:
-            if tx["recipient"] == "lockup_rewards":
-                stakes += 1
-                lockups.append({
-                    "amount": tx["note"]["type"]["lockup"]["amount"],
-                    "days": tx["note"]["type"]["lockup"]["days"],
-                    "stakes": stakes
-                 })
+    for block, tx in iter_transactions(recipient="lockup_rewards"):
+        stakes += 1
+        lockups.append({
+            "amount": tx["note"]["type"]["lockup"]["amount"],
+            "days": tx["note"]["type"]["lockup"]["days"],
+            "stakes": stakes
+         })
     return lockups
 
 def get_user_lockups(username: str = "all"):
-    chain = fetch_chain()
     lockups = []
-
-    for block in chain:
-        for tx in block.get("transactions", []):
-            if tx.get("recipient") != "lockup_rewards":
-                continue
-
-            sender = tx.get("sender")
-
-            if username != "all" and sender != username:
-                continue
-
-            try:
-                note = tx.get("note", {})
-                lock = note.get("type", {}).get("lockup", {})
-                lockups.append({
-                    "amount": lock.get("amount"),
-                    "start": lock.get("start"),
-                    "end": lock.get("end"),
-                    "days": lock.get("days"),
-                    "uuid": lock.get("uuid"),
-                    "user": sender  # useful when "all" is selected
-                })
-            except Exception:
-                continue
+    sender_filter = None if username == "all" else username
+
+    for block, tx in iter_transactions(sender=sender_filter, recipient="lockup_rewards"):
+        sender = tx.get("sender")
+        try:
+            note = tx.get("note", {})
+            lock = note.get("type", {}).get("lockup", {})
+            lockups.append({
+                "amount": lock.get("amount"),
+                "start": lock.get("start"),
+                "end": lock.get("end"),
+                "days": lock.get("days"),
+                "uuid": lock.get("uuid"),
+                "user": sender  # useful when "all" is selected
+            })
+        except Exception:
+            continue
 
     return lockups
 
@@ -99,18 +88,15 @@ def check_claim(username):
         user = users[username]
         user_lockups = get_user_lockups(username)
         now = int(time.time())
-        chain = fetch_chain()
         node_id = get_node_for_user(username)
 
         claim_map = {}
-        for block in chain:
-            for tx in block.get("transactions", []):
-                if tx.get("recipient") == username and tx.get("sender") == "lockup_rewards":
-                    note = tx.get("note", {})
-                    if isinstance(note, dict) and "start" in note and "end" in note:
-                        lock_start = str(note["start"])
-                        prev_claim = claim_map.get(lock_start, 0)
-                        claim_map[lock_start] = max(prev_claim, note["end"])
+        for block, tx in iter_transactions(sender="lockup_rewards", recipient=username):
+            note = tx.get("note", {})
+            if isinstance(note, dict) and "start" in note and "end" in note:
+                lock_start = str(note["start"])
+                prev_claim = claim_map.get(lock_start, 0)
+                claim_map[lock_start] = max(prev_claim, note["end"])
 
         matured_total = 0.0
         total_reward = 0.0
@@ -256,8 +242,14 @@ def withdraw_lockup(username):
         timestamp=now
     ).to_dict())
 
-    # Write to chain
-    add_block(txs, node_id)
+    # Write to chain; users.json only changes once the block is in. The
+    # mempool's pending-spend check covers this process only, so a second
+    # process withdrawing the same lockups is caught by nothing but the
+    # chain itself.
+    block, error = commit(txs, node_id, fee=fee)
+    if not block:
+        print(f"Withdrawal failed: {error}")
+        return
 
     # Update user state
     user["locked"] = remaining_locked
@@ -278,18 +270,15 @@ def claim_lockup_rewards(username, relock_duration=None):
         user = users[username]
         user_lockups = get_user_lockups(username)
         now = int(time.time())
-        chain = fetch_chain()
         node_id = get_node_for_user(username)
 
         claim_map = {}
-        for block in chain:
-            for tx in block.get("transactions", []):
-                if tx.get("recipient") == username and tx.get("sender") == "lockup_rewards":
-                    note = tx.get("note", {})
-                    if isinstance(note, dict) and "start" in note and "end" in note:
-                        lock_start = str(note["start"])
-                        prev_claim = claim_map.get(lock_start, 0)
-                        claim_map[lock_start] = max(prev_claim, note["end"])
+        for block, tx in iter_transactions(sender="lockup_rewards", recipient=username):
+            note = tx.get("note", {})
+            if isinstance(note, dict) and "start" in note and "end" in note:
+                lock_start = str(note["start"])
+                prev_claim = claim_map.get(lock_start, 0)
+                claim_map[lock_start] = max(prev_claim, note["end"])
 
         matured_total = 0.0
         total_reward = 0.0
@@ -360,7 +349,9 @@ def claim_lockup_rewards(username, relock_duration=None):
                 note=tx_fee.gas_tx(),
                 timestamp=now
             ).to_dict())
-            add_block(reward_txs, node_id)
+            block, error = commit(reward_txs, node_id, fee=node_fee)
+            if not block:
+                return {"status": "error", "message": f"Reward claim failed: {error}"}
 
         result = {
             "status": "success",
@@ -389,8 +380,15 @@ def claim_lockup_rewards(username, relock_duration=None):
                         note={"duration": relock_duration},
                         timestamp=time.time()
                     )
-                    add_block([relock_tx.to_dict()])
-                    result["relock_status"] = f"Re-locked {net_reward:.6f} Orbit for {relock_duration} days"
+                    block, error = commit([relock_tx.to_dict()], node_id)
+                    if block:
+                        result["relock_status"] = f"Re-locked {net_reward:.6f} Orbit for {relock_duration} days"
+                    else:
+                        # The reward is already paid out, so it stays spendable.
+                        users = load_users()
+                        users[username]["balance"] += net_reward
+                        save_users(users)
+                        result["relock_status"] = f"Re-lock failed: {error}; reward credited to balance"
             except Exception as e:
                 result["relock_status"] = f"Re-lock failed: {str(e)}"
         elif net_reward > 0:
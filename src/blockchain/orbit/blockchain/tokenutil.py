@@ -1,7 +1,7 @@
 import time
 from core.walletutil import load_balance
 from core.ioutil import get_address_from_label
-from blockchain.blockutil import add_block
+from blockchain.mempoolutil import get_mempool
 from config.configutil import TXConfig, get_node_for_user
 from core.tx_util.tx_types import TXTypes
 
@@ -10,23 +10,28 @@ FEE_RATE = 0.02
 NODE_FEE_ADDRESS = get_address_from_label("nodefeecollector")
 
 def send_orbit(sender, recipient, amount, order=None):
+    """
+    Queues a transfer and its gas fee in the mempool. Returns (tx id,
+    future) where the future resolves to the block that includes it, or
+    (None, reason) if the transfer was refused up front.
+    """
 
     if recipient == "ORB.BURN":
         recipient = "ORB.00000000000000000000BURN"
         print("Sending Orbit to burn address.")
 
     if len(sender) != 28 or len(recipient) != 28:
-        return
+        return None, "Invalid address"
 
     if recipient == sender:
         print("You cannot send Orbit to yourself.")
-        return
+        return None, "You cannot send Orbit to yourself."
 
     try:
         amount = float(amount)
         if amount < MIN_TRANSFER_AMOUNT:
             print(f"Minimum transfer is {MIN_TRANSFER_AMOUNT} Orbit.")
-            return
+            return None, f"Minimum transfer is {MIN_TRANSFER_AMOUNT} Orbit."
 
         available, _ = load_balance(sender)
         fee = round(amount * FEE_RATE, 6)
@@ -34,7 +39,7 @@ def send_orbit(sender, recipient, amount, order=None):
 
         if total > available:
             print(f"Insufficient balance. Required: {total:.6f}, Available: {available:.6f}")
-            return
+            return None, "Insufficient balance."
 
         current_time = time.time()
         user_node = get_node_for_user(sender)
@@ -57,8 +62,9 @@ def send_orbit(sender, recipient, amount, order=None):
 
         )
 
-
-        add_block([tx1.to_dict(), tx2.to_dict()], user_node)
-        return "success", "dummy"
+        # The mempool checks the balance again against the sender's other
+        # pending transfers, atomically with queueing this one.
+        return get_mempool().submit([tx1.to_dict(), tx2.to_dict()], user_node, fee=fee, balance=available)
     except ValueError:
         print("Invalid amount input.")
+        return None, "Invalid amount input."
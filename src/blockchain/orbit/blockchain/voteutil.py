@@ -1,7 +1,8 @@
 import time
+import json
 from config.configutil import OrbitDB
 from core.logutil import log_node_activity
-from core.ioutil import fetch_chain, save_chain, get_address_from_label
+from core.ioutil import save_chain, get_address_from_label, iter_blocks
 
 VOTE_TYPES = ["nominate", "vote", "accept", "confirm"]
 NODE_FEE_ADDRESS = get_address_from_label("nodefeecollector")
@@ -31,10 +32,10 @@ def record_vote(node_id, block_hash, state):
     return True
 
 def get_votes(block_hash, state=None):
-    chain = fetch_chain()
     result = []
 
-    for block in chain:
+    # Only blocks mentioning the hash are decoded.
+    for block in iter_blocks(needles=[[json.dumps(block_hash).encode()]]):
         for tx in block.get("transactions", []):
             vote = tx.get("type", {}).get("vote")
             if vote and vote.get("block_hash") == block_hash:
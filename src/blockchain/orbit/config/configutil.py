@@ -2,6 +2,7 @@ import os
 import json
 import time
 import hashlib
+from operator import attrgetter
 
 DATA_DIR = "data"
 if not os.path.exists(DATA_DIR):
@@ -19,6 +20,9 @@ class OrbitDB:
         self.walletmapping = os.path.join(DATA_DIR, "wallet_mapping.json")
         self.NodeRegistry = {}
         self.explorer = 'http://127.0.0.1:7000'
+        # Block store durability: "always", "interval" (every chainsyncms) or "os"
+        self.chainsync = os.getenv("ORBIT_CHAIN_SYNC", "interval")
+        self.chainsyncms = int(os.getenv("ORBIT_CHAIN_SYNC_MS", "100"))
 
 class MiningConfig:
     def __init__(self):
@@ -76,43 +80,129 @@ class NodeConfig:
         return address in self.users
 
 
+TX_FIELDS = frozenset(("sender", "recipient", "amount", "tx_type", "timestamp", "note"))
+
+
+def _serialized_field(name):
+    # Reads are a plain slot lookup; assigning drops the memoized encodings.
+    slot = "_" + name
+
+    def assign(tx, value):
+        setattr(tx, slot, value)
+        tx._canonical = tx._compact = tx._digest = None
+
+    return property(attrgetter(slot), assign)
+
+
 class TXConfig:
     class Transaction:
+        # Slotted: no per-instance __dict__, and `extra` only exists for the
+        # rare transaction that carries fields beyond the standard five.
+        __slots__ = ("_sender", "_recipient", "_amount", "_timestamp", "_note", "_extra",
+                     "_canonical", "_compact", "_digest")
+
+        sender = _serialized_field("sender")
+        recipient = _serialized_field("recipient")
+        amount = _serialized_field("amount")
+        timestamp = _serialized_field("timestamp")
+        note = _serialized_field("note")
+
         def __init__(self, sender, recipient, amount, timestamp=None, note="", **kwargs):
-            self.sender = sender
-            self.recipient = recipient
-            self.amount = amount
-            self.timestamp = timestamp or time.time()
-            self.note = note if note is not None else {}
-            self.extra = kwargs  # Any additional fields
+            self._sender = sender
+            self._recipient = recipient
+            self._amount = amount
+            self._timestamp = timestamp or time.time()
+            self._note = note if note is not None else {}
+            self._extra = kwargs or None  # Any additional fields
+            self._canonical = None
+            self._compact = None
+            self._digest = None
+
+        @property
+        def extra(self):
+            # Handed out for mutation, so the memoized encodings go too.
+            if self._extra is None:
+                self._extra = {}
+            self._canonical = self._compact = self._digest = None
+            return self._extra
+
+        @property
+        def note_type(self):
+            """
+            Name of the structured payload under note["type"] (e.g. "lockup",
+            "token_transfer"), or None for plain-text notes.
+            """
+            kinds = self.note.get("type") if isinstance(self.note, dict) else None
+            if isinstance(kinds, dict):
+                return next(iter(kinds), None)
+            return None
+
+        def payload(self, kind=None):
+            """
+            The note.type.<kind> payload, resolved on access rather than copied
+            when the transaction is built. Defaults to the first (usually only)
+            kind.
+            """
+            kinds = self.note.get("type") if isinstance(self.note, dict) else None
+            if not isinstance(kinds, dict):
+                return None
+            if kind is None:
+                kind = next(iter(kinds), None)
+            return kinds.get(kind)
 
         def to_dict(self):
             tx = {
-                "sender": self.sender,
-                "recipient": self.recipient,
-                "amount": self.amount,
-                "timestamp": self.timestamp,
-                "note": self.note
+                "sender": self._sender,
+                "recipient": self._recipient,
+                "amount": self._amount,
+                "timestamp": self._timestamp,
+                "note": self._note
             }
-            tx.update(self.extra)
+            if self._extra:
+                tx.update(self._extra)
             return tx
 
+        # Encodings are memoized until a serialized field is reassigned.
+        # Changes made inside `note` in place are not seen: assign a new note
+        # instead, e.g. tx.note = {**tx.note, "signature": sig}.
+        def canonical(self):
+            if self._canonical is None:
+                self._canonical = json.dumps(self.to_dict(), sort_keys=True).encode()
+            return self._canonical
+
+        def compact(self):
+            if self._compact is None:
+                self._compact = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":")).encode()
+            return self._compact
+
+        def digest(self):
+            if self._digest is None:
+                self._digest = hashlib.sha256(self.canonical()).digest()
+            return self._digest
+
         @staticmethod
         def from_dict(data):
-            return TXConfig.Transaction(
+            tx = TXConfig.Transaction(
                 sender=data.get("sender", ""),
                 recipient=data.get("recipient", ""),
                 amount=data.get("amount", 0),
                 timestamp=data.get("timestamp", time.time()),
-                note=data.get("note", ""),
-                **{k: v for k, v in data.items() if k not in {"sender", "recipient", "amount", "tx_type", "timestamp", "note"}}
+                note=data.get("note", "")
             )
+            # Nearly every transaction has only the standard fields, so skip
+            # building an extras dict unless there is something to put in it.
+            if not data.keys() <= TX_FIELDS:
+                tx._extra = {k: v for k, v in data.items() if k not in TX_FIELDS}
+            return tx
 
     class Block:
+        __slots__ = ("index", "timestamp", "_transactions", "previous_hash", "hash", "validator",
+                     "signatures", "merkle_root", "nonce", "metadata")
+
         def __init__(self, index, timestamp, transactions, previous_hash, hash, validator, signatures, merkle_root, nonce, metadata=None):
             self.index = index
             self.timestamp = timestamp
-            self.transactions = transactions
+            self._transactions = transactions
             self.previous_hash = previous_hash
             self.hash = hash
             self.validator = validator
@@ -121,11 +211,32 @@ class TXConfig:
             self.nonce = nonce
             self.metadata = metadata or {}
 
+        @property
+        def transactions(self):
+            # Blocks loaded with from_dict keep their transaction dicts and only
+            # wrap them in Transaction objects when somebody asks for them.
+            txs = self._transactions
+            if txs and not all(isinstance(tx, TXConfig.Transaction) for tx in txs):
+                txs = self._transactions = [
+                    tx if isinstance(tx, TXConfig.Transaction) else TXConfig.Transaction.from_dict(tx)
+                    for tx in txs
+                ]
+            return txs
+
+        @transactions.setter
+        def transactions(self, transactions):
+            self._transactions = transactions
+
+        @property
+        def transaction_data(self):
+            # Transactions as stored: dicts and/or Transaction objects.
+            return self._transactions
+
         def to_dict(self):
             return {
                 "index": self.index,
                 "timestamp": self.timestamp,
-                "transactions": [tx.to_dict() if hasattr(tx, "to_dict") else tx for tx in self.transactions],
+                "transactions": [tx.to_dict() if hasattr(tx, "to_dict") else tx for tx in self._transactions],
                 "previous_hash": self.previous_hash,
                 "hash": self.hash,
                 "validator": self.validator,
@@ -137,12 +248,10 @@ class TXConfig:
 
         @staticmethod
         def from_dict(data):
-            txs = data.get("transactions", [])
-            tx_objs = [TXConfig.Transaction.from_dict(tx) for tx in txs]
             return TXConfig.Block(
                 index=data.get("index"),
                 timestamp=data.get("timestamp"),
-                transactions=tx_objs,
+                transactions=list(data.get("transactions", [])),
                 previous_hash=data.get("previous_hash"),
                 hash=data.get("hash"),
                 validator=data.get("validator", ""),
@@ -153,14 +262,19 @@ class TXConfig:
             )
 
         def generate_merkle_root(self):
-            tx_hashes = [hashlib.sha256(json.dumps(tx.to_dict(), sort_keys=True).encode()).hexdigest()
-                         for tx in self.transactions]
-            while len(tx_hashes) > 1:
-                if len(tx_hashes) % 2 == 1:
-                    tx_hashes.append(tx_hashes[-1])
-                tx_hashes = [hashlib.sha256((tx_hashes[i] + tx_hashes[i + 1]).encode()).hexdigest()
-                             for i in range(0, len(tx_hashes), 2)]
-            return tx_hashes[0] if tx_hashes else ""
+            from core.hashutil import merkle_root
+            return merkle_root(self.transactions)
+
+        def calculate_hash(self):
+            from core.hashutil import calculate_hash
+            return calculate_hash(
+                self.index, self.previous_hash, self.timestamp, self.transactions,
+                self.validator, self.merkle_root, self.nonce, self.metadata
+            )
+
+        def encode(self):
+            from core.serialutil import encode_block
+            return encode_block(self)
 
 
 def get_node_for_user(user_id):
@@ -0,0 +1,584 @@
+import os
+import json
+import time
+import zlib
+import struct
+import threading
+from contextlib import contextmanager
+from core import serialutil
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Blocks are stored one JSON record per line in fixed-size segment files.
+# A fixed-width index maps height -> (segment, offset, length) so a block
+# can be located with a single seek instead of parsing the whole history.
+SEGMENT_SIZE = 10_000
+INDEX_FILE = "index.bin"
+INDEX_RECORD = struct.Struct("<IQI")
+LOCK_FILE = "store.lock"
+# A counter bumped by every write, so readers can tell the store changed
+# even when a rewrite leaves the index the same size.
+GENERATION_FILE = "generation"
+GENERATION = struct.Struct("<Q")
+LOCK_TIMEOUT = 5
+LOCK_POLL = 0.01
+
+# Every write is first appended to a write-ahead journal as
+# (magic, height, payload length, crc32) + encoded blocks, meaning "blocks
+# [height:] are exactly these". Records are idempotent, so recovery simply
+# replays the intact ones and drops a torn tail. The journal is cleared at
+# checkpoints, once segments and index have been fsynced.
+JOURNAL_FILE = "journal.log"
+JOURNAL_HEADER = struct.Struct("<4sQII")
+JOURNAL_MAGIC = b"OJR1"
+JOURNAL_CHECKPOINT = 4 * 1024 * 1024
+
+# always:   fsync the journal on every write
+# interval: fsync the journal at most every `sync_ms` milliseconds, and no
+#           later than `sync_ms` after a write
+# os:       leave flushing to the OS
+SYNC_POLICIES = ("always", "interval", "os")
+
+
+def store_path(chain_file):
+    """
+    Maps a legacy chain file (e.g. data/orbit_chain.json) to the directory
+    holding its segmented block store (data/orbit_chain.blocks).
+    """
+    base, ext = os.path.splitext(chain_file)
+    if ext != ".json":
+        base = chain_file
+    return base + ".blocks"
+
+
+def encode_block(block):
+    return serialutil.encode_block(block) + b"\n"
+
+
+def decode_block(raw):
+    return json.loads(raw)
+
+
+def _fsync_path(path, directory=False):
+    flags = os.O_RDONLY if directory else os.O_RDWR
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Directories cannot be fsynced on every platform.
+    finally:
+        os.close(fd)
+
+
+class StoreLockTimeout(TimeoutError):
+    pass
+
+
+class StoreConflict(ValueError):
+    """
+    Raised when appended blocks do not extend the stored tip.
+    """
+
+
+class StoreLock:
+    """
+    Readers/writer lock shared by every process using a store, built on
+    flock(2) so the kernel drops it when the holder exits: a crashed writer
+    can never leave a stale lock behind. Re-entrant per thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        # Without flock (Windows) fall back to a process-local lock.
+        self.fallback = threading.RLock()
+
+    def _try_flock(self, f, exclusive):
+        mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(f, mode | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _acquire(self, exclusive, timeout):
+        if fcntl is None:
+            if not self.fallback.acquire(timeout=timeout):
+                raise StoreLockTimeout(f"Timed out waiting for {self.path}")
+            return None
+        # A fresh open file description per acquisition, so threads of the
+        # same process contend with each other like separate processes do.
+        f = open(self.path, "a+b")
+        deadline = time.monotonic() + timeout
+        while not self._try_flock(f, exclusive):
+            if time.monotonic() > deadline:
+                f.close()
+                raise StoreLockTimeout(f"Timed out waiting for {self.path}")
+            time.sleep(LOCK_POLL)
+        return f
+
+    def _release(self, f):
+        if f is None:
+            self.fallback.release()
+            return
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+    @contextmanager
+    def hold(self, exclusive=False, timeout=LOCK_TIMEOUT):
+        held = getattr(self.local, "mode", None)
+        if held == "ex" or (held == "sh" and not exclusive):
+            yield
+            return
+        if held == "sh":
+            raise RuntimeError("Cannot upgrade a shared store lock to exclusive")
+
+        f = self._acquire(exclusive, timeout)
+        self.local.mode = "ex" if exclusive else "sh"
+        try:
+            yield
+        finally:
+            self.local.mode = None
+            self._release(f)
+
+    def shared(self, timeout=LOCK_TIMEOUT):
+        return self.hold(False, timeout)
+
+    def exclusive(self, timeout=LOCK_TIMEOUT):
+        return self.hold(True, timeout)
+
+
+class BlockStore:
+    def __init__(self, root, sync="interval", sync_ms=100):
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy '{sync}', expected one of {SYNC_POLICIES}")
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.journal_path = os.path.join(root, JOURNAL_FILE)
+        self.generation_path = os.path.join(root, GENERATION_FILE)
+        self.sync = sync
+        self.sync_interval = sync_ms / 1000
+        self.last_sync = 0.0
+        self.sync_timer = None
+        self.sync_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        if not os.path.exists(self.index_path):
+            open(self.index_path, "ab").close()
+        if not os.path.exists(self.generation_path):
+            with open(self.generation_path, "ab") as f:
+                if not f.tell():
+                    f.write(GENERATION.pack(0))
+        self.lock = StoreLock(os.path.join(root, LOCK_FILE))
+        self.recover()
+
+    # ===================== INDEX =====================
+
+    def height(self):
+        return os.path.getsize(self.index_path) // INDEX_RECORD.size
+
+    def generation(self):
+        with open(self.generation_path, "rb") as f:
+            data = f.read(GENERATION.size)
+        return GENERATION.unpack(data)[0] if len(data) == GENERATION.size else 0
+
+    def _bump_generation(self):
+        # Rewritten in place, so readers see either the old or the new count.
+        generation = self.generation() + 1
+        with open(self.generation_path, "r+b") as f:
+            f.write(GENERATION.pack(generation))
+        return generation
+
+    def _segment_path(self, segment):
+        return os.path.join(self.root, f"seg_{segment:06d}.jsonl")
+
+    def _read_index(self, start, end):
+        if end <= start:
+            return []
+        with open(self.index_path, "rb") as f:
+            f.seek(start * INDEX_RECORD.size)
+            data = f.read((end - start) * INDEX_RECORD.size)
+        return [entry for entry in INDEX_RECORD.iter_unpack(data)]
+
+    def _clamp(self, start, end):
+        height = self.height()
+        start = max(0, start or 0)
+        end = height if end is None else max(0, min(end, height))
+        return start, end
+
+    # ===================== READS =====================
+
+    def get(self, height):
+        with self.lock.shared():
+            stored = self.height()
+            position = height + stored if height < 0 else height
+            if not 0 <= position < stored:
+                raise IndexError(f"Block {height} out of range for a store of {stored} blocks")
+            segment, offset, length = self._read_index(position, position + 1)[0]
+            with open(self._segment_path(segment), "rb") as f:
+                f.seek(offset)
+                raw = f.read(length)
+        return decode_block(raw)
+
+    def last(self):
+        with self.lock.shared():
+            return self.get(-1) if self.height() else None
+
+    def _read_records(self, entries, handles):
+        records = []
+        for segment, offset, length in entries:
+            f = handles.get(segment)
+            if f is None:
+                f = handles[segment] = open(self._segment_path(segment), "rb")
+            f.seek(offset)
+            records.append(f.read(length))
+        return records
+
+    def read_range(self, start=0, end=None):
+        handles = {}
+        try:
+            with self.lock.shared():
+                start, end = self._clamp(start, end)
+                records = self._read_records(self._read_index(start, end), handles)
+        finally:
+            for f in handles.values():
+                f.close()
+        return [decode_block(raw) for raw in records]
+
+    def iter_range(self, start=0, end=None, reverse=False, needles=None, batch=256):
+        """
+        Lazily yields blocks in [start, end), reading the index `batch`
+        entries at a time. `needles` is a list of alternatives, e.g.
+        [[b'"sell_token"', b'"buy_token"'], [b'"ORB.X"']]: a block is only
+        decoded if its raw record contains at least one needle of each group.
+        """
+        start, end = self._clamp(start, end)
+        if reverse:
+            bounds = ((max(start, hi - batch), hi) for hi in range(end, start, -batch))
+        else:
+            bounds = ((lo, min(end, lo + batch)) for lo in range(start, end, batch))
+
+        handles = {}
+        try:
+            for lo, hi in bounds:
+                # The shared lock is held per batch, never across a yield, so
+                # a slow consumer cannot starve writers.
+                with self.lock.shared():
+                    # The chain may have been truncated since we started.
+                    hi = min(hi, self.height())
+                    records = self._read_records(self._read_index(lo, hi), handles)
+                if reverse:
+                    records.reverse()
+                for raw in records:
+                    if needles and not all(any(n in raw for n in group) for group in needles):
+                        continue
+                    yield decode_block(raw)
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def tail(self, count):
+        with self.lock.shared():
+            height = self.height()
+            return self.read_range(max(0, height - count), height)
+
+    def read_all(self):
+        return self.read_range(0, None)
+
+    # ===================== WRITES =====================
+
+    def append(self, block):
+        return self.append_many([block])
+
+    def append_many(self, blocks):
+        with self.lock.exclusive():
+            height = self.height()
+            self._check_links(height, blocks)
+            return self._commit(height, blocks)
+
+    def _check_links(self, height, blocks):
+        # Appends must continue the stored chain; anything else goes
+        # through replace() or truncate().
+        previous = self.get(height - 1).get("hash") if height else None
+        for offset, block in enumerate(blocks):
+            index = block.get("index")
+            if index is not None and index != height + offset:
+                raise StoreConflict(f"Block index {index} does not extend a store of {height + offset} blocks")
+            if height + offset and block.get("previous_hash") != previous:
+                raise StoreConflict(f"Block {height + offset} does not link to the stored tip")
+            previous = block.get("hash")
+
+    def truncate(self, height):
+        with self.lock.exclusive():
+            current = self.height()
+            if height >= current:
+                return current
+            return self._commit(max(0, height), [])
+
+    def replace(self, chain, window=64):
+        """
+        Makes the store match `chain`, reusing the longest prefix already on
+        disk so that the common case (chain grew by a block) is an append.
+        """
+        with self.lock.exclusive():
+            common = self._common_prefix(chain, window)
+            return self._commit(common, chain[common:])
+
+    def _commit(self, height, blocks):
+        records = [encode_block(block) for block in blocks]
+        self._journal_append(height, records)
+        height = self._apply(height, records)
+        if os.path.getsize(self.journal_path) >= JOURNAL_CHECKPOINT:
+            self._checkpoint()
+        return height
+
+    def _apply(self, height, records):
+        self._truncate(height)
+        height = self._append_records(records)
+        self._bump_generation()
+        return height
+
+    def _append_records(self, records):
+        height = self.height()
+        entries = []
+        f, segment = None, None
+        try:
+            for raw in records:
+                if height // SEGMENT_SIZE != segment:
+                    if f:
+                        f.close()
+                    segment = height // SEGMENT_SIZE
+                    f = open(self._segment_path(segment), "ab")
+                offset = f.tell()
+                f.write(raw)
+                entries.append(INDEX_RECORD.pack(segment, offset, len(raw)))
+                height += 1
+        finally:
+            if f:
+                f.close()
+
+        if entries:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(entries))
+        return height
+
+    def _truncate(self, height):
+        current = self.height()
+        if height >= current:
+            return current
+        height = max(0, height)
+        entries = self._read_index(height, height + 1)
+        segment, offset, _ = entries[0]
+
+        # Shrink the index first so it never points past the segment data.
+        with open(self.index_path, "r+b") as f:
+            f.truncate(height * INDEX_RECORD.size)
+
+        with open(self._segment_path(segment), "r+b") as f:
+            f.truncate(offset)
+        self._remove_segments_after(segment)
+        return height
+
+    def _remove_segments_after(self, segment):
+        for name in os.listdir(self.root):
+            if name.startswith("seg_") and name.endswith(".jsonl"):
+                try:
+                    number = int(name[4:-6])
+                except ValueError:
+                    continue
+                if number > segment:
+                    os.remove(os.path.join(self.root, name))
+
+    # ===================== JOURNAL =====================
+
+    def _journal_append(self, height, records):
+        payload = b"".join(records)
+        header = JOURNAL_HEADER.pack(JOURNAL_MAGIC, height, len(payload), zlib.crc32(payload))
+        with open(self.journal_path, "ab") as f:
+            f.write(header + payload)
+            f.flush()
+            now = time.monotonic()
+            if self.sync == "always" or (
+                self.sync == "interval" and now - self.last_sync >= self.sync_interval
+            ):
+                os.fsync(f.fileno())
+                self.last_sync = now
+            elif self.sync == "interval":
+                self._schedule_sync(self.sync_interval - (now - self.last_sync))
+
+    def _schedule_sync(self, delay):
+        # Bounds how long a write can sit unsynced when no later write comes
+        # along to trigger the fsync.
+        with self.sync_lock:
+            if self.sync_timer is None:
+                self.sync_timer = threading.Timer(max(0.0, delay), self._deferred_sync)
+                self.sync_timer.daemon = True
+                self.sync_timer.start()
+
+    def _deferred_sync(self):
+        with self.sync_lock:
+            self.sync_timer = None
+        _fsync_path(self.journal_path)
+        self.last_sync = time.monotonic()
+
+    def _journal_records(self, report=True):
+        """
+        Yields (height, records) for every intact journal entry, stopping at
+        the first torn or corrupt one.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb") as f:
+            while True:
+                header = f.read(JOURNAL_HEADER.size)
+                if len(header) < JOURNAL_HEADER.size:
+                    return
+                magic, height, length, crc = JOURNAL_HEADER.unpack(header)
+                payload = f.read(length)
+                if magic != JOURNAL_MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+                    if report:
+                        print(f"[BlockStore] Discarding torn journal tail in {self.root}")
+                    return
+                yield height, [line + b"\n" for line in payload.split(b"\n")[:-1]]
+
+    def flush(self):
+        with self.lock.exclusive():
+            self._checkpoint()
+
+    def _checkpoint(self):
+        # Make everything the journal covers durable, then drop the journal.
+        first_segment = None
+        for height, _ in self._journal_records(report=False):
+            segment = height // SEGMENT_SIZE
+            first_segment = segment if first_segment is None else min(first_segment, segment)
+        height = self.height()
+        if first_segment is not None and self.sync != "os":
+            last_segment = max(0, height - 1) // SEGMENT_SIZE
+            for segment in range(first_segment, last_segment + 1):
+                _fsync_path(self._segment_path(segment))
+            _fsync_path(self.index_path)
+            _fsync_path(self.root, directory=True)
+        with open(self.journal_path, "wb") as f:
+            if self.sync != "os":
+                os.fsync(f.fileno())
+        self.last_sync = time.monotonic()
+
+    def _journal_effect(self):
+        """
+        Folds the journal into a single (base, records) pair: after replay,
+        blocks [base:] of the store must be exactly `records`.
+        """
+        base, tail = None, []
+        for height, records in self._journal_records():
+            if base is None or height < base:
+                base, tail = height, list(records)
+            elif height <= base + len(tail):
+                tail = tail[:height - base] + records
+            else:
+                print(f"[BlockStore] Journal entry at {height} leaves a gap; stopping replay")
+                break
+        return base, tail
+
+    def recover(self):
+        """
+        Brings the store back to a consistent state after a crash: drops a
+        partial index record and index entries pointing past their segment,
+        replays the journal entries the store does not already hold, trims
+        unindexed segment bytes and checkpoints after a replay.
+        """
+        with self.lock.exclusive():
+            size = os.path.getsize(self.index_path)
+            if size % INDEX_RECORD.size:
+                with open(self.index_path, "r+b") as f:
+                    f.truncate(size - size % INDEX_RECORD.size)
+
+            height = self.height()
+            while height:
+                segment, offset, length = self._read_index(height - 1, height)[0]
+                path = self._segment_path(segment)
+                if os.path.exists(path) and os.path.getsize(path) >= offset + length:
+                    break
+                height -= 1
+            if height < self.height():
+                with open(self.index_path, "r+b") as f:
+                    f.truncate(height * INDEX_RECORD.size)
+                self._bump_generation()
+
+            base, records = self._journal_effect()
+            replayed = False
+            if base is not None and base <= self.height():
+                committed = self._committed(base, records)
+                if committed < len(records) or self.height() != base + len(records):
+                    self._apply(base + committed, records[committed:])
+                    replayed = True
+            elif base is not None:
+                print(f"[BlockStore] Journal starts at {base} but only {self.height()} blocks survived; not replaying")
+
+            height = self.height()
+            if height:
+                segment, offset, length = self._read_index(height - 1, height)[0]
+                path = self._segment_path(segment)
+                if os.path.getsize(path) > offset + length:
+                    with open(path, "r+b") as f:
+                        f.truncate(offset + length)
+            else:
+                segment = -1
+            self._remove_segments_after(segment)
+
+            if replayed:
+                self._checkpoint()
+            return replayed
+
+    def _committed(self, base, records):
+        """
+        How many of the journal's records (blocks [base:]) are already in the
+        store, byte for byte. Read-only, so reopening a clean store rewrites
+        nothing.
+        """
+        entries = self._read_index(base, min(self.height(), base + len(records)))
+        handles = {}
+        try:
+            stored = self._read_records(entries, handles)
+        finally:
+            for f in handles.values():
+                f.close()
+        count = 0
+        for raw, record in zip(stored, records):
+            if raw != record:
+                break
+            count += 1
+        return count
+
+    def _common_prefix(self, chain, window):
+        end = min(self.height(), len(chain))
+        while end:
+            start = max(0, end - window)
+            stored = self.read_range(start, end)
+            for i in range(end - 1, start - 1, -1):
+                if stored[i - start].get("hash") == chain[i].get("hash"):
+                    return i + 1
+            end = start
+        return 0
+
+    # ===================== JSON COMPAT =====================
+
+    def import_json(self, chain_file):
+        with open(chain_file, "r") as f:
+            chain = json.load(f)
+        with self.lock.exclusive():
+            height = self._commit(0, chain)
+            self._checkpoint()
+            return height
+
+    def export_json(self, chain_file):
+        tmp = chain_file + ".tmp"
+        chain = self.read_all()
+        with open(tmp, "w") as f:
+            json.dump(chain, f, indent=4)
+        os.replace(tmp, chain_file)
+        return chain_file
@@ -0,0 +1,193 @@
+import threading
+import requests
+from core.ioutil import CHAIN_FILE, EXPLORER, get_block_store
+from core.index_util.txindex import get_tx_index, tx_id
+from core.index_util.addresses import get_address_index, tx_participants
+
+# ===================== CHAIN VIEW =====================
+#
+# One in-process view of the chain per chain file, shared by every caller of
+# fetch_chain. The view is versioned by (height, tip hash): a call only pays
+# for the blocks appended since the previous call, whether they come from
+# the local block store or, when there is none, from the explorer. The
+# local store is only consulted when its write generation has changed.
+#
+# `blocks` is an immutable snapshot: refreshes build a new tuple, so a caller
+# holding a reference keeps a consistent chain for the rest of its request.
+
+class ChainView:
+    def __init__(self, chain_file=CHAIN_FILE):
+        self.chain_file = chain_file
+        self.blocks = ()
+        self.store_generation = None
+        self.lock = threading.Lock()
+
+    @property
+    def height(self):
+        return len(self.blocks)
+
+    @property
+    def version(self):
+        tip = self.blocks[-1].get("hash") if self.blocks else None
+        return self.height, tip
+
+    def refresh(self, local_only=False):
+        with self.lock:
+            store = get_block_store(self.chain_file)
+            if store.height() or local_only:
+                self._sync_local(store)
+            else:
+                self._sync_remote()
+            return self.blocks
+
+    def _sync_local(self, store):
+        generation = store.generation()
+        if generation == self.store_generation:
+            return
+        height = store.height()
+        if self.blocks:
+            try:
+                stored = store.get(self.height - 1)
+            except IndexError:
+                stored = None
+            if not stored or stored.get("hash") != self.blocks[-1].get("hash"):
+                self.blocks = ()
+        if height > self.height:
+            self.blocks = self.blocks + tuple(store.read_range(self.height, height))
+        self.store_generation = generation
+
+    def _sync_remote(self):
+        tip, _ = fetch_remote_tip()
+        if tip and self.blocks:
+            ours = self.blocks[-1].get("hash")
+            if tip.get("height") == self.height and tip.get("hash") == ours:
+                return
+            if tip.get("height", self.height) <= self.height and tip.get("hash") != ours:
+                # The explorer reorganized onto a chain no longer than ours.
+                self.blocks = ()
+
+        new_blocks = fetch_remote_blocks(self.height)
+        if new_blocks is None:
+            return
+        if new_blocks and self.blocks and new_blocks[0].get("previous_hash") != self.blocks[-1].get("hash"):
+            # The explorer's chain diverged from ours; start over.
+            self.blocks = ()
+            new_blocks = fetch_remote_blocks(0) or []
+        if new_blocks:
+            self.blocks = self.blocks + tuple(new_blocks)
+
+
+def fetch_remote_blocks(start=0, explorer=EXPLORER):
+    blocks = []
+    while True:
+        try:
+            response = requests.get(f"{explorer}/api/chain", params={"from": start}, timeout=5)
+            if response.status_code != 200:
+                print(f"Failed to fetch chain. Status code: {response.status_code}")
+                return None
+            page = response.json()
+        except Exception as e:
+            print(f"Error fetching chain: {e}")
+            return None
+
+        # Older explorers ignore `from` and return the full chain.
+        page = [b for b in page if b.get("index", 0) >= start]
+        if not page:
+            return blocks
+        blocks.extend(page)
+        start = page[-1].get("index", start) + 1
+
+def fetch_remote_tip(etag=None, explorer=EXPLORER):
+    """
+    Returns (header, etag) for the explorer's tip, or (None, etag) when the
+    tip is unchanged since `etag` or the explorer could not be reached.
+    """
+    headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+    try:
+        response = requests.get(f"{explorer}/api/tip", headers=headers, timeout=5)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            return None, etag
+        return response.json(), response.headers.get("ETag", "").strip('"') or None
+    except Exception as e:
+        print(f"Error fetching tip: {e}")
+        return None, etag
+
+
+_views = {}
+
+def get_chain_view(chain_file=CHAIN_FILE, local_only=False):
+    view = _views.get(chain_file)
+    if view is None:
+        view = _views[chain_file] = ChainView(chain_file)
+    view.refresh(local_only)
+    return view
+
+def get_chain(chain_file=CHAIN_FILE):
+    # Callers are free to append to the list they get back, so hand out a
+    # mutable copy of the shared snapshot.
+    return list(get_chain_view(chain_file).blocks)
+
+# ===================== LOOKUPS =====================
+
+def get_block_height(block_hash, chain_file=CHAIN_FILE):
+    index = get_tx_index(chain_file)
+    if index.height:
+        return index.block_height(block_hash)
+    for height, block in enumerate(get_chain_view(chain_file).blocks):
+        if block.get("hash") == block_hash:
+            return height
+    return None
+
+def has_block(block_hash, chain_file=CHAIN_FILE):
+    return get_block_height(block_hash, chain_file) is not None
+
+def get_tx(txid, chain_file=CHAIN_FILE):
+    """
+    Returns (block, position) for a transaction id, or (None, None).
+    """
+    index = get_tx_index(chain_file)
+    if index.height:
+        location = index.locate_tx(txid)
+        if not location:
+            return None, None
+        height, position = location
+        try:
+            return get_block_store(chain_file).get(height), position
+        except IndexError:
+            return None, None
+    for block in get_chain_view(chain_file).blocks:
+        for position, tx in enumerate(block.get("transactions", [])):
+            if tx_id(tx) == txid:
+                return block, position
+    return None, None
+
+def iter_address_txs(address, reverse=False, offset=0, limit=None, chain_file=CHAIN_FILE):
+    """
+    Yields (block, tx) for every transaction `address` takes part in, oldest
+    first (or newest first with reverse=True), reading only those blocks.
+    """
+    index = get_address_index(chain_file)
+    if not index.height:
+        yield from _scan_address_txs(address, reverse, offset, limit, chain_file)
+        return
+
+    store = get_block_store(chain_file)
+    block, block_height = None, None
+    for height, position in index.positions(address, reverse, offset, limit):
+        if height != block_height:
+            block, block_height = store.get(height), height
+        yield block, block["transactions"][position]
+
+def _scan_address_txs(address, reverse, offset, limit, chain_file):
+    blocks = get_chain_view(chain_file).blocks
+    matches = []
+    for block in (reversed(blocks) if reverse else blocks):
+        txs = block.get("transactions", [])
+        for tx in (reversed(txs) if reverse else txs):
+            if address in tx_participants(tx):
+                matches.append((block, tx))
+                if limit is not None and len(matches) >= offset + limit:
+                    return matches[offset:]
+    return matches[offset:]
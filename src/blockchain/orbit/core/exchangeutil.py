@@ -4,7 +4,9 @@ import os
 import time
 from blockchain.tokenutil import send_orbit
 from core.ioutil import fetch_chain
+from core.index_util.tokens import get_token_index
 from core.tx_util.tx_types import TXExchange
+from core.tx_util.tx_pipeline import validate_transactions
 
 
 def send_token_transaction(sender, receiver, amount, token_symbol, note=""):
@@ -25,41 +27,38 @@ def send_token_transaction(sender, receiver, amount, token_symbol, note=""):
         send_orbit(sender, "mining", 0.1, order=unsigned_tx)
 
 def get_user_token_balance(address, symbol):
-    chain = fetch_chain()
-    balance = 0
-
-    for block in reversed(chain):
-        for tx in block["transactions"]:
-            note = tx.get("note", {})
-            if isinstance(note, dict) and "token_transfer" in note.get("type", {}):
-                data = note["type"]["token_transfer"]
-                if data.get("token_symbol") == symbol:
-                    if data["receiver"] == address:
-                        balance += data["amount"]
-                    if data["sender"] == address:
-                        balance -= data["amount"]
-
-    return balance
+    index = get_token_index()
+    if index.height:
+        return index.balance(address, symbol)
+    # No local block store (remote-only process): scan the fetched chain.
+    return _scan_token_holdings(address, fetch_chain()).get(symbol, 0)
 
 
 def get_all_user_token_holdings(address):
-    chain = fetch_chain()
+    index = get_token_index()
+    if index.height:
+        return index.holdings(address)
+    holdings = _scan_token_holdings(address, fetch_chain())
+    return {sym: amt for sym, amt in holdings.items() if amt > 0}
+
+def _scan_token_holdings(address, chain):
     holdings = {}
 
     for block in chain:
         for tx in block.get("transactions", []):
-            if "note" not in tx or "token_transfer" not in tx["note"]["type"]:
+            note = tx.get("note")
+            if not isinstance(note, dict) or "token_transfer" not in note.get("type", {}):
                 continue
 
-            data = tx["note"]["type"]["token_transfer"]
-            symbol = data["token_symbol"]
+            data = note["type"]["token_transfer"]
+            symbol = data.get("token_symbol")
 
-            if data["receiver"] == address:
+            if data.get("receiver") == address:
                 holdings[symbol] = holdings.get(symbol, 0) + data["amount"]
-            if data["sender"] == address:
+            if data.get("sender") == address:
                 holdings[symbol] = holdings.get(symbol, 0) - data["amount"]
 
-    return {sym: amt for sym, amt in holdings.items() if amt > 0}
+    return holdings
 
 def validate_token_transfer(tx, chain=None):
     # Validate structure
@@ -75,32 +74,30 @@ def validate_token_transfer(tx, chain=None):
     if not isinstance(token_data["amount"], (int, float)) or token_data["amount"] <= 0:
         return False, "Invalid transfer amount"
 
-    # Signature verification
-    if not verify_signature(token_data, token_data["signature"], token_data["sender"]):
-        return False, "Invalid signature"
-
-    # Check balance
-    if chain is None:
-        chain = fetch_chain()
-
-    balance = get_user_token_balance(token_data["sender"], token_data["token_symbol"])
-    if balance < token_data["amount"]:
-        return False, "Insufficient balance"
+    # Signature and balance checks go through the block validation pipeline.
+    valid, msg = validate_transactions([{"note": tx}], require_signature=True)[0]
+    if not valid:
+        return False, msg
 
     return True, "Valid token transfer"
 
 
 def get_token_id(symbol):
     """
-    Search the blockchain ledger for a token creation transaction with the given symbol
-    and return its token_id.
+    token_id of the token created under `symbol` (the latest creation wins,
+    as on the token pages), or None.
     """
+    index = get_token_index()
+    if index.height:
+        token = index.token(symbol)
+        return token.get("token_id") if token else None
+
     for block in reversed(fetch_chain()):
-        for tx in block["transactions"]:
-            try:
-                note = tx.get("note", {})
-                if isinstance(note, dict) and "create_token" in note.get("type", {}):
-                    token_data = note["type"]["create_token"]
-                    return token_data.get("token_id")
-            except Exception as e:
+        for tx in reversed(block.get("transactions", [])):
+            note = tx.get("note")
+            if not isinstance(note, dict):
                 continue
+            token_data = note.get("type", {}).get("create_token")
+            if isinstance(token_data, dict) and token_data.get("symbol") == symbol:
+                return token_data.get("token_id")
+    return None
@@ -0,0 +1,152 @@
+import json
+import time
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import wait
+from core.logutil import log_node_activity
+from core.serialutil import encode_block
+from core.networkutil import broadcast_session, breaker, get_broadcast_pool, BROADCAST_TIMEOUT
+
+# Blocks are relayed by announcing their hash (POST /inv) to a random
+# GOSSIP_FANOUT peers. A peer answers with the hashes it wants and only
+# those bodies are sent (POST /receive_block). Every node relays a block
+# once, after accepting it, so a block costs O(peers) small announcements
+# and roughly one body per node instead of every node flooding every peer.
+GOSSIP_FANOUT = 8
+SEEN_CACHE_SIZE = 4096
+# A hash we asked one peer for is not asked of others for this long.
+REQUEST_TIMEOUT = 5.0
+# Relayed bodies carry the relaying node's base url, so the receiver does
+# not announce the block straight back to it.
+ORIGIN_HEADER = "X-Orbit-Origin"
+
+
+class SeenCache:
+    """
+    Bounded LRU of hashes, optionally with a value per hash.
+    """
+
+    def __init__(self, maxsize=SEEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, key, value=True):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.items.get(key, default)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+
+class GossipRelay:
+    """
+    Per-node relay state: hashes already seen and hashes requested from a
+    peer. `has_block(hash)` answers for blocks older than the seen cache;
+    `url` is this node's base url as its peers know it.
+    """
+
+    def __init__(self, node_id, has_block=None, url=None, fanout=GOSSIP_FANOUT, seen_size=SEEN_CACHE_SIZE):
+        self.node_id = node_id
+        self.has_block = has_block
+        self.url = url
+        self.fanout = fanout
+        self.seen = SeenCache(seen_size)
+        self.requested = SeenCache(seen_size)
+        # Concurrent /inv requests must not both claim the same hash.
+        self.lock = threading.Lock()
+
+    def known(self, block_hash):
+        if block_hash in self.seen:
+            return True
+        return bool(self.has_block and self.has_block(block_hash))
+
+    def remember(self, block):
+        self.seen.add(block["hash"])
+
+    def targets(self, peers, exclude=()):
+        candidates = [peer for peer in peers if peer not in exclude]
+        if len(candidates) <= self.fanout:
+            return candidates
+        return random.sample(candidates, self.fanout)
+
+    def wanted(self, hashes, now=None):
+        """
+        The announced hashes this node lacks and has not already requested
+        elsewhere within REQUEST_TIMEOUT. They count as requested from now.
+        """
+        now = time.time() if now is None else now
+        want = []
+        with self.lock:
+            for block_hash in hashes:
+                if self.known(block_hash):
+                    continue
+                requested = self.requested.get(block_hash)
+                if requested and now - requested < REQUEST_TIMEOUT:
+                    continue
+                self.requested.add(block_hash, now)
+                want.append(block_hash)
+        return want
+
+    def announce(self, block, peers, exclude=(), origin=None, timeout=BROADCAST_TIMEOUT):
+        """
+        Announces an accepted block to a fan-out sample of peer base urls and
+        sends the body to those that want it, skipping `origin` (the peer the
+        block came from). Returns {peer: result} with "sent", "known",
+        "failed" or "skipped" (circuit open).
+        """
+        self.remember(block)
+        inv = json.dumps({"hashes": [block["hash"]], "index": block.get("index")}).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.url:
+            headers[ORIGIN_HEADER] = self.url
+        body = []
+
+        def relay(peer):
+            try:
+                res = broadcast_session.post(f"{peer}/inv", data=inv,
+                                             headers={"Content-Type": "application/json"}, timeout=timeout)
+                if res.status_code != 200:
+                    breaker.record(peer, False)
+                    return "failed"
+                if block["hash"] not in res.json().get("want", []):
+                    breaker.record(peer, True)
+                    return "known"
+                if not body:
+                    body.append(encode_block(block))
+                res = broadcast_session.post(f"{peer}/receive_block", data=body[0],
+                                             headers=headers, timeout=timeout)
+                breaker.record(peer, res.status_code == 200)
+                return "sent" if res.status_code == 200 else "failed"
+            except Exception:
+                breaker.record(peer, False)
+                return "failed"
+
+        results, futures = {}, {}
+        pool = get_broadcast_pool()
+        for peer in self.targets(peers, set(exclude) | {origin}):
+            if breaker.allow(peer):
+                futures[pool.submit(relay, peer)] = peer
+            else:
+                results[peer] = "skipped"
+        deadline = 2 * (sum(timeout) if isinstance(timeout, tuple) else timeout)
+        done, _ = wait(futures, timeout=deadline + 1)
+        for future, peer in futures.items():
+            results[peer] = future.result() if future in done else "failed"
+
+        sent = sum(1 for result in results.values() if result == "sent")
+        log_node_activity(self.node_id, "[GOSSIP]",
+                          f"Announced block {block.get('index')} to {len(results)} peers, {sent} wanted it")
+        return results
@@ -1,5 +1,7 @@
 import hashlib
 import json
+from collections import OrderedDict
+from core.serialutil import canonical, block_hash_payload
 import rsa
 import os
 import time
@@ -106,32 +108,128 @@ def create_account(username, password, users):
     }
     return users
 
+# ===================== SIGNATURES =====================
+
+def signing_payload(data):
+    # What a signature covers: the canonical encoding minus the signature itself.
+    return canonical({k: v for k, v in data.items() if k != "signature"})
+
+def verify_signature(payload, signature, public_key):
+    """
+    RSA/SHA-256 check of a hex `signature` over `payload` (bytes) against a
+    PKCS#1 PEM public key, as stored in users.json.
+    """
+    try:
+        key = rsa.PublicKey.load_pkcs1(public_key.encode() if isinstance(public_key, str) else public_key)
+        rsa.verify(payload, bytes.fromhex(signature), key)
+        return True
+    except Exception:
+        return False
+
+def verify_signature_batch(jobs):
+    # Module level so batches can be shipped to a process pool.
+    return [verify_signature(payload, signature, key) for payload, signature, key in jobs]
+
 # ===================== BLOCK UTILS =====================
 
+# ===================== MERKLE =====================
+#
+# Tree nodes are raw 32-byte digests. A pair is combined by hashing the two
+# digests as hex text, which is the encoding every merkle_root already on
+# chain was built with, so existing roots and new proofs agree. Odd levels
+# duplicate their last node.
+
+MERKLE_CACHE_SIZE = 256
+_merkle_cache = OrderedDict()
+
+def tx_digest(tx):
+    """
+    sha256 of a transaction's canonical JSON. Transaction objects cache it,
+    so a transaction is serialized once however many trees it is hashed into.
+    """
+    if hasattr(tx, "digest"):
+        return tx.digest()
+    return hashlib.sha256(canonical(tx)).digest()
+
+def merkle_parent(left, right):
+    return hashlib.sha256(left.hex().encode() + right.hex().encode()).digest()
+
+def merkle_levels(transactions):
+    level = [tx_digest(tx) for tx in transactions]
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level = level + [level[-1]]
+            levels[-1] = level
+        level = [merkle_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+def block_merkle_levels(block):
+    # Blocks are immutable once stored, so their trees are cached by hash.
+    key = block.get("hash")
+    levels = _merkle_cache.get(key) if key else None
+    if levels is None:
+        levels = merkle_levels(block.get("transactions", []))
+        if key:
+            _merkle_cache[key] = levels
+            if len(_merkle_cache) > MERKLE_CACHE_SIZE:
+                _merkle_cache.popitem(last=False)
+    else:
+        _merkle_cache.move_to_end(key)
+    return levels
+
+def merkle_root(transactions):
+    levels = merkle_levels(transactions)
+    return levels[-1][0].hex() if levels[0] else ""
+
 def generate_merkle_root(transaction_dicts):
-    def hash_pair(a, b):
-        return hashlib.sha256((a + b).encode()).hexdigest()
+    return merkle_root(transaction_dicts)
 
-    tx_hashes = [hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest() for tx in transaction_dicts]
-    while len(tx_hashes) > 1:
-        if len(tx_hashes) % 2 == 1:
-            tx_hashes.append(tx_hashes[-1])  # duplicate last hash if odd
-        tx_hashes = [hash_pair(tx_hashes[i], tx_hashes[i+1]) for i in range(0, len(tx_hashes), 2)]
-    return tx_hashes[0] if tx_hashes else ""
+def merkle_proof(levels, position):
+    """
+    Inclusion proof for the leaf at `position`: the sibling hashes from the
+    leaf up to the root, each tagged with the side it sits on.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = position ^ 1
+        proof.append({"hash": level[sibling].hex(), "side": "left" if sibling < position else "right"})
+        position //= 2
+    return proof
+
+def block_merkle_proof(block, position):
+    return merkle_proof(block_merkle_levels(block), position)
+
+def verify_merkle_proof(tx, proof, root):
+    node = tx_digest(tx)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        node = merkle_parent(sibling, node) if step["side"] == "left" else merkle_parent(node, sibling)
+    return node.hex() == root
 
 def calculate_hash(index, previous_hash, timestamp, transactions, validator="", merkle_root="", nonce=0, metadata=None):
-    block_content = {
-        "index": index,
-        "previous_hash": previous_hash,
-        "timestamp": timestamp,
-        "transactions": transactions,
-        "validator": validator,
-        "merkle_root": merkle_root,
-        "nonce": nonce,
-        "metadata": metadata or {}
-    }
-    block_string = json.dumps(block_content, sort_keys=True)
-    return hashlib.sha256(block_string.encode()).hexdigest()
+    # Byte-identical to json.dumps(block, sort_keys=True), but reuses the
+    # cached encodings of TXConfig.Transaction objects.
+    payload = block_hash_payload(index, previous_hash, timestamp, transactions,
+                                 validator, merkle_root, nonce, metadata)
+    return hashlib.sha256(payload).hexdigest()
+
+def block_hash(block):
+    return calculate_hash(
+        block["index"], block["previous_hash"], block["timestamp"],
+        block["transactions"], block.get("validator", ""),
+        block.get("merkle_root", ""), block.get("nonce", 0),
+        block.get("metadata", {})
+    )
+
+def first_invalid_hash(blocks, start=0):
+    # Module level so it can be shipped to a process pool. The genesis block
+    # is not re-hashed, matching is_chain_valid.
+    for height, block in enumerate(blocks, start):
+        if height and block.get("hash") != block_hash(block):
+            return height
+    return None
 
 
 # ===================== STAKE UTILS =====================
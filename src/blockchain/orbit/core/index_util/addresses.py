@@ -0,0 +1,51 @@
+from core.ioutil import CHAIN_FILE
+from core.index_util.base import ChainIndex
+
+# Fields inside note["type"][...] payloads that name a participant, so token
+# transfers and orders show up under the addresses they move tokens for.
+PAYLOAD_PARTICIPANTS = ("sender", "receiver", "buyer", "seller")
+
+
+def tx_participants(tx):
+    found = {tx.get("sender"), tx.get("recipient")}
+    note = tx.get("note")
+    if isinstance(note, dict) and isinstance(note.get("type"), dict):
+        for payload in note["type"].values():
+            if isinstance(payload, dict):
+                found.update(payload.get(key) for key in PAYLOAD_PARTICIPANTS)
+    found.discard(None)
+    found.discard("")
+    return found
+
+
+class AddressIndex(ChainIndex):
+    """
+    address -> [[height, position], ...] in chain order for every transaction
+    the address takes part in.
+    """
+    name = "addresses"
+
+    def apply_block(self, block):
+        height = self.height
+        for position, tx in enumerate(block.get("transactions", [])):
+            for address in tx_participants(tx):
+                self.state.setdefault(address, []).append([height, position])
+
+    def positions(self, address, reverse=False, offset=0, limit=None):
+        entries = self.state.get(address, [])
+        if reverse:
+            entries = entries[::-1]
+        end = None if limit is None else offset + limit
+        return entries[offset:end]
+
+    def count(self, address):
+        return len(self.state.get(address, []))
+
+
+_indexes = {}
+
+def get_address_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = AddressIndex(chain_file)
+    return index.sync()
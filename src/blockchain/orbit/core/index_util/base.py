@@ -0,0 +1,132 @@
+import os
+import json
+import tempfile
+import threading
+from core.ioutil import CHAIN_FILE, get_block_store
+from core.blockstore import store_path
+
+# The block store doubles as each index's delta log: state is checkpointed
+# at most once every CHECKPOINT_BLOCKS blocks, and a process that loads an
+# older checkpoint replays the blocks stored since. Appending a block costs
+# only that block's apply_block, never a rewrite of the whole state.
+CHECKPOINT_BLOCKS = 1000
+
+
+class ChainIndex:
+    """
+    Base class for state derived from the block store. Each index persists
+    its state next to the store together with the height and tip hash it was
+    built from, and catches up by applying only the blocks appended since.
+    If the stored chain was rewritten below that height the index rebuilds,
+    as it does when the checkpoint was written by a different `version`.
+    """
+    name = "index"
+    # Bump when apply_block changes what it derives from a block.
+    version = 1
+
+    def __init__(self, chain_file=CHAIN_FILE):
+        self.chain_file = chain_file
+        self.path = os.path.join(store_path(chain_file), f"{self.name}.json")
+        self.lock = threading.RLock()
+        self.height = 0
+        self.tip_hash = None
+        # Height of the checkpoint on disk.
+        self.saved_height = 0
+        self.state = self.empty()
+        self.load()
+
+    # ===================== OVERRIDES =====================
+
+    def empty(self):
+        return {}
+
+    def apply_block(self, block):
+        raise NotImplementedError
+
+    def to_dict(self):
+        return self.state
+
+    def from_dict(self, data):
+        return data
+
+    # ===================== PERSISTENCE =====================
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version", 1) != self.version:
+                return
+            self.state = self.from_dict(data["state"])
+            self.height = data["height"]
+            self.tip_hash = data["tip_hash"]
+            self.saved_height = self.height
+        except Exception as e:
+            print(f"[{self.name}] Discarding unreadable index: {e}")
+            self.reset()
+
+    def save(self):
+        """
+        Checkpoints the state. Writers of the store are held off meanwhile so
+        no two processes replace the file at once; a failed checkpoint only
+        means more blocks to replay on the next load.
+        """
+        store = get_block_store(self.chain_file)
+        try:
+            with store.lock.exclusive():
+                fd, tmp = tempfile.mkstemp(prefix=f"{self.name}.", suffix=".tmp", dir=os.path.dirname(self.path))
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump({"version": self.version, "height": self.height, "tip_hash": self.tip_hash,
+                               "state": self.to_dict()}, f)
+                    os.replace(tmp, self.path)
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+            self.saved_height = self.height
+            return True
+        except Exception as e:
+            print(f"[{self.name}] Checkpoint failed: {e}")
+            return False
+
+    def reset(self):
+        self.height = 0
+        self.tip_hash = None
+        self.saved_height = 0
+        self.state = self.empty()
+
+    # ===================== SYNC =====================
+
+    def is_stale(self, store):
+        if store.height() < self.height:
+            return True
+        if self.height:
+            try:
+                tip = store.get(self.height - 1)
+            except IndexError:
+                return True
+            return tip.get("hash") != self.tip_hash
+        return False
+
+    def sync(self):
+        with self.lock:
+            store = get_block_store(self.chain_file)
+            if self.is_stale(store):
+                self.reset()
+            if store.height() == self.height:
+                return self
+            for block in store.iter_range(self.height):
+                self.apply_block(block)
+                self.height += 1
+                self.tip_hash = block.get("hash")
+            if self.height - self.saved_height >= CHECKPOINT_BLOCKS:
+                self.save()
+            return self
+
+    def rebuild(self):
+        with self.lock:
+            self.reset()
+            return self.sync()
@@ -0,0 +1,117 @@
+import bisect
+from core.ioutil import CHAIN_FILE
+from core.index_util.base import ChainIndex
+
+try:
+    from sortedcontainers import SortedList
+    SORTED_SUPPORTED = True
+except ImportError:
+    SORTED_SUPPORTED = False
+
+# Net ORBIT balance per address, as the top-wallets page has always computed
+# it: received minus sent, except that "genesis" never goes negative.
+GENESIS_SENDER = "genesis"
+
+
+class _BisectList:
+    # The subset of SortedList used here, on a plain list. Inserts are O(n);
+    # install sortedcontainers for large chains.
+    def __init__(self, items=()):
+        self.items = sorted(items)
+
+    def add(self, item):
+        bisect.insort(self.items, item)
+
+    def remove(self, item):
+        del self.items[bisect.bisect_left(self.items, item)]
+
+    def bisect_left(self, item):
+        return bisect.bisect_left(self.items, item)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __len__(self):
+        return len(self.items)
+
+
+class LeaderboardIndex(ChainIndex):
+    """
+    Net balance per address plus an ordered view of (-balance, address), so
+    top-k, rank and percentile queries never sort. Each block only re-keys
+    the addresses it touches.
+    """
+    name = "leaderboard"
+
+    def __init__(self, chain_file=CHAIN_FILE):
+        self.order = None
+        super().__init__(chain_file)
+
+    def from_dict(self, data):
+        self.order = None
+        return data
+
+    def reset(self):
+        super().reset()
+        self.order = None
+
+    @property
+    def ordered(self):
+        if self.order is None:
+            keys = ((-balance, address) for address, balance in self.state.items())
+            self.order = SortedList(keys) if SORTED_SUPPORTED else _BisectList(keys)
+        return self.order
+
+    def apply_block(self, block):
+        deltas = {}
+        for tx in block.get("transactions", []):
+            sender = tx.get("sender")
+            recipient = tx.get("recipient")
+            amount = tx.get("amount", 0)
+            if sender != GENESIS_SENDER:
+                deltas[sender] = deltas.get(sender, 0) - amount
+            deltas[recipient] = deltas.get(recipient, 0) + amount
+
+        order = self.ordered
+        for address, delta in deltas.items():
+            if address is None:
+                continue
+            if address in self.state:
+                order.remove((-self.state[address], address))
+            self.state[address] = self.state.get(address, 0) + delta
+            order.add((-self.state[address], address))
+
+    # ===================== QUERIES =====================
+
+    def top(self, k=100):
+        return [(address, -neg) for neg, address in self.ordered[:k]]
+
+    def rank(self, address):
+        """
+        1-based position by balance, or None for an unknown address.
+        """
+        if address not in self.state:
+            return None
+        return self.ordered.bisect_left((-self.state[address], address)) + 1
+
+    def percentile(self, address):
+        """
+        Share of known addresses (in percent) this address is at or above.
+        """
+        rank = self.rank(address)
+        if rank is None:
+            return None
+        total = len(self.ordered)
+        return round(100.0 * (total - rank + 1) / total, 4)
+
+    def __len__(self):
+        return len(self.state)
+
+
+_indexes = {}
+
+def get_leaderboard_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = LeaderboardIndex(chain_file)
+    return index.sync()
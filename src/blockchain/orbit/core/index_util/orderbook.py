@@ -0,0 +1,235 @@
+import datetime
+from core.ioutil import CHAIN_FILE, fetch_chain
+from core.index_util.base import ChainIndex
+
+ORDER_TYPES = {"buy_token": "buy", "sell_token": "sell"}
+EXCHANGE_NOTES = {"Token purchased from exchange": "buy", "Token sold to exchange": "sell"}
+BURN_ADDRESSES = ("ORB.BURN", "ORB.00000000000000000000BURN")
+MIN_PRICE = 0.000001
+# Recent fills kept per symbol for the price charts.
+HISTORY_LIMIT = 500
+HISTORY_DAYS = 31
+# Fills remembered by order id so a re-broadcast fill replaces rather than
+# adds to the totals. Re-broadcasts follow the original closely, so only
+# the most recent ones are kept.
+FILLED_LIMIT = 10000
+
+
+def _empty():
+    return {
+        # symbol -> {order_id: order} for orders that are neither filled nor cancelled
+        "open": {},
+        # symbol -> {"buy"|"sell": {price: [quantity, orders]}}
+        "books": {},
+        # order_id -> fill for the last FILLED_LIMIT fills, oldest first
+        "filled": {},
+        "markets": {},
+        "fills": {"buy": 0, "sell": 0},
+        "exchange_cnt": 0,
+        "seq": 0
+    }
+
+def _market(state, symbol):
+    return state["markets"].setdefault(symbol, {
+        "listed": False,
+        # Tokens moved by plain transfers and by filled buy orders.
+        "transferred": 0.0,
+        "filled_buys": 0.0,
+        "stats": {"buy_tokens": 0, "buy_orbit": 0.0, "sell_tokens": 0, "sell_orbit": 0.0},
+        "daily": {},
+        "history": []
+    })
+
+def _level(state, order, sign):
+    side = state["books"].setdefault(order["symbol"], {"buy": {}, "sell": {}})[order["side"]]
+    # 1 and 1.0 are the same level.
+    key = repr(float(order["price"]))
+    level = side.setdefault(key, [0.0, 0])
+    level[0] += sign * order["amount"]
+    level[1] += sign
+    if level[1] <= 0:
+        del side[key]
+
+def _close(state, symbol, order_id):
+    order = state["open"].get(symbol, {}).pop(order_id, None)
+    if order:
+        _level(state, order, -1)
+    return order
+
+def _fill(state, order, sign):
+    state["fills"][order["side"]] += sign
+    market = _market(state, order["symbol"])
+    amount = order["amount"]
+    market["stats"][f"{order['side']}_tokens"] += sign * amount
+    market["stats"][f"{order['side']}_orbit"] += sign * amount * max(order["price"], MIN_PRICE)
+    if order["side"] == "buy":
+        market["filled_buys"] += sign * amount
+        market["listed"] = True
+
+def _day(ts):
+    try:
+        return datetime.datetime.fromtimestamp(float(ts), datetime.timezone.utc).strftime("%Y-%m-%d")
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def _order(state, side, data, ts):
+    order_id = data.get("order_id")
+    symbol = data.get("symbol")
+    amount = data.get("amount")
+    if not order_id or not symbol or not isinstance(amount, (int, float)):
+        return
+    order = {
+        "order_id": order_id,
+        "side": side,
+        "symbol": symbol,
+        "price": data.get("price", 0),
+        "amount": amount,
+        "owner": data.get("buyer") if side == "buy" else data.get("seller"),
+        "status": data.get("status"),
+        "time": ts,
+        "seq": state["seq"],
+        "data": data
+    }
+    state["seq"] += 1
+
+    if order["status"] != "filled":
+        _close(state, symbol, order_id)
+        state["open"].setdefault(symbol, {})[order_id] = order
+        _level(state, order, 1)
+        return
+
+    _close(state, symbol, order_id)
+    previous = state["filled"].pop(order_id, None)
+    if previous:
+        _fill(state, previous, -1)
+    fill = {key: order[key] for key in ("side", "symbol", "price", "amount")}
+    state["filled"][order_id] = fill
+    if len(state["filled"]) > FILLED_LIMIT:
+        del state["filled"][next(iter(state["filled"]))]
+    _fill(state, fill, 1)
+
+    # A re-broadcast fill replaces the totals above but is charted once.
+    market = _market(state, symbol)
+    if ts and amount > 0 and not previous:
+        market["history"].append({"time": ts, "price": round(order["price"], 6)})
+        del market["history"][:-HISTORY_LIMIT]
+        day = _day(ts)
+        if day:
+            market["daily"][day] = round(order["price"], 6)
+            for old in sorted(market["daily"])[:-HISTORY_DAYS]:
+                del market["daily"][old]
+
+def _cancel(state, data):
+    order_id = data.get("order_id")
+    symbols = [data["symbol"]] if data.get("symbol") else list(state["open"])
+    for symbol in symbols:
+        order = state["open"].get(symbol, {}).get(order_id)
+        if order and order["owner"] == data.get("canceller"):
+            _close(state, symbol, order_id)
+            return
+
+def _transfer(state, tx, data):
+    if data.get("receiver") in BURN_ADDRESSES:
+        return
+    symbol = data.get("token_symbol")
+    amount = data.get("amount")
+    if not symbol or not isinstance(amount, (int, float)):
+        return
+    market = _market(state, symbol)
+    market["listed"] = True
+    market["transferred"] += amount
+    side = EXCHANGE_NOTES.get(data.get("note"))
+    if side:
+        market["stats"][f"{side}_tokens"] += amount
+        market["stats"][f"{side}_orbit"] += max(tx.get("amount") or 0, MIN_PRICE)
+        state["exchange_cnt"] += 1
+
+def apply_orders(state, block):
+    for tx in block.get("transactions", []):
+        note = tx.get("note")
+        kinds = note.get("type") if isinstance(note, dict) else None
+        if not isinstance(kinds, dict):
+            continue
+        ts = tx.get("timestamp") or block.get("timestamp")
+
+        if isinstance(kinds.get("token_transfer"), dict):
+            _transfer(state, tx, kinds["token_transfer"])
+            continue
+        for kind, side in ORDER_TYPES.items():
+            if isinstance(kinds.get(kind), dict):
+                _order(state, side, kinds[kind], ts)
+                break
+        if isinstance(kinds.get("cancel_order"), dict):
+            _cancel(state, kinds["cancel_order"])
+
+# ===================== QUERIES =====================
+
+def open_orders(state, side=None, symbol=None):
+    """
+    Open orders, oldest first. Each keeps the payload that placed it as
+    order["data"].
+    """
+    books = [state["open"].get(symbol, {})] if symbol else state["open"].values()
+    orders = [order for book in books for order in book.values()]
+    orders.sort(key=lambda order: order["seq"])
+    return [order for order in orders if side is None or order["side"] == side]
+
+def levels(state, symbol, side):
+    """
+    (price, quantity) per price level, best price first.
+    """
+    book = state["books"].get(symbol, {}).get(side, {})
+    return sorted(((float(price), level[0]) for price, level in book.items()), reverse=(side == "buy"))
+
+def depth(state, symbol):
+    """
+    Cumulative depth for both sides of a symbol's book, as drawn on the
+    token page.
+    """
+    snapshot = {}
+    for side in ("buy", "sell"):
+        total = 0
+        snapshot[f"{side}_depth"] = []
+        for price, quantity in levels(state, symbol, side):
+            total += quantity
+            snapshot[f"{side}_depth"].append({"price": price, "cum_quantity": total})
+    return snapshot
+
+
+class OrderBookIndex(ChainIndex):
+    """
+    Exchange state replayed from buy_token, sell_token, cancel_order and
+    token_transfer transactions: per-symbol price-level books of the open
+    orders, the fills that closed them, and the running trade totals the
+    token pages are drawn from.
+    """
+    name = "orderbook"
+    version = 2
+
+    def empty(self):
+        return _empty()
+
+    def apply_block(self, block):
+        apply_orders(self.state, block)
+
+
+_indexes = {}
+
+def get_order_book_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = OrderBookIndex(chain_file)
+    return index.sync()
+
+def get_order_book(chain_file=CHAIN_FILE):
+    """
+    Order book state for the query helpers above.
+    """
+    index = get_order_book_index(chain_file)
+    if index.height:
+        return index.state
+    # No local block store (remote-only process): replay the fetched chain.
+    state = _empty()
+    for block in fetch_chain():
+        apply_orders(state, block)
+    return state
@@ -0,0 +1,116 @@
+from core.ioutil import CHAIN_FILE
+from core.index_util.base import ChainIndex
+
+ONE_HOUR = 3600
+ONE_DAY = 86400
+# Per-address daily in/out is only kept this many days back from the
+# newest transaction of the address; charts show 14.
+ADDRESS_DAYS = 31
+
+
+def _amount(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _bucket():
+    return {"txs": 0, "volume": 0.0, "blocks": 0, "tokens": {}}
+
+
+class RollupIndex(ChainIndex):
+    """
+    Time-bucketed totals, per UTC day and per hour (bucket = timestamp //
+    86400 or // 3600): transaction count, ORBIT volume, block count and
+    token_transfer volume per symbol. Transactions are bucketed by their
+    own timestamp, blocks by theirs. Per address it keeps transaction count,
+    ORBIT sent / received and daily in / out for the last ADDRESS_DAYS days.
+    """
+    name = "rollups"
+
+    def empty(self):
+        return {"days": {}, "hours": {}, "addresses": {}}
+
+    def from_dict(self, data):
+        # JSON turns the integer bucket keys into strings.
+        return {
+            "days": {int(k): v for k, v in data.get("days", {}).items()},
+            "hours": {int(k): v for k, v in data.get("hours", {}).items()},
+            "addresses": {
+                address: dict(entry, days={int(k): v for k, v in entry["days"].items()})
+                for address, entry in data.get("addresses", {}).items()
+            }
+        }
+
+    def _buckets(self, ts):
+        days, hours = self.state["days"], self.state["hours"]
+        day, hour = int(ts // ONE_DAY), int(ts // ONE_HOUR)
+        return (days.setdefault(day, _bucket()), hours.setdefault(hour, _bucket()))
+
+    def _address(self, address, day, amount, direction):
+        entry = self.state["addresses"].setdefault(address, {"count": 0, "sent": 0.0, "received": 0.0, "days": {}})
+        entry["count"] += 1
+        entry["sent" if direction == 1 else "received"] += amount
+        if day not in entry["days"]:
+            for old in [d for d in entry["days"] if d <= day - ADDRESS_DAYS]:
+                del entry["days"][old]
+            entry["days"][day] = [0.0, 0.0]
+        entry["days"][day][direction] += amount
+
+    def apply_block(self, block):
+        block_ts = block.get("timestamp") or 0
+        for bucket in self._buckets(block_ts):
+            bucket["blocks"] += 1
+
+        for tx in block.get("transactions", []):
+            ts = tx.get("timestamp") or block_ts
+            amount = _amount(tx.get("amount", 0))
+            transfer = None
+            note = tx.get("note")
+            if isinstance(note, dict) and isinstance(note.get("type"), dict):
+                transfer = note["type"].get("token_transfer")
+            for bucket in self._buckets(ts):
+                bucket["txs"] += 1
+                bucket["volume"] += amount
+                if isinstance(transfer, dict) and transfer.get("token_symbol"):
+                    tokens = bucket["tokens"]
+                    symbol = transfer["token_symbol"]
+                    tokens[symbol] = tokens.get(symbol, 0.0) + _amount(transfer.get("amount", 0))
+
+            # Same attribution as the address page: a self-transfer is "out".
+            day = int(ts // ONE_DAY)
+            sender, recipient = tx.get("sender"), tx.get("recipient")
+            if sender:
+                self._address(sender, day, amount, 1)
+            if recipient and recipient != sender:
+                self._address(recipient, day, amount, 0)
+
+    # ===================== QUERIES =====================
+
+    def series(self, unit, first, last):
+        """
+        Buckets first..last inclusive ("days" or "hours" numbers), with
+        empty buckets filled in.
+        """
+        buckets = self.state[unit]
+        return [(n, buckets.get(n) or _bucket()) for n in range(first, last + 1)]
+
+    def days(self, now_ts, count=14):
+        today = int(now_ts // ONE_DAY)
+        return self.series("days", today - count + 1, today)
+
+    def hours(self, now_ts, count=24):
+        hour = int(now_ts // ONE_HOUR)
+        return self.series("hours", hour - count + 1, hour)
+
+    def address(self, address):
+        return self.state["addresses"].get(address) or {"count": 0, "sent": 0.0, "received": 0.0, "days": {}}
+
+
+_indexes = {}
+
+def get_rollup_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = RollupIndex(chain_file)
+    return index.sync()
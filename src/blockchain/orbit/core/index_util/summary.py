@@ -0,0 +1,83 @@
+from core.ioutil import CHAIN_FILE, load_wallet_mapping, fetch_chain
+from core.index_util.base import ChainIndex
+
+TOTAL_ORBIT = 100_000_000_000
+
+
+def _empty():
+    return {"transactions": 0, "volume": 0.0, "accounts": {}}
+
+def _tally(state, block):
+    accounts = state["accounts"]
+    for tx in block.get("transactions", []):
+        amount = tx.get("amount", 0)
+        sender, recipient = tx.get("sender"), tx.get("recipient")
+        state["transactions"] += 1
+        state["volume"] += amount
+        if sender is not None:
+            accounts.setdefault(sender, 0.0)
+        if recipient is not None:
+            accounts[recipient] = accounts.get(recipient, 0.0) + amount
+
+def summarize(state, blocks, excluded=()):
+    accounts = state["accounts"]
+    excluded_received = sum(accounts.get(address, 0.0) for address in set(excluded))
+    return {
+        "blocks": blocks,
+        "transactions": state["transactions"],
+        "accounts": len(accounts),
+        # Everything ever transferred, which the mining rate has always used.
+        "volume": state["volume"],
+        # Received by anyone but the system wallets.
+        "circulating": state["volume"] - excluded_received,
+        "excluded": excluded_received,
+        "total_orbit": TOTAL_ORBIT
+    }
+
+
+class SummaryIndex(ChainIndex):
+    """
+    Chain-wide totals: transaction count, ORBIT moved, and every account
+    that has sent or received together with the ORBIT it has received.
+    Circulating supply excluding the system wallets is derived from these
+    at query time, so edits to wallet_mapping.json need no rebuild.
+    """
+    name = "summary"
+
+    def empty(self):
+        return _empty()
+
+    def apply_block(self, block):
+        _tally(self.state, block)
+
+    def summary(self, excluded=()):
+        return summarize(self.state, self.height, excluded)
+
+
+_indexes = {}
+
+def get_summary_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = SummaryIndex(chain_file)
+    return index.sync()
+
+def get_chain_summary(chain_file=CHAIN_FILE):
+    """
+    Shared by the explorer and the mining rate: blocks, transactions,
+    distinct accounts, circulating and excluded (system wallet) supply.
+    """
+    try:
+        excluded = load_wallet_mapping().values()
+    except Exception as e:
+        print(f"Warning: Failed to load wallet_mapping.json - {e}")
+        excluded = ()
+    index = get_summary_index(chain_file)
+    if index.height:
+        return index.summary(excluded)
+    # No local block store (remote-only process): tally the fetched chain.
+    chain = fetch_chain()
+    state = _empty()
+    for block in chain:
+        _tally(state, block)
+    return summarize(state, len(chain), excluded)
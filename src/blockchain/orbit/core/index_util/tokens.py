@@ -0,0 +1,164 @@
+import datetime
+from core.ioutil import CHAIN_FILE
+from core.index_util.base import ChainIndex
+
+TRANSFER_TYPES = ("buy_token", "sell_token", "token_transfer")
+BURN_ADDRESSES = ("ORB.BURN", "ORB.00000000000000000000BURN")
+# Transfer timestamps are kept this far back, for the 24h metrics.
+RECENT_WINDOW = 2 * 86400
+
+
+def parse_ts(ts_raw):
+    """
+    Epoch seconds from a numeric or ISO-8601 (naive = UTC) timestamp.
+    """
+    if isinstance(ts_raw, (int, float)):
+        return float(ts_raw)
+    if isinstance(ts_raw, str):
+        try:
+            return datetime.datetime.fromisoformat(ts_raw).replace(tzinfo=datetime.timezone.utc).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def _amount(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _remember(recent, ts):
+    recent.append(ts)
+    if recent[0] < ts - RECENT_WINDOW:
+        recent[:] = [t for t in recent if t >= ts - RECENT_WINDOW]
+
+
+class TokenIndex(ChainIndex):
+    """
+    Token registry and holdings:
+
+    - tokens:    symbol -> creation record (name, creator, token_id,
+                 created_at) with supply net of burns and its transfer and
+                 order counts;
+    - balances:  symbol -> {address: token_transfer balance};
+    - counts:    per symbol, how many token_transfer ("transfers") and
+                 buy_token/sell_token ("orders") payloads moved it, and
+    - recent:    their recent timestamps, for the 24h metrics.
+
+    A later create_token for the same symbol replaces the record, as the
+    token pages have always done.
+    """
+    name = "tokens"
+    version = 3
+
+    def empty(self):
+        return {
+            "tokens": {},
+            "balances": {},
+            "counts": {"transfers": {}, "orders": {}},
+            "recent": {"transfers": {}, "orders": {}}
+        }
+
+    def apply_block(self, block):
+        for tx in block.get("transactions", []):
+            note = tx.get("note")
+            kinds = note.get("type") if isinstance(note, dict) else None
+            if not isinstance(kinds, dict):
+                continue
+
+            created = kinds.get("create_token")
+            if isinstance(created, dict) and created.get("name") and created.get("symbol"):
+                symbol = created["symbol"]
+                self.state["tokens"][symbol] = {
+                    "symbol": symbol,
+                    "name": created["name"],
+                    "supply": _amount(created.get("supply", 0)),
+                    "creator": created.get("creator"),
+                    "token_id": created.get("token_id"),
+                    "created_at": created.get("timestamp"),
+                    "created_ts": parse_ts(created.get("timestamp")),
+                    "transfers": 0,
+                    "orders": 0
+                }
+
+            for kind in TRANSFER_TYPES:
+                data = kinds.get(kind)
+                if isinstance(data, dict):
+                    group = "transfers" if kind == "token_transfer" else "orders"
+                    self._transfer(data, parse_ts(tx.get("timestamp")), group)
+
+    def _transfer(self, data, ts, group):
+        symbol = data.get("symbol") or data.get("token_symbol")
+        sender, receiver = data.get("sender"), data.get("receiver")
+        amount = _amount(data.get("amount"))
+        token = self.state["tokens"].get(symbol)
+        balances = self.state["balances"].setdefault(symbol, {})
+        if sender:
+            balances[sender] = balances.get(sender, 0) - amount
+
+        if receiver in BURN_ADDRESSES:
+            if token:
+                token["supply"] -= amount
+            return
+        if receiver:
+            balances[receiver] = balances.get(receiver, 0) + amount
+
+        counts = self.state["counts"][group]
+        counts[symbol] = counts.get(symbol, 0) + 1
+        if ts is not None:
+            _remember(self.state["recent"][group].setdefault(symbol, []), ts)
+        if token:
+            token[group] += 1
+
+    # ===================== QUERIES =====================
+
+    def token(self, symbol):
+        return self.state["tokens"].get(symbol)
+
+    def symbols(self):
+        return list(self.state["tokens"])
+
+    def balance(self, address, symbol):
+        return self.state["balances"].get(symbol, {}).get(address, 0)
+
+    def holdings(self, address):
+        return {
+            symbol: balances[address]
+            for symbol, balances in self.state["balances"].items()
+            if balances.get(address, 0) > 0
+        }
+
+    def holders(self, symbol):
+        # Every address that has sent or received the token, as the token
+        # pages have always counted them.
+        return self.state["balances"].get(symbol, {})
+
+    def _groups(self, orders):
+        return ("transfers", "orders") if orders else ("transfers",)
+
+    def transfers(self, symbol=None, orders=False):
+        """
+        token_transfer count for `symbol` (or every symbol), plus
+        buy_token/sell_token orders if `orders`.
+        """
+        total = 0
+        for group in self._groups(orders):
+            counts = self.state["counts"][group]
+            total += counts.get(symbol, 0) if symbol else sum(counts.values())
+        return total
+
+    def transfers_since(self, since_ts, symbol=None, orders=False):
+        total = 0
+        for group in self._groups(orders):
+            recent = self.state["recent"][group]
+            for times in ([recent.get(symbol, [])] if symbol else recent.values()):
+                total += sum(1 for ts in times if ts >= since_ts)
+        return total
+
+_indexes = {}
+
+def get_token_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = TokenIndex(chain_file)
+    return index.sync()
@@ -0,0 +1,40 @@
+from core.ioutil import CHAIN_FILE
+from core.index_util.base import ChainIndex
+
+
+def tx_id(tx):
+    return f"{tx.get('sender')}-{tx.get('recipient')}-{tx.get('timestamp')}"
+
+
+class TxIndex(ChainIndex):
+    """
+    tx id -> [height, position] and block hash -> height. Ids are the
+    explorer's sender-recipient-timestamp form; on a collision the earliest
+    transaction wins, matching the old forward scan.
+    """
+    name = "txindex"
+
+    def empty(self):
+        return {"txs": {}, "blocks": {}}
+
+    def apply_block(self, block):
+        height = self.height
+        self.state["blocks"].setdefault(block.get("hash"), height)
+        txs = self.state["txs"]
+        for position, tx in enumerate(block.get("transactions", [])):
+            txs.setdefault(tx_id(tx), [height, position])
+
+    def locate_tx(self, txid):
+        return self.state["txs"].get(txid)
+
+    def block_height(self, block_hash):
+        return self.state["blocks"].get(block_hash)
+
+
+_indexes = {}
+
+def get_tx_index(chain_file=CHAIN_FILE):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = TxIndex(chain_file)
+    return index.sync()
@@ -0,0 +1,98 @@
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from core.ioutil import CHAIN_FILE, get_block_store
+from core.hashutil import block_hash, first_invalid_hash
+from core.index_util.base import ChainIndex
+
+VERIFY_BATCH = 1024
+
+
+class ValidationIndex(ChainIndex):
+    """
+    Validated-height checkpoint: every block below `height` has had its hash
+    recomputed and its link to the previous block checked, so a sync only
+    re-hashes blocks appended since. `first_invalid` is the height of the
+    first bad block, if any.
+    """
+    name = "validated"
+
+    def empty(self):
+        return {"first_invalid": None}
+
+    def apply_block(self, block):
+        if self.state["first_invalid"] is not None or not self.height:
+            return
+        if block.get("previous_hash") != self.tip_hash or block.get("hash") != block_hash(block):
+            self.state["first_invalid"] = self.height
+
+    @property
+    def valid(self):
+        return self.state["first_invalid"] is None
+
+    def verify_full(self, workers=None):
+        """
+        Re-verifies the whole store across a process pool and replaces the
+        checkpoint with the result.
+        """
+        with self.lock:
+            store = get_block_store(self.chain_file)
+            first_invalid, height, tip_hash = verify_blocks(store.iter_range(), workers)
+            self.reset()
+            self.height = height
+            self.tip_hash = tip_hash
+            self.state["first_invalid"] = first_invalid
+            self.save()
+            return self
+
+
+def verify_blocks(blocks, workers=None):
+    """
+    Checks links in-process and hashes in `workers` processes, streaming
+    `blocks` in batches. Returns (first invalid height or None, block count,
+    tip hash).
+    """
+    workers = workers or os.cpu_count() or 1
+    blocks = iter(blocks)
+    first_invalid = None
+    height, tip_hash = 0, None
+    pending = []
+
+    def settle(bad):
+        nonlocal first_invalid
+        if bad is not None and (first_invalid is None or bad < first_invalid):
+            first_invalid = bad
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            batch = list(islice(blocks, VERIFY_BATCH))
+            if not batch:
+                break
+            for offset, block in enumerate(batch):
+                if height + offset and block.get("previous_hash") != tip_hash and first_invalid is None:
+                    first_invalid = height + offset
+                tip_hash = block.get("hash")
+            if pool:
+                pending.append(pool.submit(first_invalid_hash, batch, height))
+            else:
+                settle(first_invalid_hash(batch, height))
+            height += len(batch)
+            # Bound the number of batches in flight to keep memory flat.
+            while len(pending) > workers * 2:
+                settle(pending.pop(0).result())
+        for future in pending:
+            settle(future.result())
+    finally:
+        if pool:
+            pool.shutdown()
+    return first_invalid, height, tip_hash
+
+
+_indexes = {}
+
+def get_validation_index(chain_file=CHAIN_FILE, sync=True):
+    index = _indexes.get(chain_file)
+    if index is None:
+        index = _indexes[chain_file] = ValidationIndex(chain_file)
+    return index.sync() if sync else index
@@ -1,15 +1,12 @@
 import os
-import fcntl
-import time
 import json
-import platform
 import requests
 from functools import wraps
 from config.configutil import OrbitDB
+from core.blockstore import BlockStore, StoreConflict, StoreLockTimeout, store_path
 
 orbit_db = OrbitDB()
 CHAIN_FILE = orbit_db.blockchaindb
-LOCK_FILE = CHAIN_FILE + ".lock"
 NODES_FILE = orbit_db.nodedb
 PENDING_PROPOSALS_FILE = orbit_db.pendpropdb
 EXPLORER = orbit_db.explorer
@@ -102,12 +99,22 @@ def session_util(option, sessions=None):
 
 # ===================== CHAIN FUNCS =====================
 
+_wallet_mapping = (None, {})
+
+def load_wallet_mapping():
+    # label -> address for the system wallets, re-read only when the file changes.
+    global _wallet_mapping
+    mtime = os.stat(orbit_db.walletmapping).st_mtime_ns
+    if _wallet_mapping[0] != mtime:
+        with open(orbit_db.walletmapping, "r") as f:
+            _wallet_mapping = (mtime, json.load(f))
+    return _wallet_mapping[1]
+
 def get_address_from_label(label):
     if not os.path.exists(orbit_db.walletmapping):
         raise FileNotFoundError(f"{orbit_db.walletmapping} does not exist.")
 
-    with open(orbit_db.walletmapping, "r") as f:
-        mapping = json.load(f)
+    mapping = load_wallet_mapping()
 
     address = mapping.get(label)
     if not address:
@@ -115,117 +122,126 @@ def get_address_from_label(label):
 
     return address
 
-def acquire_soft_lock(owner_id, timeout=5):
-    start = time.time()
-
-    while os.path.exists(LOCK_FILE):
-        try:
-            with open(LOCK_FILE, "r") as f:
-                current_owner = f.read().strip()
-        except (OSError, IOError) as e:
-            print(f"[Soft Lock] Warning: Failed to read lock file: {e}")
-            time.sleep(0.1)
-            continue
-
-        if time.time() - start > timeout:
-            print(f"[Soft Lock] Timeout waiting for lock held by {current_owner}")
-            return False
-        time.sleep(0.1)
-
-    try:
-        f = open(LOCK_FILE, "w")
-        if FILE_LOCK_SUPPORTED:
-            try:
-                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            except BlockingIOError:
-                f.close()
-                print("[Soft Lock] Could not acquire file lock via fcntl.")
-                return False
-
-        f.write(owner_id)
-        f.close()
-        return True
-    except (OSError, IOError) as e:
-        print(f"[Soft Lock] Failed to create or lock file: {e}")
-        return False
-
-def release_soft_lock(owner_id):
-    if os.path.exists(LOCK_FILE):
-        with open(LOCK_FILE, "r") as f:
-            current_owner = f.read().strip()
-        if current_owner == owner_id:
-            os.remove(LOCK_FILE)
-
-if platform.system() == 'Windows':
-    import msvcrt
-else:
-    try:
-        import fcntl
-        FILE_LOCK_SUPPORTED = True
-    except ImportError:
-        FILE_LOCK_SUPPORTED = False
-
 def fetch_chain(url="localhost", port="7000"):
-    chainurl=(f"{EXPLORER}/api/chain")
+    from core.chainutil import get_chain
+    return get_chain()
+
+_block_stores = {}
+
+def get_block_store(chain_file=CHAIN_FILE):
+    store = _block_stores.get(chain_file)
+    if store is None:
+        store = BlockStore(store_path(chain_file), sync=orbit_db.chainsync, sync_ms=orbit_db.chainsyncms)
+        # One-time migration from the legacy whole-file JSON chain.
+        if store.height() == 0 and os.path.exists(chain_file):
+            with store.lock.exclusive():
+                if store.height() == 0:
+                    store.import_json(chain_file)
+        _block_stores[chain_file] = store
+    return store
+
+# Readers share the store lock and never block one another; writers take it
+# exclusively. The lock is an flock on the store, so it dies with its holder.
+
+def load_chain(owner_id="explorer", wait_time=5, chain_file=CHAIN_FILE):
+    store = get_block_store(chain_file)
     try:
-        response = requests.get(chainurl, timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch chain. Status code: {response.status_code}")
-            return []
-    except Exception as e:
-        print(f"Error fetching chain: {e}")
+        with store.lock.shared(timeout=wait_time):
+            return store.read_all()
+    except StoreLockTimeout:
+        print(f"[Store Lock] Timeout: chain locked for writing ({owner_id}). Returning fallback empty chain.")
         return []
-
-def load_chain(owner_id="explorer", wait_time=5):
-    start = time.time()
-    while os.path.exists(LOCK_FILE):
-        try:
-            with open(LOCK_FILE, "r") as f:
-                lock_holder = f.read().strip()
-        except:
-            lock_holder = "unknown"
-
-        if time.time() - start > wait_time:
-            print(f"[Soft Lock] Timeout: chain locked by {lock_holder}. Returning fallback empty chain.")
-            return []  # <-- instead of None
-        time.sleep(0.1)
-
-    try:
-        with open(LOCK_FILE, "w") as f:
-            f.write(owner_id)
-
-        if not os.path.exists(CHAIN_FILE):
-            return [create_genesis_block()]
-
-        with open(CHAIN_FILE, "r") as f:
-            return json.load(f)
-
     except Exception as e:
         print(f"[load_chain] Failed: {e}")
         return []
 
-    finally:
-        if os.path.exists(LOCK_FILE):
-            try:
-                with open(LOCK_FILE, "r") as f:
-                    current = f.read().strip()
-                if current == owner_id:
-                    os.remove(LOCK_FILE)
-            except:
-                pass
-
+def load_chain_tail(count, chain_file=CHAIN_FILE):
+    return get_block_store(chain_file).tail(count)
 
 def save_chain(chain, owner_id="default", chain_file=CHAIN_FILE):
-    if not acquire_soft_lock(owner_id):
+    try:
+        get_block_store(chain_file).replace(chain)
+        return True
+    except StoreLockTimeout:
+        print(f"[Store Lock] {owner_id} timed out waiting to write the chain.")
         return False
+
+def append_block(block, owner_id="default", chain_file=CHAIN_FILE):
     try:
-        with open(chain_file, "w") as f:
-            json.dump(chain, f, indent=4)
+        get_block_store(chain_file).append(block)
         return True
-    finally:
-        release_soft_lock(owner_id)
+    except StoreLockTimeout:
+        print(f"[Store Lock] {owner_id} timed out waiting to append a block.")
+        return False
+    except StoreConflict as e:
+        print(f"[append_block] {owner_id}: {e}")
+        return False
+
+# ===================== CHAIN ITERATORS =====================
+
+def chain_height(chain_file=CHAIN_FILE):
+    height = get_block_store(chain_file).height()
+    if height:
+        return height
+    from core.chainutil import get_chain_view
+    return get_chain_view(chain_file).height
+
+def _needle(value):
+    return json.dumps(value).encode()
+
+def iter_blocks(start=0, end=None, reverse=False, needles=None, chain_file=CHAIN_FILE):
+    """
+    Streams blocks from the store without materializing the chain. Falls
+    back to the shared chain view when there is no local store.
+    """
+    store = get_block_store(chain_file)
+    if store.height():
+        yield from store.iter_range(start, end, reverse, needles)
+        return
+
+    from core.chainutil import get_chain_view
+    blocks = get_chain_view(chain_file).blocks[start:end]
+    for block in (reversed(blocks) if reverse else blocks):
+        if needles:
+            raw = json.dumps(block).encode()
+            if not all(any(n in raw for n in group) for group in needles):
+                continue
+        yield block
+
+def iter_transactions(start=0, end=None, reverse=False, tx_type=None, sender=None, recipient=None,
+                      where=None, chain_file=CHAIN_FILE):
+    """
+    Streams (block, tx) pairs. `tx_type` (a note type such as "token_transfer",
+    or a tuple of them), `sender` and `recipient` are pushed down to the store
+    so non-matching blocks are never decoded; `where` is an extra predicate.
+    """
+    tx_types = (tx_type,) if isinstance(tx_type, str) else tuple(tx_type or ())
+    needles = []
+    if tx_types:
+        needles.append([_needle(t) for t in tx_types])
+    if sender is not None:
+        needles.append([_needle(sender)])
+    if recipient is not None:
+        needles.append([_needle(recipient)])
+
+    for block in iter_blocks(start, end, reverse, needles, chain_file):
+        txs = block.get("transactions", [])
+        for tx in (reversed(txs) if reverse else txs):
+            if sender is not None and tx.get("sender") != sender:
+                continue
+            if recipient is not None and tx.get("recipient") != recipient:
+                continue
+            if tx_types:
+                note = tx.get("note")
+                kinds = note.get("type") if isinstance(note, dict) else None
+                if not isinstance(kinds, dict) or not any(t in kinds for t in tx_types):
+                    continue
+            if where is not None and not where(tx):
+                continue
+            yield block, tx
+
+def export_chain_json(chain_file=CHAIN_FILE, export_file=None):
+    return get_block_store(chain_file).export_json(export_file or chain_file)
 
 # ===================== DECORATORS =====================
 
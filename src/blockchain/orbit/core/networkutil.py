@@ -1,10 +1,13 @@
 import json
 import re
-import requests
+import time
 import socket
 import threading
-from core.ioutil import fetch_chain, save_chain, load_nodes
+from concurrent.futures import ThreadPoolExecutor, wait
+from core.ioutil import save_chain, append_block, load_nodes
+from core.chainutil import has_block, get_block_height, get_chain_view
 from core.logutil import log_node_activity
+from core.serialutil import encode_block
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
@@ -19,17 +22,72 @@ adapter = HTTPAdapter(max_retries=retries, pool_connections=10, pool_maxsize=20)
 session.mount("http://", adapter)
 session.mount("https://", adapter)
 
+# Broadcasts fan out over their own keep-alive pool without retries: a slow
+# or dead peer gets one bounded attempt, and the circuit breaker below keeps
+# repeat offenders out of later broadcasts altogether.
+BROADCAST_WORKERS = 16
+BROADCAST_TIMEOUT = (1.0, 3.0)  # (connect, read) per peer
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+
+broadcast_session = requests.Session()
+broadcast_adapter = HTTPAdapter(max_retries=0, pool_connections=BROADCAST_WORKERS, pool_maxsize=BROADCAST_WORKERS)
+broadcast_session.mount("http://", broadcast_adapter)
+broadcast_session.mount("https://", broadcast_adapter)
+_broadcast_pool = None
+_broadcast_pool_lock = threading.Lock()
+
+
+class PeerBreaker:
+    """
+    Per-peer circuit breaker. After BREAKER_THRESHOLD consecutive failures
+    a peer is skipped for BREAKER_COOLDOWN seconds; then one attempt is let
+    through, and its outcome closes the breaker or opens it again.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.opened = {}
+        self.lock = threading.Lock()
+
+    def allow(self, peer):
+        with self.lock:
+            opened = self.opened.get(peer)
+            if opened is None:
+                return True
+            if time.time() - opened < self.cooldown:
+                return False
+            # Half-open: this caller probes; others wait for another cooldown.
+            self.opened[peer] = time.time()
+            return True
+
+    def record(self, peer, ok):
+        with self.lock:
+            if ok:
+                self.failures.pop(peer, None)
+                self.opened.pop(peer, None)
+                return
+            self.failures[peer] = self.failures.get(peer, 0) + 1
+            if self.failures[peer] >= self.threshold:
+                self.opened[peer] = time.time()
+
+
+breaker = PeerBreaker()
+
 
 def ping_node(address):
     try:
-        response = requests.get(f"{address}/ping", timeout=3)
+        response = session.get(f"{address}/ping", timeout=3)
         return response.status_code == 200
     except:
         return False
 
 def send_block_to_node(address, block_data):
     try:
-        res = requests.post(f"{address}/receive_block", json=block_data, timeout=5)
+        res = session.post(f"{address}/receive_block", data=encode_block(block_data),
+                           headers={"Content-Type": "application/json"}, timeout=5)
         return res.status_code == 200
     except Exception as e:
         print(f"Failed to send block to {address}: {e}")
@@ -37,13 +95,49 @@ def send_block_to_node(address, block_data):
 
 def send_block(url, block):
     try:
-        block_dict = block.to_dict() if hasattr(block, "to_dict") else block
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(url, headers=headers, data=json.dumps(block_dict), timeout=3)
+        response = session.post(url, headers=headers, data=encode_block(block), timeout=3)
         response.raise_for_status()
     except Exception as e:
         raise e
 
+def get_broadcast_pool():
+    global _broadcast_pool
+    with _broadcast_pool_lock:
+        if _broadcast_pool is None:
+            _broadcast_pool = ThreadPoolExecutor(max_workers=BROADCAST_WORKERS, thread_name_prefix="broadcast")
+    return _broadcast_pool
+
+def _post_block(url, payload, timeout):
+    try:
+        res = broadcast_session.post(url, data=payload, headers={"Content-Type": "application/json"}, timeout=timeout)
+        ok = res.status_code == 200
+    except Exception:
+        ok = False
+    breaker.record(url, ok)
+    return ok
+
+def broadcast_block_to_urls(urls, block, timeout=BROADCAST_TIMEOUT):
+    """
+    Posts a block to every url concurrently and returns {url: result}, where
+    result is True (accepted), False (failed or timed out) or None (skipped
+    by its circuit breaker). The block is encoded once for all peers, and
+    the call returns once the slowest peer answers or times out.
+    """
+    payload = encode_block(block)
+    results, futures = {}, {}
+    pool = get_broadcast_pool()
+    for url in dict.fromkeys(urls):
+        if breaker.allow(url):
+            futures[pool.submit(_post_block, url, payload, timeout)] = url
+        else:
+            results[url] = None
+    deadline = sum(timeout) if isinstance(timeout, tuple) else timeout
+    done, _ = wait(futures, timeout=deadline + 1)
+    for future, url in futures.items():
+        results[url] = future.result() if future in done else False
+    return results
+
 def start_listener(node_id, username):
     if not node_id:
         log_node_activity(node_id, "Start Listener", f"No config found for node {node_id}")
@@ -82,9 +176,9 @@ def handle_connection(conn, addr, node_id):
 
         if msg.get("type") == "block":
             block_data = msg["data"]
-            chain = fetch_chain()
+            chain = get_chain_view().blocks
 
-            if any(b["hash"] == block_data["hash"] for b in chain):
+            if has_block(block_data["hash"]):
                 log_node_activity(node_id, "Handle Connection", f"[{node_id}] Duplicate block {block_data['hash']}, ignoring.")
                 update_trust(node_id, success=True)
                 update_uptime(node_id, is_online=True)
@@ -92,26 +186,25 @@ def handle_connection(conn, addr, node_id):
 
             if not chain and block_data["index"] == 0:
                 log_node_activity(node_id, "Handle Connection", f"[{node_id}] Genesis block accepted.")
-                save_chain([block_data])
+                append_block(block_data)
                 return
 
             if chain and block_data["previous_hash"] == chain[-1]["hash"]:
                 log_node_activity(node_id, "Handle Connection", f"[{node_id}] Block accepted at index {block_data['index']}.")
-                chain.append(block_data)
-                save_chain(chain)
+                append_block(block_data)
                 update_trust(node_id, success=True)
                 update_uptime(node_id, is_online=True)
                 return
 
             # Attempt backtrack
-            for i in range(len(chain) - 1, -1, -1):
-                if chain[i]["hash"] == block_data["previous_hash"]:
-                    log_node_activity(node_id, "Handle Connection", f"[{node_id}] Block attached after backtracking to index {i}.")
-                    new_chain = chain[:i+1] + [block_data]
-                    save_chain(new_chain)
-                    update_trust(node_id, success=True)
-                    update_uptime(node_id, is_online=True)
-                    return
+            i = get_block_height(block_data["previous_hash"])
+            if i is not None:
+                log_node_activity(node_id, "Handle Connection", f"[{node_id}] Block attached after backtracking to index {i}.")
+                new_chain = list(chain[:i+1]) + [block_data]
+                save_chain(new_chain)
+                update_trust(node_id, success=True)
+                update_uptime(node_id, is_online=True)
+                return
 
             log_node_activity(node_id, "Handle Connection", f"[{node_id}] Rejected block: previous hash mismatch.\n"
                   f"Expected: {chain[-1]['hash'] if chain else 'None'}, "
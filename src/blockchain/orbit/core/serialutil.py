@@ -0,0 +1,91 @@
+import json
+
+try:
+    import msgpack
+    BINARY_SUPPORTED = True
+except ImportError:
+    BINARY_SUPPORTED = False
+
+# Two canonical JSON forms, both with sorted keys:
+#
+#   canonical: json.dumps(sort_keys=True) with the default ", " / ": "
+#              separators. This is what block hashes and merkle leaves have
+#              always been computed over, so it must never change.
+#   compact:   no whitespace. Used for the block store and the wire.
+#
+# TXConfig.Transaction memoizes both until one of its fields is
+# reassigned, and blocks are encoded by splicing their transactions'
+# cached bytes into the block envelope, so a transaction is serialized
+# once however often its block is hashed, stored or sent.
+
+BLOCK_HASH_FIELDS = ("index", "merkle_root", "metadata", "nonce", "previous_hash",
+                     "timestamp", "transactions", "validator")
+
+
+def canonical(obj):
+    return json.dumps(obj, sort_keys=True).encode()
+
+def compact(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+def tx_canonical(tx):
+    return tx.canonical() if hasattr(tx, "canonical") else canonical(tx)
+
+def tx_compact(tx):
+    return tx.compact() if hasattr(tx, "compact") else compact(tx)
+
+
+def _splice(fields, encoded_txs, is_compact):
+    """
+    Encodes `fields` (a dict without "transactions") plus the pre-encoded
+    transactions exactly as json.dumps(sort_keys=True) would.
+    """
+    item_sep, key_sep = (b",", b":") if is_compact else (b", ", b": ")
+    encode = compact if is_compact else canonical
+    values = {key: encode(value) for key, value in fields.items()}
+    values["transactions"] = b"[" + item_sep.join(encoded_txs) + b"]"
+    return b"{" + item_sep.join(
+        json.dumps(key).encode() + key_sep + values[key] for key in sorted(values)
+    ) + b"}"
+
+def block_hash_payload(index, previous_hash, timestamp, transactions, validator="", merkle_root="", nonce=0, metadata=None):
+    fields = {
+        "index": index,
+        "previous_hash": previous_hash,
+        "timestamp": timestamp,
+        "validator": validator,
+        "merkle_root": merkle_root,
+        "nonce": nonce,
+        "metadata": metadata or {}
+    }
+    return _splice(fields, [tx_canonical(tx) for tx in transactions], False)
+
+def encode_block(block):
+    """
+    Compact encoding of a block dict or TXConfig.Block.
+    """
+    if hasattr(block, "to_dict"):
+        txs = block.transaction_data
+        fields = block.to_dict()
+    else:
+        txs = block.get("transactions", [])
+        fields = dict(block)
+    fields.pop("transactions", None)
+    return _splice(fields, [tx_compact(tx) for tx in txs], True)
+
+def decode(raw):
+    return json.loads(raw)
+
+# ===================== BINARY =====================
+
+def to_binary(obj):
+    if not BINARY_SUPPORTED:
+        raise RuntimeError("Binary encoding requires msgpack (pip install msgpack)")
+    if hasattr(obj, "to_dict"):
+        obj = obj.to_dict()
+    return msgpack.packb(obj, use_bin_type=True)
+
+def from_binary(raw):
+    if not BINARY_SUPPORTED:
+        raise RuntimeError("Binary encoding requires msgpack (pip install msgpack)")
+    return msgpack.unpackb(raw, raw=False)
@@ -0,0 +1,160 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from core.ioutil import EXPLORER
+from core.hashutil import block_hash
+from core.chainutil import fetch_remote_tip
+
+# Headers-first sync: fetch the compact headers past our tip, check that
+# they link up, then fetch the bodies in SYNC_BATCH-block batches spread
+# over every source (the explorer and any peers serving /api/chain) and
+# check each body against its header. A node that is already at the tip
+# only pays for one conditional /api/tip request.
+SYNC_BATCH = 200
+SYNC_WORKERS = 4
+# The explorer's /api/headers page size cap.
+HEADER_PAGE = 2000
+HEADER_FIELDS = ("index", "hash", "previous_hash", "merkle_root")
+
+
+def fetch_header_page(start, limit=HEADER_PAGE, explorer=EXPLORER):
+    try:
+        response = requests.get(f"{explorer}/api/headers", params={"from": start, "limit": limit}, timeout=5)
+        if response.status_code != 200:
+            print(f"Failed to fetch headers. Status code: {response.status_code}")
+            return None
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching headers: {e}")
+        return None
+
+def fetch_remote_headers(start=0, explorer=EXPLORER):
+    headers = []
+    while True:
+        page = fetch_header_page(start, explorer=explorer)
+        if page is None:
+            return None
+        if not page:
+            return headers
+        headers.extend(page)
+        start = page[-1].get("index", start) + 1
+
+def find_common_ancestor(blocks, explorer=EXPLORER):
+    """
+    Length of the longest prefix of `blocks` the explorer shares, found by
+    walking back from our tip in doubling header windows. Returns None if
+    the explorer could not be reached.
+    """
+    end = len(blocks) - 1  # our tip is known to differ
+    step = 1
+    while end > 0:
+        start = max(0, end - step)
+        page = fetch_header_page(start, end - start, explorer=explorer)
+        if page is None:
+            return None
+        # A matching hash commits to everything below it.
+        for header in reversed(page):
+            i = header.get("index")
+            if isinstance(i, int) and 0 <= i < end and header.get("hash") == blocks[i].get("hash"):
+                return i + 1
+        end = start
+        step = min(step * 2, HEADER_PAGE)
+    return 0
+
+def verify_headers(headers, start=0, previous_hash=None):
+    """
+    Returns how many leading headers form a chain from `start` on top of
+    `previous_hash` (None skips the check for the first header).
+    """
+    for i, header in enumerate(headers):
+        if header.get("index") != start + i:
+            return i
+        if (i or previous_hash is not None) and header.get("previous_hash") != previous_hash:
+            return i
+        previous_hash = header.get("hash")
+    return len(headers)
+
+def fetch_block_batch(source, start, end):
+    # [start, end) from a source's paged /api/chain.
+    try:
+        response = requests.get(f"{source}/api/chain",
+                                params={"from": start, "to": end - 1, "limit": end - start}, timeout=10)
+        if response.status_code != 200:
+            return None
+        return response.json()
+    except Exception:
+        return None
+
+def _body_matches(block, header):
+    if not isinstance(block, dict):
+        return False
+    if any(block.get(field) != header.get(field) for field in HEADER_FIELDS):
+        return False
+    # The genesis block is not re-hashed, matching is_chain_valid.
+    return header["index"] == 0 or block_hash(block) == header["hash"]
+
+def _fetch_batch(headers, sources, first):
+    # Try the sources in turn, starting with this batch's own.
+    start, end = headers[0]["index"], headers[-1]["index"] + 1
+    for i in range(len(sources)):
+        source = sources[(first + i) % len(sources)]
+        blocks = fetch_block_batch(source, start, end)
+        if blocks and len(blocks) == len(headers) and all(map(_body_matches, blocks, headers)):
+            return blocks
+        print(f"[Sync] Blocks {start}-{end - 1} from {source} missing or invalid")
+    return None
+
+def fetch_bodies(headers, sources, batch=SYNC_BATCH, workers=SYNC_WORKERS):
+    """
+    Fetches and verifies the bodies for `headers`. Batches are spread over
+    `sources` round-robin and fetched in parallel. Returns the bodies for the
+    longest prefix of headers that could be fetched.
+    """
+    batches = [headers[i:i + batch] for i in range(0, len(headers), batch)]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+        results = pool.map(_fetch_batch, batches, [sources] * len(batches), range(len(batches)))
+        blocks = []
+        for result in results:
+            if result is None:
+                break
+            blocks.extend(result)
+    return blocks
+
+def headers_first_sync(blocks, peers=(), explorer=EXPLORER, etag=None):
+    """
+    Brings `blocks` (the local chain) up to the explorer's tip. Returns
+    (height, new_blocks, etag): the local chain should be cut to `height`
+    and extended with `new_blocks`. new_blocks is None when nothing changed.
+    """
+    # The etag is only advanced once the sync completes, so a failed or
+    # partial sync is retried on the next call instead of getting a 304.
+    tip, tip_etag = fetch_remote_tip(etag, explorer=explorer)
+    if tip is None:
+        return len(blocks), None, etag
+    if blocks and tip.get("hash") == blocks[-1].get("hash"):
+        return len(blocks), None, tip_etag
+
+    height = len(blocks)
+    headers = fetch_remote_headers(height, explorer=explorer)
+    if headers is None:
+        return len(blocks), None, etag
+    if headers and blocks and headers[0].get("previous_hash") != blocks[-1].get("hash"):
+        # The explorer's chain diverged from ours: rewind to the last block
+        # we share and take its headers from there.
+        height = find_common_ancestor(blocks, explorer=explorer)
+        headers = None if height is None else fetch_remote_headers(height, explorer=explorer)
+        if headers is None:
+            return len(blocks), None, etag
+
+    previous_hash = blocks[height - 1].get("hash") if height else None
+    linked = verify_headers(headers, height, previous_hash)
+    if linked < len(headers):
+        print(f"[Sync] Header chain breaks at {height + linked}; syncing up to it")
+        headers = headers[:linked]
+    if not headers:
+        return len(blocks), None, etag
+
+    new_blocks = fetch_bodies(headers, [explorer] + [peer for peer in peers if peer != explorer])
+    if not new_blocks or (height < len(blocks) and height + len(new_blocks) <= len(blocks)):
+        # Never trade the local chain for a shorter one.
+        return len(blocks), None, etag
+    return height, new_blocks, tip_etag if len(new_blocks) == len(headers) else etag
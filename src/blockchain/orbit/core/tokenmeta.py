@@ -1,4 +1,5 @@
 from core.orderutil import token_stats
+from core.index_util.orderbook import get_order_book, depth
 import datetime
 async def get_token_meta(symbol):
     token_sym = symbol.upper()
@@ -70,32 +71,7 @@ async def get_token_meta(symbol):
             total_volume = filled_tokens_bought + filled_tokens_sold
             buy_ratio = (filled_tokens_bought / total_volume * 100) if total_volume > 0 else 0
 
-            buy_order_book = []
-            sell_order_book = []
-
-            for order in open_book:
-                price = float(order.get("price", 0))
-                type = order.get("type")
-                qty = float(order.get("amount", 0))
-                if type == "buy":
-                    buy_order_book.append({"price": price, "quantity": qty})
-                else:
-                    sell_order_book.append({"price": price, "quantity": qty})
-
-
-            buy_order_book = sorted(buy_order_book, key=lambda x: -x["price"])
-            sell_order_book = sorted(sell_order_book, key=lambda x: x["price"])
-
-            def cumulative_orders(order_book):
-                cum_qty = 0
-                cum_data = []
-                for entry in order_book:
-                    cum_qty += entry["quantity"]
-                    cum_data.append({"price": entry["price"], "cum_quantity": cum_qty})
-                return cum_data
-
-            token_meta["buy_depth"] = cumulative_orders(buy_order_book)
-            token_meta["sell_depth"] = cumulative_orders(sell_order_book)
+            token_meta.update(depth(get_order_book(), token_sym))
 
             # Convert timestamped entries to daily price points
             date_index_map = {date: idx for idx, date in enumerate(price_history_dates)}
@@ -142,11 +118,9 @@ async def get_token_meta(symbol):
             })
 
 
-        token_meta["buy_depth"] = cumulative_orders(buy_order_book)
-        token_meta["sell_depth"] = cumulative_orders(sell_order_book)
         return token_meta
 
     except Exception as e:
         return {"error": e}
 #    finally:
-#        return token_meta
\ No newline at end of file
+#        return token_meta
\ No newline at end of file
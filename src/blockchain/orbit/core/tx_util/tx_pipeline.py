@@ -0,0 +1,223 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from core.ioutil import load_users, iter_transactions
+from core.walletutil import load_balance
+from core.index_util.tokens import get_token_index
+from core.hashutil import signing_payload, verify_signature_batch
+from core.tx_util.tx_validator import RULES
+
+# Signatures are pure-Python RSA, so large batches go to a process pool.
+SIGNATURE_CHUNK = 32
+SIGNATURE_POOL_MIN = 64
+_signature_pool = None
+
+BALANCE_EPSILON = 1e-9
+
+
+def is_wallet(address):
+    # System accounts (mining, lockup_rewards, ...) mint and are not balance-checked.
+    return isinstance(address, str) and address.startswith("ORB.") and len(address) == 28
+
+
+class BalanceOverlay:
+    """
+    Balances as of the end of the chain plus the transactions accepted so
+    far in the block being validated. Chain balances are read once per
+    address from the balance and token indexes; accepted transactions only
+    adjust the in-memory deltas.
+    """
+
+    def __init__(self):
+        self.orbit_base = {}
+        self.orbit_delta = defaultdict(float)
+        self.token_base = {}
+        self.token_delta = defaultdict(float)
+
+    def orbit(self, address):
+        if address not in self.orbit_base:
+            self.orbit_base[address] = load_balance(address)[0]
+        return self.orbit_base[address] + self.orbit_delta[address]
+
+    def prefetch_tokens(self, pairs):
+        missing = {pair for pair in pairs if pair not in self.token_base}
+        if not missing:
+            return
+        index = get_token_index()
+        if index.height:
+            for address, symbol in missing:
+                self.token_base[(address, symbol)] = index.balance(address, symbol)
+            return
+        # No local block store (remote-only process): scan the chain once.
+        for pair in missing:
+            self.token_base[pair] = 0
+        for block, tx in iter_transactions(tx_type="token_transfer"):
+            data = tx["note"]["type"]["token_transfer"]
+            symbol = data.get("token_symbol")
+            receiver = (data.get("receiver"), symbol)
+            sender = (data.get("sender"), symbol)
+            if receiver in missing:
+                self.token_base[receiver] += data.get("amount", 0)
+            if sender in missing:
+                self.token_base[sender] -= data.get("amount", 0)
+
+    def token(self, address, symbol):
+        pair = (address, symbol)
+        if pair not in self.token_base:
+            self.prefetch_tokens([pair])
+        return self.token_base[pair] + self.token_delta[pair]
+
+    def apply(self, tx):
+        amount = _amount(tx.get("amount", 0))
+        self.orbit_delta[tx.get("sender")] -= amount
+        self.orbit_delta[tx.get("recipient")] += amount
+        transfer = _token_transfer(tx)
+        if transfer:
+            symbol = transfer.get("token_symbol")
+            self.token_delta[(transfer.get("sender"), symbol)] -= _amount(transfer.get("amount", 0))
+            self.token_delta[(transfer.get("receiver"), symbol)] += _amount(transfer.get("amount", 0))
+
+
+def _amount(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _note_types(tx):
+    note = tx.get("note")
+    kinds = note.get("type") if isinstance(note, dict) else None
+    return kinds if isinstance(kinds, dict) else {}
+
+def _token_transfer(tx):
+    data = _note_types(tx).get("token_transfer")
+    return data if isinstance(data, dict) else None
+
+# ===================== SIGNATURES =====================
+
+def _public_keys():
+    keys = {}
+    for name, user in load_users().items():
+        key = user.get("public_key")
+        if key:
+            keys[name] = key
+            if user.get("address"):
+                keys[user["address"]] = key
+    return keys
+
+def _signature_jobs(txs, require_signature):
+    """
+    Collects (index, payload, signature, key) for every signed payload in
+    the block. Returns the jobs and the failures known without verifying.
+    """
+    jobs, failures = [], {}
+    keys = None
+    for i, tx in enumerate(txs):
+        signed = []
+        if tx.get("signature"):
+            signed.append((tx, tx.get("sender")))
+        transfer = _token_transfer(tx)
+        if transfer is not None:
+            if transfer.get("signature"):
+                signed.append((transfer, transfer.get("sender")))
+            elif require_signature:
+                failures[i] = "Invalid signature"
+                continue
+        for data, signer in signed:
+            if keys is None:
+                keys = _public_keys()
+            key = keys.get(signer)
+            if not key:
+                failures[i] = f"No public key for signer {signer}"
+                break
+            jobs.append((i, signing_payload(data), data["signature"], key))
+    return jobs, failures
+
+def _get_signature_pool(workers=None):
+    global _signature_pool
+    if _signature_pool is None:
+        _signature_pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    return _signature_pool
+
+def verify_signatures(jobs, workers=None):
+    """
+    Verifies (payload, signature, key) triples, in chunks across a process
+    pool when there are enough of them to pay for it.
+    """
+    if len(jobs) < SIGNATURE_POOL_MIN:
+        return verify_signature_batch(jobs)
+    pool = _get_signature_pool(workers)
+    chunks = [jobs[i:i + SIGNATURE_CHUNK] for i in range(0, len(jobs), SIGNATURE_CHUNK)]
+    results = []
+    for chunk_results in pool.map(verify_signature_batch, chunks):
+        results.extend(chunk_results)
+    return results
+
+# ===================== PIPELINE =====================
+
+def validate_transactions(txs, overlay=None, require_signature=False, token_balances=True, workers=None):
+    """
+    Validates a block's worth of transactions in one pass and returns a
+    (valid, message) pair per transaction, in order:
+
+    1. every signature in the block is verified as one batch;
+    2. each transaction's note payloads are checked against the compiled
+       rules for their type;
+    3. ORBIT and token balances are checked against `overlay`, which
+       accepted transactions then update, so later transactions in the
+       same block see their effects. token_balances=False skips the token
+       side, whose holdings also move through exchange orders.
+    """
+    overlay = overlay or BalanceOverlay()
+    txs = [tx.to_dict() if hasattr(tx, "to_dict") else tx for tx in txs]
+
+    jobs, failures = _signature_jobs(txs, require_signature)
+    if jobs:
+        verdicts = verify_signatures([job[1:] for job in jobs], workers)
+        for (i, _, _, _), ok in zip(jobs, verdicts):
+            if not ok:
+                failures.setdefault(i, "Invalid signature")
+
+    if token_balances:
+        overlay.prefetch_tokens({
+            (transfer.get("sender"), transfer.get("token_symbol"))
+            for transfer in map(_token_transfer, txs) if transfer
+        })
+
+    results = []
+    for i, tx in enumerate(txs):
+        if i in failures:
+            results.append((False, failures[i]))
+            continue
+        valid, msg = _check_tx(tx, overlay, token_balances)
+        if valid:
+            overlay.apply(tx)
+        results.append((valid, msg))
+    return results
+
+def _check_tx(tx, overlay, token_balances):
+    for kind, data in _note_types(tx).items():
+        rule = RULES.get(kind)
+        if rule is None:
+            continue
+        if not isinstance(data, dict):
+            return False, f"Invalid {kind} payload"
+        valid, msg = rule.validate(data, recent=False)
+        if not valid:
+            return False, msg
+
+    sender = tx.get("sender")
+    if is_wallet(sender):
+        amount = _amount(tx.get("amount", 0))
+        if amount < 0:
+            return False, "Invalid transfer amount"
+        if amount > overlay.orbit(sender) + BALANCE_EPSILON:
+            return False, f"Insufficient balance for {sender}"
+
+    transfer = _token_transfer(tx) if token_balances else None
+    if transfer:
+        symbol = transfer.get("token_symbol")
+        if _amount(transfer.get("amount", 0)) > overlay.token(transfer.get("sender"), symbol) + BALANCE_EPSILON:
+            return False, "Insufficient balance"
+
+    return True, "Valid transaction"
@@ -1,74 +1,120 @@
 import time
 import uuid
 
+# ===================== RULES =====================
+#
+# The rule registry is compiled once at import time; validators only look
+# rules up. Autofix entries map a field to a factory for its default value.
+
+def _is_recent_timestamp(ts):
+    now = time.time()
+    return now - 300 < ts < now + 300  # ±5 minutes
+
+def _is_positive_number(val):
+    try:
+        return float(val) > 0
+    except:
+        return False
+
+def _is_non_negative_number(val):
+    try:
+        return float(val) >= 0
+    except:
+        return False
+
+def _new_id():
+    return str(uuid.uuid4())
+
+def _default_fee():
+    return 0.01
+
+
+class TXRule:
+    __slots__ = ("required", "checks", "autofix")
+
+    def __init__(self, required, checks=None, autofix=None):
+        self.required = tuple(required)
+        self.checks = tuple((checks or {}).items())
+        self.autofix = autofix or {}
+
+    def validate(self, data, corrections=None, recent=True):
+        """
+        Checks `data` against the rule. With `corrections` (a list) missing or
+        invalid fields that have an autofix are filled in and reported there;
+        without it `data` is never modified. recent=False skips the ±5 minute
+        timestamp window, for transactions already waiting in a block.
+        """
+        for field in self.required:
+            if field not in data:
+                if corrections is not None and field in self.autofix:
+                    self._fix(data, field, corrections)
+                else:
+                    return False, f"Missing required field: {field}"
+
+        for field, check in self.checks:
+            if not recent and check is _is_recent_timestamp:
+                continue
+            try:
+                value = data[field]
+                if isinstance(value, str) and value.replace('.', '', 1).isdigit():
+                    value = float(value) if '.' in value else int(value)
+                    if corrections is not None:
+                        data[field] = value
+                if not check(value):
+                    if corrections is not None and field in self.autofix:
+                        self._fix(data, field, corrections)
+                        if not check(data[field]):
+                            return False, f"Invalid value for field: {field}"
+                    else:
+                        return False, f"Invalid value for field: {field}"
+            except Exception as e:
+                return False, f"Error validating field '{field}': {str(e)}"
+
+        return True, "Valid transaction metadata"
+
+    def _fix(self, data, field, corrections):
+        data[field] = self.autofix[field]()
+        corrections.append(f"Auto-filled '{field}'")
+
+
+RULES = {
+    "create_token": TXRule(
+        required=["token_id", "name", "symbol", "supply", "creator", "timestamp"],
+        checks={"supply": _is_positive_number, "timestamp": _is_recent_timestamp},
+        autofix={"token_id": _new_id, "timestamp": time.time}
+    ),
+    "list_token": TXRule(
+        required=["token_id", "symbol", "price", "lister", "exchange_fee", "timestamp"],
+        checks={"price": _is_positive_number, "exchange_fee": _is_non_negative_number,
+                "timestamp": _is_recent_timestamp},
+        autofix={"exchange_fee": _default_fee, "timestamp": time.time}
+    ),
+    "buy_token": TXRule(
+        required=["order_id", "token_id", "symbol", "amount", "buyer", "exchange_fee", "timestamp"],
+        checks={"amount": _is_positive_number, "exchange_fee": _is_non_negative_number,
+                "timestamp": _is_recent_timestamp},
+        autofix={"order_id": _new_id, "exchange_fee": _default_fee, "timestamp": time.time}
+    ),
+    "sell_token": TXRule(
+        required=["order_id", "token_id", "symbol", "amount", "seller", "exchange_fee", "timestamp"],
+        checks={"amount": _is_positive_number, "exchange_fee": _is_non_negative_number,
+                "timestamp": _is_recent_timestamp},
+        autofix={"order_id": _new_id, "exchange_fee": _default_fee, "timestamp": time.time}
+    ),
+    "token_transfer": TXRule(
+        required=["sender", "receiver", "amount", "token_symbol", "timestamp", "signature"],
+        checks={"amount": _is_positive_number, "timestamp": _is_recent_timestamp},
+        autofix={"timestamp": time.time}
+    ),
+}
+
+
 class TXValidator:
     def __init__(self, metadata):
         self.metadata = metadata
         self.errors = []
         self.corrections = []
-
-        # Registry of validation rules
-        self.rules = {
-            "create_token": {
-                "required": ["token_id", "name", "symbol", "supply", "creator", "timestamp"],
-                "checks": {
-                    "supply": self._is_positive_number,
-                    "timestamp": self._is_recent_timestamp
-                },
-                "autofix": {
-                    "token_id": lambda d: self._autofix(d, "token_id", str(uuid.uuid4())),
-                    "timestamp": lambda d: self._autofix(d, "timestamp", time.time())
-                }
-            },
-            "list_token": {
-                "required": ["token_id", "symbol", "price", "lister", "exchange_fee", "timestamp"],
-                "checks": {
-                    "price": self._is_positive_number,
-                    "exchange_fee": self._is_non_negative_number,
-                    "timestamp": self._is_recent_timestamp
-                },
-                "autofix": {
-                    "exchange_fee": lambda d: self._autofix(d, "exchange_fee", 0.01),
-                    "timestamp": lambda d: self._autofix(d, "timestamp", time.time())
-                }
-            },
-            "buy_token": {
-                "required": ["order_id", "token_id", "symbol", "amount", "buyer", "exchange_fee", "timestamp"],
-                "checks": {
-                    "amount": self._is_positive_number,
-                    "exchange_fee": self._is_non_negative_number,
-                    "timestamp": self._is_recent_timestamp
-                },
-                "autofix": {
-                    "order_id": lambda d: self._autofix(d, "order_id", str(uuid.uuid4())),
-                    "exchange_fee": lambda d: self._autofix(d, "exchange_fee", 0.01),
-                    "timestamp": lambda d: self._autofix(d, "timestamp", time.time())
-                }
-            },
-            "sell_token": {
-                "required": ["order_id", "token_id", "symbol", "amount", "seller", "exchange_fee", "timestamp"],
-                "checks": {
-                    "amount": self._is_positive_number,
-                    "exchange_fee": self._is_non_negative_number,
-                    "timestamp": self._is_recent_timestamp
-                },
-                "autofix": {
-                    "order_id": lambda d: self._autofix(d, "order_id", str(uuid.uuid4())),
-                    "exchange_fee": lambda d: self._autofix(d, "exchange_fee", 0.01),
-                    "timestamp": lambda d: self._autofix(d, "timestamp", time.time())
-                }
-            },
-            "token_transfer": {
-                "required": ["sender", "receiver", "amount", "token_symbol", "timestamp", "signature"],
-                "checks": {
-                    "amount": self._is_positive_number,
-                    "timestamp": self._is_recent_timestamp
-                },
-                "autofix": {
-                    "timestamp": lambda d: self._autofix(d, "timestamp", time.time())
-                }
-            }
-        }
+        self.rules = RULES
 
     def validate(self):
         tx_type_dict = self.metadata.get("type", {})
@@ -80,58 +126,9 @@ class TXValidator:
             if not rule:
                 return False, f"Unknown transaction type: {tx_name}"
 
-            valid, msg = self._validate_fields(
-                tx_data,
-                rule["required"],
-                rule.get("checks", {}),
-                rule.get("autofix", {})
-            )
+            valid, msg = rule.validate(tx_data, self.corrections)
             if valid and self.corrections:
                 return True, f"Valid with corrections: {', '.join(self.corrections)}"
             return valid, msg
 
         return False, "No transaction type found"
-
-    def _validate_fields(self, data, required_fields, custom_checks={}, autofix={}):
-        for field in required_fields:
-            if field not in data:
-                if field in autofix:
-                    autofix[field](data)  # Pass data dict to the autofix function
-                else:
-                    return False, f"Missing required field: {field}"
-
-        for field, check in custom_checks.items():
-            try:
-                if isinstance(data[field], str) and data[field].replace('.', '', 1).isdigit():
-                    data[field] = float(data[field]) if '.' in data[field] else int(data[field])
-                if not check(data[field]):
-                    if field in autofix:
-                        autofix[field](data)
-                        if not check(data[field]):
-                            return False, f"Invalid value for field: {field}"
-                    else:
-                        return False, f"Invalid value for field: {field}"
-            except Exception as e:
-                return False, f"Error validating field '{field}': {str(e)}"
-
-        return True, "Valid transaction metadata"
-
-    def _is_recent_timestamp(self, ts):
-        now = time.time()
-        return now - 300 < ts < now + 300  # ±5 minutes
-
-    def _is_positive_number(self, val):
-        try:
-            return float(val) > 0
-        except:
-            return False
-
-    def _is_non_negative_number(self, val):
-        try:
-            return float(val) >= 0
-        except:
-            return False
-
-    def _autofix(self, data, key, default_value):
-        data[key] = default_value
-        self.corrections.append(f"Auto-filled '{key}'")
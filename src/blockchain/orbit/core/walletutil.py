@@ -1,6 +1,6 @@
 import time, datetime
 from core.ioutil import fetch_chain
-from config.configutil import TXConfig
+from core.index_util.balances import get_balance_index
 
 async def get_wallet_stats(symbol):
     from core.tokenmeta import get_token_meta
@@ -25,62 +25,33 @@ async def get_wallet_stats(symbol):
     return wallet_stats
 
 def load_balance(username):
-    blockchain = fetch_chain() #load_chain(username)
-    balance = 0
-    locked_from_ledger = []
+    index = get_balance_index()
+    if index.height == 0:
+        # No local block store yet (remote-only process): scan the fetched chain.
+        return scan_balance(username, fetch_chain())
+    return index.get(username)
+
+def scan_balance(username, blockchain):
+    # Same totals as BalanceIndex, read straight from the transaction dicts
+    # instead of wrapping every transaction in history in an object.
     total_sent = 0
     total_received = 0
     total_locked = 0
 
     for block in blockchain:
-        for tx_data in block.get("transactions", []):
-            tx = TXConfig.Transaction.from_dict(tx_data)
-            note = (tx.note or "")
-            is_sender = tx.sender == username
-            is_recipient = tx.recipient == username
-            for txdata in block.get("transactions", {}):
-                if txdata["sender"] == username and txdata["recipient"] == "lockup_rewards":
+        txs = block.get("transactions", [])
+        for tx in txs:
+            amount = tx.get("amount", 0)
+            if tx.get("sender", "") == username:
+                total_sent += amount
+                if tx.get("recipient") == "lockup_rewards":
                     try:
-                        total_locked += int((txdata["note"]["type"]["lockup"]["amount"]))
+                        # Counted once per transaction in the block, as before.
+                        total_locked += int(tx["note"]["type"]["lockup"]["amount"]) * len(txs)
                     except Exception:
-                        continue
+                        pass
+            if tx.get("recipient", "") == username:
+                total_received += amount
 
-            # Tally totals
-            if is_sender:
-                total_sent += tx.amount
-            if is_recipient:
-                total_received += tx.amount
-
-            # Transfer logic (default if note is empty or includes "transfer")
-            if not note or "transfer" in note:
-                if is_sender:
-                    balance -= tx.amount
-                if is_recipient:
-                    balance += tx.amount
-
-            # Mining reward
-            elif "mining reward" in note:
-                if is_recipient:
-                    balance += tx.amount
-
-            # Lockup transaction
-            elif "lockup" in note:
-                if is_sender:
-                    locked_from_ledger.append({
-                        "amount": tx.amount,
-                        "start": tx.timestamp,
-                        "end": tx.lock_duration,
-                        "days": tx.claim_until,
-                    })
-                    balance -= tx.amount
-                    total_locked += tx.amount
-
-            # Claimed reward
-            elif "claimed reward" in note:
-                if is_recipient:
-                    balance += tx.amount
-
-    # Calculate currently locked amount from ledger
     balance = abs(total_received - total_sent)
-
     return round(balance, 6), round(total_locked, 6)
@@ -0,0 +1,136 @@
+"""
+Block propagation across simulated nodes: full-block flooding (every node
+sends the body to every peer) vs. inventory gossip (core.gossiputil).
+Runs in one process on a discrete-event clock; links have random latency
+and every message is counted at its encoded size.
+
+    python sim_gossip.py [nodes] [degree] [txs per block]    # default 100 16 500
+"""
+import sys
+import json
+import heapq
+import random
+import itertools
+import statistics
+from core.serialutil import encode_block
+from core.gossiputil import GossipRelay, GOSSIP_FANOUT
+
+LATENCY = (0.020, 0.080)   # one-way link latency, seconds
+VALIDATE = 0.005           # time to validate a block before relaying it
+
+
+def make_block(tx_count):
+    txs = [{
+        "sender": f"ORB.{i:024X}",
+        "recipient": f"ORB.{i * 7:024X}",
+        "amount": i % 1000 / 10,
+        "timestamp": 1_700_000_000 + i,
+        "note": "transfer"
+    } for i in range(tx_count)]
+    return {"index": 1, "hash": "f" * 64, "previous_hash": "0" * 64, "timestamp": 1_700_000_000,
+            "validator": "Node0", "merkle_root": "", "nonce": 0, "metadata": {}, "transactions": txs}
+
+
+def make_graph(nodes, degree, rng):
+    # Ring plus random chords, so the graph is connected.
+    peers = {n: {(n - 1) % nodes, (n + 1) % nodes} for n in range(nodes)}
+    for n in range(nodes):
+        while len(peers[n]) < degree:
+            other = rng.randrange(nodes)
+            if other != n:
+                peers[n].add(other)
+                peers[other].add(n)
+    return {n: sorted(p) for n, p in peers.items()}
+
+
+class Network:
+    def __init__(self, graph, rng):
+        self.graph = graph
+        self.rng = rng
+        self.events = []
+        self.counter = itertools.count()
+        self.bytes = 0
+        self.messages = 0
+        self.accepted = {}
+
+    def send(self, now, src, dst, kind, size, payload=None):
+        self.bytes += size
+        self.messages += 1
+        at = now + self.rng.uniform(*LATENCY)
+        heapq.heappush(self.events, (at, next(self.counter), dst, src, kind, payload))
+
+    def run(self, handler):
+        while self.events:
+            now, _, dst, src, kind, payload = heapq.heappop(self.events)
+            handler(now, dst, src, kind, payload)
+
+
+def simulate_flood(graph, block, body_size, rng):
+    net = Network(graph, rng)
+
+    def accept(now, node, sender):
+        net.accepted[node] = now
+        for peer in graph[node]:
+            if peer != sender:
+                net.send(now + VALIDATE, node, peer, "block", body_size)
+
+    def handler(now, node, src, kind, payload):
+        if node not in net.accepted:
+            accept(now, node, src)
+
+    accept(0.0, 0, None)
+    net.run(handler)
+    return net
+
+
+def simulate_gossip(graph, block, body_size, rng):
+    net = Network(graph, rng)
+    relays = {n: GossipRelay(f"Node{n}") for n in graph}
+    inv_size = len(json.dumps({"hashes": [block["hash"]], "index": block["index"]}))
+    want_size = len(json.dumps({"want": [block["hash"]]}))
+    empty_size = len(json.dumps({"want": []}))
+
+    def accept(now, node, sender):
+        net.accepted[node] = now
+        relays[node].remember(block)
+        for peer in relays[node].targets(graph[node], exclude=(sender,)):
+            net.send(now + VALIDATE, node, peer, "inv", inv_size)
+
+    def handler(now, node, src, kind, payload):
+        if kind == "inv":
+            if relays[node].wanted([block["hash"]], now=now):
+                net.send(now, node, src, "want", want_size)
+            else:
+                net.send(now, node, src, "none", empty_size)
+        elif kind == "want":
+            net.send(now, node, src, "block", body_size)
+        elif kind == "block" and node not in net.accepted:
+            accept(now, node, src)
+
+    accept(0.0, 0, None)
+    net.run(handler)
+    return net
+
+
+def report(label, net, nodes):
+    times = sorted(net.accepted.values())
+    print(f"{label:<8} {len(times):>4}/{nodes} nodes  {net.messages:>7} msgs  "
+          f"{net.bytes / 2**20:8.2f} MiB  p50 {statistics.median(times) * 1000:6.0f} ms  "
+          f"max {times[-1] * 1000:6.0f} ms")
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    tx_count = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    rng = random.Random(42)
+    graph = make_graph(nodes, degree, rng)
+    block = make_block(tx_count)
+    body_size = len(encode_block(block))
+    print(f"{nodes} nodes, ~{degree} peers each, fan-out {GOSSIP_FANOUT}, block {body_size / 1024:.1f} KiB")
+    report("flood", simulate_flood(graph, block, body_size, random.Random(1)), nodes)
+    report("gossip", simulate_gossip(graph, block, body_size, random.Random(1)), nodes)
+
+
+if __name__ == "__main__":
+    main()
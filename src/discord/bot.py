@@ -64,9 +64,17 @@ async def bootstrap_chain():
     t1   = now - timedelta(hours=1)
     t24  = now - timedelta(hours=24)
     print("🔄 Loading chain…")
+    chain = []
     async with aiohttp.ClientSession() as sess:
-        r = await sess.get(CHAIN_API_URL)
-        chain = await r.json() if r.status == 200 else []
+        # /api/chain is paged; follow `from` until an empty page.
+        while True:
+            r = await sess.get(CHAIN_API_URL, params={"from": len(chain)})
+            page = await r.json() if r.status == 200 else []
+            # Older explorers ignore `from` and return the full chain.
+            page = [blk for blk in page if blk.get("index", 0) >= len(chain)]
+            if not page:
+                break
+            chain.extend(page)
     print(f"⛓️  {len(chain)} blocks")
 
     for blk in chain:
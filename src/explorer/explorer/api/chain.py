@@ -1,3 +1,53 @@
-@app.route("/api/chain")
-def api_chain():
-    return jsonify(load_chain())
+from core.ioutil import get_block_store
+
+CHAIN_PAGE_LIMIT = 500
+HEADER_PAGE_LIMIT = 2000
+HEADER_FIELDS = ["index", "hash", "previous_hash", "merkle_root", "timestamp", "validator"]
+
+
+def block_header(block):
+    return {field: block.get(field) for field in HEADER_FIELDS}
+
+
+def chain_etag(height, tip_hash, *parts):
+    return "-".join(str(p) for p in (height, tip_hash) + parts)
+
+
+def chain_range(start=None, end=None, limit=CHAIN_PAGE_LIMIT):
+    # `to` is inclusive; a page never exceeds `limit` blocks. Height, tip
+    # and blocks are read under one shared lock so the ETag matches the page.
+    store = get_block_store()
+    with store.lock.shared():
+        height = store.height()
+        start = max(0, start or 0)
+        stop = height if end is None else min(height, end + 1)
+        stop = min(stop, start + max(1, min(limit, CHAIN_PAGE_LIMIT)))
+        tip = store.last()
+        blocks = store.read_range(start, stop)
+    etag = chain_etag(height, tip.get("hash") if tip else None, start, stop)
+    return blocks, etag
+
+
+def chain_headers(start=None, limit=HEADER_PAGE_LIMIT):
+    # Headers-first sync: nodes check linkage on these before fetching bodies.
+    store = get_block_store()
+    with store.lock.shared():
+        height = store.height()
+        start = max(0, start or 0)
+        stop = min(height, start + max(1, min(limit, HEADER_PAGE_LIMIT)))
+        tip = store.last()
+        headers = [block_header(block) for block in store.iter_range(start, stop)]
+    etag = chain_etag(height, tip.get("hash") if tip else None, "headers", start, stop)
+    return headers, etag
+
+
+def chain_tip():
+    store = get_block_store()
+    with store.lock.shared():
+        tip = store.last()
+        height = store.height()
+    if not tip:
+        return None, None
+    header = block_header(tip)
+    header["height"] = height
+    return header, chain_etag(header["height"], header["hash"])
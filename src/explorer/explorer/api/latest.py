@@ -11,8 +11,7 @@ def latest_txs(chain):
     txs = []
     for block in reversed(chain):
         for tx in reversed(block.get("transactions", [])):
-            tx["block"] = block["index"]
-            txs.append(tx)
+            txs.append(dict(tx, block=block["index"]))
             if len(txs) >= limit:
                 return txs
     return txs
@@ -1,68 +1,43 @@
-from collections import defaultdict
-import time, datetime, json
+import datetime
 
-def orbit_volume_14d(chain, now):
-    volume_by_day = {}
+WINDOW_DAYS = 14
+ONE_DAY = 86400
 
-    # Initialize the last 14 days with zero volume
-    for i in range(14):
-        day = (now - datetime.timedelta(days=i)).strftime("%Y-%m-%d")
-        volume_by_day[day] = 0.0
+# The charts read the per-day rollups (core.index_util.rollups), which are
+# kept up to date as blocks are appended, so each request is O(days).
 
-    for block in chain:
-        for tx in block.get("transactions", []):
-            ts = tx.get("timestamp", block.get("timestamp", None))
-            if ts:
-                dt = datetime.datetime.utcfromtimestamp(ts)
-                day_str = dt.strftime("%Y-%m-%d")
-                if day_str in volume_by_day:
-                    try:
-                        volume_by_day[day_str] += float(tx.get("amount", 0.0))
-                    except:
-                        continue
+def _utc_date(day, fmt="%Y-%m-%d"):
+    return datetime.datetime.fromtimestamp(day * ONE_DAY, datetime.timezone.utc).strftime(fmt)
 
-    # Return sorted ascending
-    result = [{"date": day, "volume": round(volume_by_day[day], 4)} for day in sorted(volume_by_day)]
-    return result
+def _timestamp(now):
+    if isinstance(now, datetime.datetime):
+        return now.replace(tzinfo=datetime.timezone.utc).timestamp()
+    return now
 
+def orbit_volume_14d(rollups, now):
+    return [{"date": _utc_date(day), "volume": round(bucket["volume"], 4)}
+            for day, bucket in rollups.days(_timestamp(now), WINDOW_DAYS)]
 
-def tx_volume_14d(chain, now):
-    one_day = 86400
 
-    tx_by_day = defaultdict(int)
-    for block in chain:
-        for tx in block.get("transactions", []):
-            day = (tx.get("timestamp", block["timestamp"])) // one_day
-            tx_by_day[day] += 1
+def tx_volume_14d(rollups, now):
+    return [{"date": datetime.datetime.fromtimestamp(day * ONE_DAY).strftime("%b %d"), "count": bucket["txs"]}
+            for day, bucket in rollups.days(_timestamp(now), WINDOW_DAYS)]
 
-    recent_days = [(now // one_day) - i for i in range(13, -1, -1)]
-    data = []
-    for day in recent_days:
-        date_str = datetime.datetime.fromtimestamp(day * one_day).strftime("%b %d")
-        data.append({
-            "date": date_str,
-            "count": tx_by_day.get(day, 0)
-        })
 
-    return data
+def block_volume_14d(rollups, now):
+    return [{"date": _utc_date(day), "count": bucket["blocks"]}
+            for day, bucket in rollups.days(_timestamp(now), WINDOW_DAYS)]
 
 
-def block_volume_14d(chain, now):
-    counts = {}
+def token_volume_14d(rollups, now, symbol):
+    return [{"date": _utc_date(day), "volume": round(bucket["tokens"].get(symbol, 0.0), 4)}
+            for day, bucket in rollups.days(_timestamp(now), WINDOW_DAYS)]
 
-    # Initialize past 14 days
-    for i in range(14):
-        day = (now - datetime.timedelta(days=i)).strftime("%Y-%m-%d")
-        counts[day] = 0
 
-    for block in chain:
-        ts = block.get("timestamp")
-        if ts:
-            dt = datetime.datetime.utcfromtimestamp(ts)
-            day_str = dt.strftime("%Y-%m-%d")
-            if day_str in counts:
-                counts[day_str] += 1
-
-    # Return sorted by date ascending
-    result = [{"date": day, "count": counts[day]} for day in sorted(counts)]
-    return result
+def hourly_volume_24h(rollups, now):
+    return [{
+        "hour": datetime.datetime.fromtimestamp(hour * 3600, datetime.timezone.utc).strftime("%Y-%m-%d %H:00"),
+        "count": bucket["txs"],
+        "volume": round(bucket["volume"], 4),
+        "blocks": bucket["blocks"]
+    } for hour, bucket in rollups.hours(_timestamp(now), 24)]
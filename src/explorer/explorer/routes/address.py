@@ -1,9 +1,9 @@
 from blockchain.stakeutil import get_user_lockups
 from core.walletutil import load_balance
 from explorer.util.util import last_transactions
+from core.index_util.rollups import get_rollup_index, ONE_DAY
 
-import datetime, json
-from collections import defaultdict
+import time, datetime, json
 from flask import request
 
 def address_detail(address, chain):
@@ -13,36 +13,24 @@ def address_detail(address, chain):
     pending = [l for l in locks if not l.get("matured")]
     matured = [l for l in locks if l.get("matured")]
 
-    tx_count = 0
-    total_sent = 0
-    total_received = 0
-    volume_by_day = defaultdict(lambda: {"in": 0, "out": 0})
-
-    for block in chain:
-        for tx in block.get("transactions", []):
-            ts = datetime.datetime.fromtimestamp(tx["timestamp"]).strftime("%Y-%m-%d")
-            if tx["sender"] == address:
-                total_sent += tx["amount"]
-                volume_by_day[ts]["out"] += tx["amount"]
-                tx_count += 1
-            elif tx["recipient"] == address:
-                total_received += tx["amount"]
-                volume_by_day[ts]["in"] += tx["amount"]
-                tx_count += 1
+    # Totals and the daily in/out chart come from the rollups instead of a
+    # walk over the address's whole history.
+    totals = get_rollup_index().address(address)
+    tx_count = totals["count"]
+    total_sent = totals["sent"]
+    total_received = totals["received"]
 
     avg_tx_size = round((total_sent + total_received) / tx_count, 4) if tx_count else 0
     balance = abs(total_received - total_sent)
     chart_data = []
-    today = datetime.datetime.now(datetime.UTC)
-    for i in range(14):
-        day = today - datetime.timedelta(days=i)
-        label = day.strftime("%Y-%m-%d")
+    today = int(time.time() // ONE_DAY)
+    for day in range(today - 13, today + 1):
+        flows = totals["days"].get(day, [0.0, 0.0])
         chart_data.append({
-            "date": label,
-            "in": round(volume_by_day[label]["in"], 4),
-            "out": round(volume_by_day[label]["out"], 4)
+            "date": datetime.datetime.fromtimestamp(day * ONE_DAY, datetime.timezone.utc).strftime("%Y-%m-%d"),
+            "in": round(flows[0], 4),
+            "out": round(flows[1], 4)
         })
-    chart_data.reverse()
 
     data = {
         "address": address,
@@ -1,20 +1,25 @@
-def top_wallets(chain):
-    balances = {}
+from core.index_util.leaderboard import get_leaderboard_index
 
-    for block in chain:
-        for tx in block.get("transactions", []):
-            sender = tx.get("sender")
-            recipient = tx.get("recipient")
-            amount = tx.get("amount", 0)
-
-            if sender != "genesis":
-                balances[sender] = balances.get(sender, 0) - amount
-            balances[recipient] = balances.get(recipient, 0) + amount
-
-    top_100 = sorted(balances.items(), key=lambda x: x[1], reverse=True)[:100]
-    wallet_data = [{"address": addr, "balance": round(balance, 6)} for addr, balance in top_100]
+def top_wallets(limit=100):
+    # Served from the incrementally ordered leaderboard; no per-request sort.
+    top = get_leaderboard_index().top(limit)
+    wallet_data = [{"address": addr, "balance": round(balance, 6)} for addr, balance in top]
 
     return (
         "top_wallets.html", 
         wallet_data
     )
+
+
+def wallet_rank(address):
+    index = get_leaderboard_index()
+    rank = index.rank(address)
+    if rank is None:
+        return None
+    return {
+        "address": address,
+        "balance": round(index.state[address], 6),
+        "rank": rank,
+        "percentile": index.percentile(address),
+        "wallets": len(index)
+    }
@@ -1,34 +1,52 @@
+from core.chainutil import get_tx
+from core.hashutil import block_merkle_levels, merkle_proof
+
+
+def tx_merkle_proof(block, position):
+    # Trees are cached per block, so repeated views never rehash the block.
+    levels = block_merkle_levels(block)
+    root = levels[-1][0].hex()
+    return {
+        "block": block["index"],
+        "position": position,
+        "merkle_root": block.get("merkle_root", ""),
+        "proof": merkle_proof(levels, position),
+        "verified": root == block.get("merkle_root")
+    }
+
 def tx_detail(txid, chain):
-    for block in chain:
-        txs = block.get("transactions", [])
-        for tx in txs:
-            current_id = f"{tx.get('sender')}-{tx.get('recipient')}-{tx.get('timestamp')}"
-            if current_id == txid:
-                # Search this block for a node fee transaction
-                fee_applied = None
-                for other_tx in txs:
-                    if other_tx["recipient"] == "nodefeecollector":
-                        tx_fee = other_tx['note']['type']['gas']['fee']
-                        tx_node = other_tx['note']['type']['gas']['node']
-                        fee_applied = {
-                            "amount": tx_fee,
-                            "node": tx_node,
-                            "type": "gas"
-                        }
-                        break
+    block, position = get_tx(txid)
+    if not block:
+        return "404"
+
+    txs = block.get("transactions", [])
+    tx = txs[position]
+
+    # Search this block for a node fee transaction
+    fee_applied = None
+    for other_tx in txs:
+        if other_tx["recipient"] == "nodefeecollector":
+            tx_fee = other_tx['note']['type']['gas']['fee']
+            tx_node = other_tx['note']['type']['gas']['node']
+            fee_applied = {
+                "amount": tx_fee,
+                "node": tx_node,
+                "type": "gas"
+            }
+            break
 
-                note_type = tx.get("note") or tx.get("metadata", {}).get("note")
-                confirmations = len(chain) - block["index"] - 1
+    note_type = tx.get("note") or tx.get("metadata", {}).get("note")
+    confirmations = len(chain) - block["index"] - 1
 
-                return (
-                    "tx_detail.html",
-                    tx,
-                    note_type,
-                    confirmations,
-                    "Success" if tx.get("valid", True) else "Fail",
-                    tx.get("fee", 0),
-                    tx.get("signature", "N/A"),
-                    block["index"],
-                    fee_applied
-                )
-    return "404"
+    return (
+        "tx_detail.html",
+        tx,
+        note_type,
+        confirmations,
+        "Success" if tx.get("valid", True) else "Fail",
+        tx.get("fee", 0),
+        tx.get("signature", "N/A"),
+        block["index"],
+        fee_applied,
+        tx_merkle_proof(block, position)
+    )
@@ -1,8 +1,9 @@
 import json, os, datetime, math
-from config.configutil import OrbitDB
 from blockchain.stakeutil import get_user_lockups, get_all_lockups
 from core.walletutil import load_balance
 from core.ioutil import load_nodes, fetch_chain
+from core.chainutil import iter_address_txs
+from core.index_util.summary import get_chain_summary as chain_summary
 import time
 from collections import defaultdict
 from core.tx_util.tx_types import TXTypes
@@ -60,12 +61,11 @@ def search_chain(query):
 
 def last_transactions(address, limit=10):
     txs = []
-    for block in reversed(fetch_chain()):
-        for tx in block.get("transactions", []):
-            if tx["sender"] == address or tx["recipient"] == address:
-                txs.append(tx)
-                if len(txs) >= limit:
-                    return txs
+    for block, tx in iter_address_txs(address, reverse=True):
+        if tx["sender"] == address or tx["recipient"] == address:
+            txs.append(tx)
+            if len(txs) >= limit:
+                return txs
     return txs
 
 def get_validator_stats():
@@ -106,34 +106,5 @@ def get_validator_stats():
 
 
 def get_chain_summary():
-    orbit_db = OrbitDB()
-    wallet_mapping = orbit_db.walletmapping
-    chain = fetch_chain()
-    tx_count = sum(len(b.get("transactions", [])) for b in chain)
-    account_set = set()
-
-    total_orbit = 100_000_000_000
-    circulating = 0
-
-    excluded_addresses = set()
-    try:
-        with open(wallet_mapping, "r") as f:
-            wallet_map = json.load(f)
-            excluded_addresses = set(wallet_map.values())
-    except Exception as e:
-        print(f"Warning: Failed to load wallet_mapping.json - {e}")
-
-    for b in chain:
-        for tx in b.get("transactions", []):
-            account_set.add(tx["sender"])
-            account_set.add(tx["recipient"])
-            if tx["recipient"] not in excluded_addresses:
-                circulating += tx["amount"]
-
-    return {
-        "blocks": len(chain),
-        "transactions": tx_count,
-        "accounts": len(account_set),
-        "circulating": circulating,
-        "total_orbit": total_orbit
-    }
+    # Materialized per appended block; see core.index_util.summary.
+    return chain_summary()
@@ -11,8 +11,9 @@ from blockchain.miningutil import start_mining, check_mining
 
 from config.configutil import OrbitDB
 
-from core.ioutil import load_chain, load_nodes
-from core.orderutil import token_stats, BASE_PRICE, all_tokens_stats
+from core.ioutil import load_chain, load_nodes, get_block_store
+from core.chainutil import get_chain_view, get_tx as find_tx
+from core.orderutil import token_stats, BASE_PRICE, all_tokens_stats, token_registry_stats
 from core.walletutil import load_balance
 from core.cacheutil import get_cached, set_cached, clear_cache
 from core.hashutil import create_2fa_secret, verify_2fa_token, generate_orbit_address
@@ -20,16 +21,18 @@ from core.authutil import update_login, is_logged_in, cleanup_expired_sessions
 from core.tokenmeta import get_token_meta
 from core.userutil import register, login
 
+from explorer.api.chain import chain_range, chain_headers, chain_tip, CHAIN_PAGE_LIMIT, HEADER_PAGE_LIMIT
 from explorer.api.latest import latest_block, latest_txs
-from explorer.api.volume import tx_volume_14d, block_volume_14d, orbit_volume_14d
+from explorer.api.volume import tx_volume_14d, block_volume_14d, orbit_volume_14d, token_volume_14d, hourly_volume_24h
+from core.index_util.rollups import get_rollup_index
 from explorer.routes.address import address_detail
 from explorer.routes.block import block_detail
 from explorer.routes.locked import locked
 from explorer.routes.home import home
 from explorer.routes.node import node_profile
 from explorer.routes.orbitstats import orbit_stats
-from explorer.routes.topwallets import top_wallets
-from explorer.routes.tx import tx_detail
+from explorer.routes.topwallets import top_wallets, wallet_rank
+from explorer.routes.tx import tx_detail, tx_merkle_proof
 from explorer.util.util import search_chain, last_transactions, get_validator_stats, get_chain_summary
 
 orbit_db = OrbitDB()
@@ -42,9 +45,15 @@ node_validation_proofs = {}
 active_node_registry = {}
 
 
+# Routes that never look at the chain skip the snapshot lookup entirely.
+CHAINLESS_ENDPOINTS = {"static", "ping", "node_ping", "active_nodes", "node_proof", "receive_block"}
+
 @app.before_request
 def load_chain_once():
-    g.chain = load_chain()
+    if request.endpoint in CHAINLESS_ENDPOINTS:
+        return
+    # Shared, immutable snapshot; only re-read when the block store changes.
+    g.chain = get_chain_view(local_only=True).blocks
 
 @app.template_filter('ts')
 def format_timestamp(value):
@@ -112,10 +121,25 @@ def route_locked():
 
 @app.route("/top-wallets")
 def get_top_wallets():
-    html, wallet_data = top_wallets(g.chain)
+    html, wallet_data = top_wallets()
     return render_template(html, wallets=wallet_data)
 
 
+@app.route("/api/top-wallets")
+def api_top_wallets():
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+    _, wallet_data = top_wallets(limit)
+    return jsonify(wallet_data)
+
+
+@app.route("/api/wallet-rank/<address>")
+def api_wallet_rank(address):
+    result = wallet_rank(address)
+    if result is None:
+        return jsonify({"error": "Address not found"}), 404
+    return jsonify(result)
+
+
 @app.route("/cache/clear")
 def clear_explorer_cache():
     clear_cache()
@@ -153,7 +177,8 @@ def get_tx(txid):
             fee,
             proof,
             block_index,
-            node_fee
+            node_fee,
+            merkle
         ) = result
         return render_template(html,
             tx=tx,
@@ -163,7 +188,8 @@ def get_tx(txid):
             fee=fee,
             proof=proof,
             block_index=block_index,
-            node_fee=node_fee
+            node_fee=node_fee,
+            merkle=merkle
         )
 
 
@@ -267,96 +293,7 @@ def load_node(node_id):
 
 @app.route("/tokens")
 def all_tokens():
-    from datetime import datetime, timedelta, UTC
-    from collections import defaultdict
-    now = datetime.now(UTC)
-
-    chain = load_chain()
-    tokens = {}
-    total_transfers = 0
-    transfers_24h = 0
-    new_tokens_24h = 0
-
-    def parse_ts(ts_raw):
-        if isinstance(ts_raw, str):
-            return datetime.fromisoformat(ts_raw).replace(tzinfo=UTC)
-        elif isinstance(ts_raw, (int, float)):
-            return datetime.fromtimestamp(ts_raw, tz=UTC)
-        return None
-
-    for block in chain:
-        for tx in block.get("transactions", []):
-            note = tx.get("note")
-            if not isinstance(note, dict):
-                continue
-            tx_type = note.get("type", {})
-            ts = parse_ts(tx.get("timestamp"))
-
-            # Token creation
-            if "create_token" in tx_type:
-                d = tx_type["create_token"]
-                name = d.get("name")
-                symbol = d.get("symbol")
-                supply = float(d.get("supply", 0))
-                creator = d.get("creator")
-                timestamp = d.get("timestamp")
-
-                if name and symbol:
-                    tokens[symbol] = {
-                        "symbol": symbol,
-                        "name": name,
-                        "supply": supply,
-                        "creator": creator,
-                        "created_at": timestamp,
-                        "age": "",
-                        "transfers": 0,
-                        "holders": set()
-                    }
-                    ts_created = parse_ts(timestamp)
-                    if ts_created and (now - ts_created <= timedelta(days=1)):
-                        new_tokens_24h += 1
-
-            # Transfer types: update holders and transfers
-            for typ in ["buy_token", "sell_token", "token_transfer"]:
-                if typ in tx_type:
-                    d = tx_type[typ]
-                    symbol = d.get("symbol") or d.get("token_symbol")
-                    sender = d.get("sender")
-                    receiver = d.get("receiver")
-
-                    if symbol in tokens:
-                        tokens[symbol]["transfers"] += 1
-                        if sender:
-                            tokens[symbol]["holders"].add(sender)
-                        if receiver:
-                            tokens[symbol]["holders"].add(receiver)
-
-                    total_transfers += 1
-                    if ts and (now - ts <= timedelta(days=1)):
-                        transfers_24h += 1
-
-    # Final formatting
-    token_list = []
-    for token in tokens.values():
-        created_at = parse_ts(token["created_at"])
-        if created_at:
-            age = now - created_at
-            days = age.days
-            token["age"] = f"{days} day{'s' if days != 1 else ''}"
-        else:
-            token["age"] = "Unknown"
-        token["holders"] = len(token["holders"])
-        token_list.append(token)
-
-    token_list = sorted(token_list, key=lambda x: x["symbol"].lower())
-
-    metrics = {
-        "total_transfers": total_transfers,
-        "transfers_24h": transfers_24h,
-        "total_tokens": len(tokens),
-        "new_tokens_24h": new_tokens_24h
-    }
-
+    token_list, _, metrics = token_registry_stats()
     return render_template("tokens.html", tokens=token_list, metrics=metrics)
 
 
@@ -509,12 +446,13 @@ def api_send():
             return jsonify({"error": "Invalid amount format"}), 400
 
         # Call core logic
-        success, message = send_orbit(sender, recipient, amount, order)
+        tx_id, result = send_orbit(sender, recipient, amount, order)
 
-        if success:
-            return jsonify({"status": "success", "message": message}), 200
+        if tx_id:
+            # Queued in the mempool; the block follows within a few seconds.
+            return jsonify({"status": "success", "message": "Transaction queued", "tx_id": tx_id}), 200
         else:
-            return jsonify({"status": "fail", "message": message}), 400
+            return jsonify({"status": "fail", "message": result}), 400
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -545,22 +483,32 @@ def api_latest_transactions():
 
 @app.route("/api/orbit_volume_14d")
 def orbit_volumed():
-    result = orbit_volume_14d(g.chain, datetime.datetime.utcnow())
+    result = orbit_volume_14d(get_rollup_index(), datetime.datetime.utcnow())
     return jsonify(result)
 
 
 @app.route("/api/tx_volume_14d")
 def tx_volume():
-    data = tx_volume_14d(g.chain, int(time.time()))
+    data = tx_volume_14d(get_rollup_index(), int(time.time()))
     return jsonify(data)
 
 
 @app.route("/api/block_volume_14d")
 def block_volume():
-    result = block_volume_14d(g.chain, datetime.datetime.utcnow())
+    result = block_volume_14d(get_rollup_index(), datetime.datetime.utcnow())
     return jsonify(result)
 
 
+@app.route("/api/token_volume_14d/<symbol>")
+def token_volume(symbol):
+    return jsonify(token_volume_14d(get_rollup_index(), time.time(), symbol))
+
+
+@app.route("/api/volume_24h")
+def hourly_volume():
+    return jsonify(hourly_volume_24h(get_rollup_index(), time.time()))
+
+
 
 @app.route("/validators")
 def validators():
@@ -573,8 +521,35 @@ def api_docs():
     return render_template("api_docs.html")
 
 @app.route("/api/chain")
-def api_chain():           
-    return jsonify(g.chain)
+def api_chain():
+    # Without parameters this is the first page; clients follow `from`.
+    start = request.args.get("from", type=int)
+    end = request.args.get("to", type=int)
+    limit = request.args.get("limit", CHAIN_PAGE_LIMIT, type=int)
+    blocks, etag = chain_range(start, end, limit)
+    response = jsonify(blocks)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+@app.route("/api/headers")
+def api_headers():
+    start = request.args.get("from", type=int)
+    limit = request.args.get("limit", HEADER_PAGE_LIMIT, type=int)
+    headers, etag = chain_headers(start, limit)
+    response = jsonify(headers)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+@app.route("/api/tip")
+def api_tip():
+    header, etag = chain_tip()
+    if not header:
+        return jsonify({"error": "No blocks found"}), 404
+    response = jsonify(header)
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 @app.route("/api/address/<address>")
@@ -588,6 +563,12 @@ def api_address(address):
 
 @app.route("/api/block/<int:index>")
 def api_block(index):
+    try:
+        block = get_block_store().get(index) if index >= 0 else None
+    except IndexError:
+        block = None
+    if block and block.get("index") == index:
+        return jsonify(block)
     for block in g.chain:
         if block["index"] == index:
             return jsonify(block)
@@ -596,11 +577,16 @@ def api_block(index):
 
 @app.route("/api/tx/<txid>")
 def api_tx(txid):
-    for block in g.chain:
-        for tx in block.get("transactions", []):
-            current_id = f"{tx.get('sender')}-{tx.get('recipient')}-{tx.get('timestamp')}"
-            if current_id == txid:
-                return jsonify(tx)
+    block, position = find_tx(txid)
+    if block:
+        return jsonify(block["transactions"][position])
+    return jsonify({"error": "Transaction not found"}), 404
+
+@app.route("/api/tx/<txid>/proof")
+def api_tx_proof(txid):
+    block, position = find_tx(txid)
+    if block:
+        return jsonify(tx_merkle_proof(block, position))
     return jsonify({"error": "Transaction not found"}), 404
 
 
@@ -627,7 +613,7 @@ def node_ping():
         "node": node,
         "last_seen": last_seen
     }
-    if is_thousand_milestone(len(g.chain)):
+    if is_thousand_milestone(get_block_store().height()):
         #Get active nodes
         active_nodes = active_node_registry
         if active_nodes:
@@ -11,26 +11,52 @@ from flask import Flask, request, jsonify
 from api import send_orbit_api
 from configure import EXCHANGE_ADDRESS
 from config.configutil import TXConfig, NodeConfig, OrbitDB
-from core.ioutil import load_nodes, save_nodes, fetch_chain, save_chain
+from core.ioutil import load_nodes, save_nodes, save_chain, append_block
+from core.chainutil import get_chain_view
+from core.syncutil import headers_first_sync, SYNC_BATCH
+from core.gossiputil import GossipRelay, ORIGIN_HEADER
 from blockchain.blockutil import validate_block
 from blockchain.orbitutil import simulate_peer_vote
 from core.logutil import log_node_activity
 from utils.match_orders import match_orders
 
 FETCH_INTERVAL = 30
+NODE_DATA_DIR = "node_data"
+NODE_IDS_FILE = os.path.join(NODE_DATA_DIR, "node_ids.json")
 
 EXPLORER = os.getenv("ORBIT_EXPLORER", "https://oliver-butler-oasis-builder.trycloudflare.com")
 
+def load_node_id(address):
+    """
+    The node id for this wallet address, kept across restarts so the node
+    reopens its own ledger. A new id is picked the first time.
+    """
+    try:
+        with open(NODE_IDS_FILE) as f:
+            node_ids = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        node_ids = {}
+    if address not in node_ids:
+        node_ids[address] = f"Node{random.randint(0, 9999)}"
+        os.makedirs(NODE_DATA_DIR, exist_ok=True)
+        with open(NODE_IDS_FILE, "w") as f:
+            json.dump(node_ids, f, indent=2)
+    return node_ids[address]
+
+
 class OrbitNode:
     def __init__(self, address, port=None, tunnel_url=None):
         self.address = address
         self.tunnel_url = tunnel_url or os.getenv("TUNNEL_URL", "").strip()
         self.ip = '127.0.0.1'
         self.port = port or self.get_available_port()
-        self.node_id = f"Node{random.randint(0, 9999)}"
+        self.node_id = load_node_id(address)
         self.running = True
-        self.node_ledger = f"node_data/orbit_chain.{self.node_id}"
-        self.chain = fetch_chain()
+        self.node_ledger = os.path.join(NODE_DATA_DIR, f"orbit_chain.{self.node_id}")
+        # Start from our own ledger and let headers-first sync fetch only
+        # what is missing, rather than downloading the whole chain.
+        self.chain = list(get_chain_view(self.node_ledger, local_only=True).blocks)
+        self.block_hashes = {b.get("hash") for b in self.chain}
         self.nodes = load_nodes()
         self.users = [address]
         self.heartbeat_min = 10
@@ -42,6 +68,10 @@ class OrbitNode:
         self.stats_ui_thread = None
         self.peer_discovery_thread = None
         self.quorum_slice = set()
+        self.tip_etag = None
+        self.gossip = GossipRelay(self.node_id, has_block=lambda block_hash: block_hash in self.block_hashes,
+                                  url=self.base_url())
+        self.update_chain()
 
     def get_available_port(self, start=5000, end=5999):
         while True:
@@ -70,58 +100,60 @@ class OrbitNode:
         save_nodes(self.nodes, exclude_id=self.node_id)
         return self.nodes[self.node_id]
 
-    def fetch_latest_chain(self):
-        def is_valid_blockchain(chain):
-            if not isinstance(chain, list) or not chain:
-                return False
-            required_fields = ["index", "hash", "timestamp", "transactions"]
-            for block in chain:
-                if not isinstance(block, dict):
-                    return False
-                if not all(field in block for field in required_fields):
-                    return False
-            return True
-
-        try:
-            chain = fetch_chain()
-            if is_valid_blockchain(chain):
-                return chain
-            else:
-                raise ValueError("Local chain malformed or corrupted.")
-        except Exception as e:
-            log_node_activity(self.node_id, "[RECOVERY]", f"Local chain failed integrity check: {e}")
-            try:
-                res = requests.get(f"{EXPLORER}/api/chain", timeout=5)
-                if res.status_code == 200:
-                    remote_chain = res.json()
-                    if is_valid_blockchain(remote_chain):
-                        save_chain(remote_chain, owner_id=self.node_id, chain_file=self.node_ledger)
-                        log_node_activity(self.node_id, "[RECOVERY]", f"Fetched fresh chain from explorer.")
-                        return remote_chain
-            except Exception as ex:
-                log_node_activity(self.node_id, "[ERROR]", f"Failed to recover chain from explorer: {ex}")
-        return []
-
     def update_chain(self):
-        new_chain = self.fetch_latest_chain()
-        if new_chain and len(new_chain) > len(self.chain):
-            self.chain = new_chain
-            save_chain(self.chain, owner_id=self.node_id, chain_file=self.node_ledger)
-
-    def validate_incoming_block(self, block):
-        if any(b.get("hash") == block.get("hash") for b in self.chain):
+        # Heartbeats only look at the tip; an unchanged tip costs a 304. When
+        # it moved, headers come first and the bodies follow in parallel
+        # batches from the explorer and our peers.
+        height, new_blocks, self.tip_etag = headers_first_sync(
+            self.chain, self.peer_urls(), explorer=EXPLORER, etag=self.tip_etag
+        )
+        if not new_blocks:
+            return
+        if height < len(self.chain):
+            log_node_activity(self.node_id, "[SYNC]", f"Chain diverged; rewinding to {height}.")
+        chain = self.chain[:height] + new_blocks
+        if not save_chain(chain, owner_id=self.node_id, chain_file=self.node_ledger):
+            # Keep serving what is stored; the next heartbeat retries.
+            self.tip_etag = None
+            return
+        self.chain = chain
+        self.block_hashes = {b.get("hash") for b in chain}
+        log_node_activity(self.node_id, "[SYNC]", f"Synced {len(new_blocks)} blocks, height {len(self.chain)}.")
+
+    def base_url(self):
+        # As peer_urls() builds it from our registered host and port.
+        host = self.tunnel_url or self.ip
+        return host if host.startswith("http") else f"http://{host}:{self.port}"
+
+    def validate_incoming_block(self, block, origin=None):
+        """
+        True if the block was validated and stored, False if it was rejected,
+        None if it was valid but could not be stored (the sender should
+        retry).
+        """
+        if block.get("hash") in self.block_hashes:
             log_node_activity(self.node_id, "[INFO]", "Block already exists in chain.")
             return False
         log_node_activity(self.node_id, "[INFO]", "Validating Block.")
         if validate_block(block, self.node_id):
+            try:
+                stored = append_block(block, owner_id=self.node_id, chain_file=self.node_ledger)
+            except Exception as e:
+                log_node_activity(self.node_id, "[FAIL]", f"Append failed: {e}")
+                stored = False
+            if not stored:
+                log_node_activity(self.node_id, "[FAIL]", f"Block {block.get('index')} could not be stored.")
+                return None
             self.chain.append(block)
-            save_chain(self.chain, owner_id=self.node_id, chain_file=self.node_ledger)
+            self.block_hashes.add(block.get("hash"))
             self.block_timestamps.append(time.time())
             self.nodes[self.node_id]["trust"] = min(1.0, self.nodes[self.node_id]["trust"] + 0.01)
             self.nodes[self.node_id]["uptime"] = min(1.0, self.nodes[self.node_id]["uptime"] + 0.01)
             save_nodes(self.nodes, exclude_id=self.node_id)
             self.last_validated_block = block.get("index", self.last_validated_block)
-            self.broadcast_block_to_peers(block)
+            # Relay off the request thread so the sender is not held up by
+            # this node's own fan-out.
+            threading.Thread(target=self.broadcast_block_to_peers, args=(block, origin), daemon=True).start()
             self.block_received_event.set()
             log_node_activity(self.node_id, f"[SUCCESS]", f"Block validated and added at index {block.get('index')}")
             return True
@@ -140,24 +172,30 @@ class OrbitNode:
     def get_validated_block_count(self):
         return sum(1 for block in self.chain if block.get("validator") == self.node_id)
 
-    def broadcast_block_to_peers(self, block):
-        log_node_activity(self.node_id, f"[SYNC]", f"Starting Broadcast")
+    def peer_urls(self):
+        urls = {}
         for node_id, node_data in self.nodes.items():
             if node_id == self.node_id:
                 continue
             host = node_data.get("host")
             port = node_data.get("port")
-            if host.startswith("http"):
-                url = f"{host}/receive_block"
-            else:
-                url = f"http://{host}:{port}/receive_block"
-            try:
-                res = requests.post(url, json=block, timeout=3)
-                if res.status_code == 200:
-                    log_node_activity(self.node_id, f"[SYNC]", f"Block sent to {node_id}")
-            except Exception:
-                log_node_activity(self.node_id, f"[SYNC]", f"Block failed to send to {node_id}")
+            if not host:
                 continue
+            urls[host if host.startswith("http") else f"http://{host}:{port}"] = node_id
+        return urls
+
+    def broadcast_block_to_peers(self, block, origin=None):
+        # Gossip: announce the hash to a fan-out sample of peers, who pull the
+        # body only if they lack it and relay it the same way once accepted.
+        log_node_activity(self.node_id, f"[SYNC]", f"Starting Broadcast")
+        urls = self.peer_urls()
+        for url, result in self.gossip.announce(block, urls, origin=origin).items():
+            if result == "sent":
+                log_node_activity(self.node_id, f"[SYNC]", f"Block sent to {urls[url]}")
+            elif result == "skipped":
+                log_node_activity(self.node_id, f"[SYNC]", f"Skipped {urls[url]}: circuit open")
+            elif result == "failed":
+                log_node_activity(self.node_id, f"[SYNC]", f"Block failed to send to {urls[url]}")
 
     def start_receiver_server(self):
         app = Flask(__name__)
@@ -165,11 +203,27 @@ class OrbitNode:
         @app.route("/receive_block", methods=["POST"])
         def receive_block():
             block = request.get_json()
-            if self.validate_incoming_block(block):
+            accepted = self.validate_incoming_block(block, origin=request.headers.get(ORIGIN_HEADER))
+            if accepted:
                 self.update_chain()
                 return jsonify({"status": "accepted"}), 200
+            if accepted is None:
+                return jsonify({"status": "error", "message": "Block could not be stored"}), 503
             return jsonify({"status": "rejected"}), 400
 
+        @app.route("/api/chain")
+        def chain_range():
+            # Lets peers fetch block bodies from us during headers-first sync.
+            start = max(0, request.args.get("from", 0, type=int))
+            end = request.args.get("to", len(self.chain) - 1, type=int)
+            limit = max(1, min(request.args.get("limit", SYNC_BATCH, type=int), SYNC_BATCH))
+            return jsonify(self.chain[start:min(end + 1, start + limit)]), 200
+
+        @app.route("/inv", methods=["POST"])
+        def inventory():
+            hashes = (request.get_json(silent=True) or {}).get("hashes", [])
+            return jsonify({"want": self.gossip.wanted(hashes)}), 200
+
         threading.Thread(
             target=app.run,
             kwargs={"host": '0.0.0.0', "port": self.port, "debug": False, "use_reloader": False}
@@ -1,46 +1,15 @@
 import asyncio
 from logic.logic import create_order
-from core.ioutil import fetch_chain
+from core.index_util.orderbook import get_order_book, open_orders
 from core.logutil import log_node_activity
 from api import send_orbit_api
 from core.tx_util.tx_types import TXExchange
 
 async def match_orders(node_id):
-    buy_orders = []
-    sell_orders = []
-    filled_order_ids = set()
-    chain = fetch_chain()
-
-    # Parse orders from chain
-    for block in reversed(chain):
-        for tx in block.get("transactions", []):
-            note = tx.get("note")
-            if not isinstance(note, dict):
-                continue
-
-            note_type = note.get("type")
-            if not isinstance(note_type, dict):
-                continue
-
-            if "buy_token" in note_type:
-                order = note_type["buy_token"]
-                status = order.get("status")
-                order_id = order.get("order_id")
-
-                if status == "filled":
-                    filled_order_ids.add(order_id)
-                elif status == "open" and order_id not in filled_order_ids:
-                    buy_orders.append(order)
-
-            elif "sell_token" in note_type:
-                order = note_type["sell_token"]
-                status = order.get("status")
-                order_id = order.get("order_id")
-
-                if status == "filled":
-                    filled_order_ids.add(order_id)
-                elif status == "open" and order_id not in filled_order_ids:
-                    sell_orders.append(order)
+    # Open orders from the order book index, newest first.
+    state = get_order_book()
+    buy_orders = [order["data"] for order in reversed(open_orders(state, "buy")) if order["status"] == "open"]
+    sell_orders = [order["data"] for order in reversed(open_orders(state, "sell")) if order["status"] == "open"]
 
     # Match orders
     matched_pairs = []